@@ -0,0 +1,124 @@
+"""
+Benchmark peak memory of missing-value handling and feature engineering,
+copy-free path against the previous per-stage copies.
+
+Each path runs in a fresh interpreter so its peak RSS is measured alone.
+Run from the project root:
+    python benchmarks/bench_copy_free.py --rows 2000000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+from src.data_cleaning import handle_missing_values  # noqa: E402
+from src.data_loading import load_student_data  # noqa: E402
+from src.feature_engineering import engineer_features  # noqa: E402
+from src.utils.logger import get_logger  # noqa: E402
+from src.utils.memory import enable_copy_on_write, peak_rss_mb  # noqa: E402
+
+logger = get_logger(__name__)
+
+
+def legacy_handle_missing_values(df: pd.DataFrame) -> pd.DataFrame:
+    # The previous implementation: a full copy, then one drop or fill per column
+    df = df.copy()
+    for col in df.columns:
+        missing_ratio = df[col].isna().mean()
+        if missing_ratio > 0.5:
+            df = df.drop(columns=[col])
+            continue
+        if df[col].dtype in [np.float64, np.int64]:
+            df[col] = df[col].fillna(df[col].median())
+        else:
+            df[col] = df[col].fillna(df[col].mode()[0])
+    return df
+
+
+def legacy_engineer_features(df: pd.DataFrame) -> pd.DataFrame:
+    # The previous implementation: a full copy per feature-engineering step
+    df = df.copy()
+    df["Stress_Sleep_Interaction"] = df["Stress_Level (1-10)"] * df["Sleep_Hours_per_Night"]
+    df = df.copy()
+    df["Stress_Level_c"] = df["Stress_Level (1-10)"] - df["Stress_Level (1-10)"].mean()
+    df["Sleep_Hours_c"] = df["Sleep_Hours_per_Night"] - df["Sleep_Hours_per_Night"].mean()
+    df["Stress_Sleep_Interaction_c"] = df["Stress_Level_c"] * df["Sleep_Hours_c"]
+    return df
+
+
+PATHS = {
+    "legacy": (legacy_handle_missing_values, legacy_engineer_features),
+    "copy-free": (handle_missing_values, engineer_features),
+}
+
+
+def make_frame(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    # Resample the bundled dataset to n_rows (already typed) with extra missing values
+    rng = np.random.default_rng(seed)
+    df = load_student_data()
+    df = df.iloc[rng.integers(0, len(df), n_rows)].reset_index(drop=True)
+    for col in ["Attendance (%)", "Sleep_Hours_per_Night", "Parent_Education_Level"]:
+        df.loc[rng.random(n_rows) < 0.1, col] = np.nan
+    return df
+
+
+def run_path(name: str, n_rows: int) -> dict:
+    # Build the frame, record the baseline RSS, then run one path
+    enable_copy_on_write()
+    df = make_frame(n_rows)
+    baseline = peak_rss_mb()
+    fill, engineer = PATHS[name]
+    # Traced allocations give the path's own peak even when loading peaked higher
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = engineer(fill(df))
+    elapsed = time.perf_counter() - start
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "seconds": elapsed,
+        "frame_mb": df.memory_usage(deep=True).sum() / 1e6,
+        "baseline_mb": baseline,
+        "peak_mb": peak_rss_mb(),
+        "allocated_mb": traced_peak / 1e6,
+        "checksum": float(result.select_dtypes("number").sum().sum()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--path", choices=list(PATHS), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.path:
+        # Child process: run a single path and report as JSON on the last line
+        print(json.dumps(run_path(args.path, args.rows)))
+        return
+
+    results = {}
+    for name in PATHS:
+        out = subprocess.run(
+            [sys.executable, __file__, "--rows", str(args.rows), "--path", name],
+            capture_output=True, text=True, check=True, cwd=project_root,
+        )
+        results[name] = json.loads(out.stdout.strip().splitlines()[-1])
+    for name, r in results.items():
+        logger.info(
+            "%-9s %6.2fs  frame %7.1f MB  peak RSS %7.1f MB (+%.1f MB)  peak allocated by the path %7.1f MB",
+            name, r["seconds"], r["frame_mb"], r["peak_mb"], r["peak_mb"] - r["baseline_mb"], r["allocated_mb"],
+        )
+    if not np.isclose(results["legacy"]["checksum"], results["copy-free"]["checksum"]):
+        logger.warning("Paths disagree: %s", {name: r["checksum"] for name, r in results.items()})
+
+
+if __name__ == "__main__":
+    main()
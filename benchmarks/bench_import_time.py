@@ -0,0 +1,65 @@
+"""
+Benchmark import time of the pipeline entry points in fresh interpreters.
+
+Run from the project root:
+    python benchmarks/bench_import_time.py --repeat 5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+from src.utils.logger import get_logger  # noqa: E402
+
+logger = get_logger(__name__)
+
+# Heavy libraries the numbers-only path must not import
+HEAVY_MODULES = ["matplotlib", "seaborn", "sklearn", "scipy", "statsmodels"]
+
+# Import targets: the entry point, the full stage declarations, and the eager
+# import cost of the heavy libraries for reference
+TARGETS = {
+    "main (numbers-only entry point)": "import main",
+    "full pipeline stages": "import main; main.build_stages()",
+    "heavy libraries (reference)": (
+        "import matplotlib.pyplot, seaborn, sklearn.cluster, sklearn.decomposition, scipy.stats, statsmodels.api"
+    ),
+}
+
+# Snippet run in a fresh interpreter: time the import and list heavy modules loaded
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(json.dumps({{"seconds": elapsed, "heavy": heavy}}))
+"""
+
+
+def measure(statement: str) -> dict:
+    # Run one import probe in a fresh interpreter
+    code = PROBE.format(statement=statement, heavy=HEAVY_MODULES)
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=project_root, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for label, statement in TARGETS.items():
+        runs = [measure(statement) for _ in range(args.repeat)]
+        best = min(run["seconds"] for run in runs)
+        logger.info("%-32s best of %d: %.2fs, heavy modules: %s", label, args.repeat, best, runs[-1]["heavy"] or "none")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark cleaning throughput of the serial pipeline against partitioned
+cleaning with an increasing number of workers.
+
+Run from the project root:
+    python benchmarks/bench_partitioned_cleaning.py --rows 2000000 --jobs 1 2 4
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+from src.data_cleaning import clean_full_dataset  # noqa: E402
+from src.data_loading import DEFAULT_DATA_PATH  # noqa: E402
+from src.partitioned_cleaning import clean_partitioned  # noqa: E402
+from src.utils.logger import get_logger  # noqa: E402
+
+logger = get_logger(__name__)
+
+
+def make_raw_frame(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    # Resample the raw text rows of the bundled dataset to n_rows with extra missing tokens
+    rng = np.random.default_rng(seed)
+    raw = pd.read_csv(DEFAULT_DATA_PATH, dtype=str, keep_default_na=False)
+    raw = raw.iloc[rng.integers(0, len(raw), n_rows)].reset_index(drop=True)
+    for col in ["Attendance (%)", "Sleep_Hours_per_Night", "Parent_Education_Level"]:
+        raw.loc[rng.random(n_rows) < 0.1, col] = "NA"
+    return raw
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    raw = make_raw_frame(args.rows)
+    start = time.perf_counter()
+    expected = clean_full_dataset(raw)
+    serial = time.perf_counter() - start
+    logger.info("serial       %6.2fs  %9.0f rows/sec", serial, args.rows / serial)
+    for n_jobs in args.jobs:
+        start = time.perf_counter()
+        result = clean_partitioned(raw, n_partitions=max(n_jobs, 4), n_jobs=n_jobs)
+        seconds = time.perf_counter() - start
+        logger.info("%2d worker(s) %6.2fs  %9.0f rows/sec  (%.2fx serial)",
+                    n_jobs, seconds, args.rows / seconds, serial / seconds)
+        if not result.equals(expected):
+            logger.warning("Partitioned result with %d workers differs from the serial result", n_jobs)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,61 +1,132 @@
-from src.data_loading import load_student_data
-from src.data_cleaning import clean_full_dataset
-from src.feature_engineering import engineer_features
+import argparse
+from src.cache import DEFAULT_CACHE_DIR, code_version, file_digest, load_cleaned_features, make_cache_key
+from src import compaction, data_cleaning, feature_engineering, type_inference
+from src.column_profile import profile_frame
+from src.data_loading import DEFAULT_DATA_PATH
 from src.modeling import build_interaction_regression_model, summarize_model
 from src.analysis.model_analysis import compute_correlations, extract_model_effects
-from src.visualization_basic import plot_distributions
-from src.analysis.eda_advanced import apply_pca, apply_kmeans, plot_pca_clusters
-from src.analysis.eda_components import eda_score_components
-from src.visualization_advanced import plot_interaction_effect
+from src.pipeline import run_pipeline, stage
+from src.utils.instrumentation import configure_instrumentation
 from src.utils.logger import get_logger
+from src.utils.memory import enable_copy_on_write
 
 # Initialize logger
 logger = get_logger(__name__)
 
-# Main analysis pipeline
-def main():
-    logger.info("Starting stress-sleep-performance analysis pipeline")
+# Figures written by the plotting stages
+FIGURES_DIR = "figures"
 
-    # Load the dataset
-    df_raw = load_student_data()
 
-    # Clean the dataset
-    df_clean = clean_full_dataset(df_raw)
+def data_fingerprint() -> str:
+    # The cleaned frames change with the data file and the cleaning/feature code
+    return make_cache_key(
+        file_digest(DEFAULT_DATA_PATH),
+        code_version(compaction, data_cleaning, type_inference, feature_engineering),
+    )
 
-    # Engineer features
-    df_features = engineer_features(df_clean)
 
-    # Visualizations of distributions
-    plot_distributions(df_clean)
+def plot_clusters(pca_df, df_clustered):
+    # Plot the PCA projection colored by the KMeans cluster labels
+    from src.analysis.eda_advanced import plot_pca_clusters
+    plot_pca_clusters(pca_df, df_clustered["Cluster"])
 
-    # EDA on score components
-    eda_score_components(df_clean)
 
-    # Correlation analysis
-    correlations = compute_correlations(df_features)
-    logger.info("Correlations: %s", correlations)
+def plot_profiled_distributions(df_clean, profile):
+    # Stress and sleep histograms read from the shared column profile
+    from src.visualization_basic import plot_distributions
+    plot_distributions(df_clean, profile=profile)
 
-    # PCA and KMeans clustering
-    pca_df = apply_pca(df_features)
-    df_clustered = apply_kmeans(pca_df)
-    plot_pca_clusters(pca_df, df_clustered["Cluster"])
 
-    # Build interaction regression model
-    model = build_interaction_regression_model(df_features)
+def plot_profiled_score_components(df_clean, profile):
+    # Score component histograms read from the shared column profile
+    from src.analysis.eda_components import eda_score_components
+    eda_score_components(df_clean, profile=profile)
+
+
+def build_stages() -> list:
+    # Declare the pipeline as a DAG of stages with explicit inputs and outputs
+    # (plotting and clustering modules are only imported for the full pipeline)
+    from src.analysis.eda_advanced import apply_pca, apply_kmeans
+    from src.analysis.eda_components import SCORE_COLS
+    from src.visualization_advanced import plot_interaction_effect
+
+    return [
+        stage("clean_features", load_cleaned_features, outputs=["df_clean", "df_features"],
+              fingerprint=data_fingerprint),
+        stage("profile", profile_frame, inputs=["df_clean"], outputs=["profile"]),
+        stage("plot_distributions", plot_profiled_distributions, inputs=["df_clean", "profile"],
+              files=[f"{FIGURES_DIR}/stress_sleep_distributions.png"]),
+        stage("eda_score_components", plot_profiled_score_components, inputs=["df_clean", "profile"],
+              files=[f"{FIGURES_DIR}/dist_{col}.png" for col in SCORE_COLS]
+              + [f"{FIGURES_DIR}/score_components_corr.png"]),
+        stage("correlations", compute_correlations, inputs=["df_features"], outputs=["correlations"]),
+        stage("pca", apply_pca, inputs=["df_features"], outputs=["pca_df"]),
+        stage("kmeans", apply_kmeans, inputs=["pca_df"], outputs=["df_clustered"]),
+        stage("plot_clusters", plot_clusters, inputs=["pca_df", "df_clustered"],
+              files=[f"{FIGURES_DIR}/eda_pca_kmeans.png"]),
+        stage("model", build_interaction_regression_model, inputs=["df_features"], outputs=["model"]),
+        stage("effects", extract_model_effects, inputs=["model"], outputs=["effects"]),
+        stage("summary", summarize_model, inputs=["model"], outputs=["summary"]),
+        stage("plot_interaction", plot_interaction_effect, inputs=["df_features", "model"],
+              files=[f"{FIGURES_DIR}/interaction_effect_v2.png"]),
+    ]
+
+
+# Numbers-only fast path: no plotting, clustering or statsmodels imports
+def numbers_only(cache_dir: str = DEFAULT_CACHE_DIR) -> dict:
+    logger.info("Computing correlations, model effects and summary (numbers only)")
+    _, df_features = load_cleaned_features(cache_dir=cache_dir)
+    model = build_interaction_regression_model(df_features, engine="suffstats")
+    results = {
+        "correlations": compute_correlations(df_features),
+        "effects": extract_model_effects(model),
+        "summary": summarize_model(model),
+    }
+    logger.info("Correlations: %s", results["correlations"])
+    logger.info("Model effects: %s", results["effects"])
+    logger.info("Model summary:\n%s", results["summary"])
+    return results
+
+
+# Main analysis pipeline
+def main(n_jobs=None):
+    logger.info("Starting stress-sleep-performance analysis pipeline")
 
-    # Extract and log model effects
-    effects = extract_model_effects(model)
-    logger.info("Model effects: %s", effects)
+    # Run the stages, concurrently where they are independent and skipping memoized ones
+    outputs, timings = run_pipeline(
+        build_stages(),
+        n_jobs=n_jobs,
+        targets=["correlations", "effects", "summary"],
+    )
 
-    # Summarize and plot interaction effects
-    logger.info("Model summary:\n%s", summarize_model(model))
+    # Log correlations, model effects and the model summary
+    logger.info("Correlations: %s", outputs["correlations"])
+    logger.info("Model effects: %s", outputs["effects"])
+    logger.info("Model summary:\n%s", outputs["summary"])
 
-    # Plot interaction effects
-    plot_interaction_effect(df_features, model)
+    # Log per-stage wall time
+    for record in timings:
+        logger.info("Stage %-20s %6.2fs%s", record["stage"], record["seconds"],
+                    " (cached)" if record["cached"] else "")
 
     # Final log message
     logger.info("Pipeline completed successfully")
 
 # Execute main function
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # Derived frames share unchanged columns instead of copying them
+    enable_copy_on_write()
+    parser = argparse.ArgumentParser(description="Stress-sleep-performance analysis pipeline")
+    parser.add_argument("--numbers-only", action="store_true",
+                        help="compute correlations, model effects and the summary without plotting")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes for independent stages")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="record the peak traced allocation of every instrumented stage")
+    parser.add_argument("--profile-dir", default=None, help="dump a cProfile profile of every stage here")
+    args = parser.parse_args()
+    # Instrumented stages write JSON records to logs/*_metrics.jsonl; these extras are opt-in
+    configure_instrumentation(trace_memory=args.trace_memory, profile_dir=args.profile_dir)
+    if args.numbers_only:
+        numbers_only()
+    else:
+        main(n_jobs=args.jobs)
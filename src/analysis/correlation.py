@@ -0,0 +1,103 @@
+from typing import Optional, Sequence
+import numpy as np
+import pandas as pd
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def _numeric_block(df: pd.DataFrame, columns: Optional[Sequence[str]], method: str) -> tuple:
+    # Numeric columns as one float64 array (ranked per column for Spearman)
+    if columns is None:
+        columns = list(df.select_dtypes(include="number").columns)
+    block = df[list(columns)]
+    if method == "spearman":
+        block = block.rank()
+    elif method != "pearson":
+        raise ValueError(f"Unknown correlation method: {method}")
+    return list(columns), block.to_numpy(dtype=np.float64)
+
+
+def _complete_case_corr(X: np.ndarray) -> tuple:
+    # Standardize once and correlate every pair with a single matrix product
+    X = X[~np.isnan(X).any(axis=1)]
+    n = len(X)
+    Z = X - X.mean(axis=0)
+    Z /= np.sqrt((Z * Z).sum(axis=0))
+    return Z.T @ Z, np.full((X.shape[1], X.shape[1]), n, dtype=np.float64)
+
+
+def _pairwise_corr(X: np.ndarray) -> tuple:
+    # Pairwise-complete moments from products of the zero-filled block and its mask
+    mask = ~np.isnan(X)
+    M = mask.astype(np.float64)
+    # Center and scale by the column statistics first to limit cancellation
+    Z = (X - np.nanmean(X, axis=0)) / np.nanstd(X, axis=0)
+    Z = np.where(mask, Z, 0.0)
+    n = M.T @ M
+    sums = Z.T @ M
+    squares = (Z * Z).T @ M
+    cross = Z.T @ Z
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = cross - sums * sums.T / n
+        var = squares - sums ** 2 / n
+        corr = cov / np.sqrt(var * var.T)
+    return corr, n
+
+
+def correlation_matrix(
+    df: pd.DataFrame,
+    columns: Optional[Sequence[str]] = None,
+    method: str = "pearson",
+    pairwise: bool = False,
+    alpha: float = 0.05,
+) -> dict:
+    """
+    Correlations, p-values and Fisher-z confidence intervals of all column pairs.
+
+    Returns a dict of DataFrames ("corr", "p_value", "ci_low", "ci_high", "n")
+    indexed by column. Rows with a missing value in any selected column are
+    dropped unless ``pairwise`` is set, in which case every pair uses the rows
+    where both columns are present. Spearman ranks each column over its
+    non-missing values. P-values use the same t test as ``scipy.stats.pearsonr``
+    and ``spearmanr``.
+    """
+    from scipy import special
+
+    logger.info("Computing %s correlation matrix", method.capitalize())
+    names, X = _numeric_block(df, columns, method)
+    corr, n = _pairwise_corr(X) if pairwise else _complete_case_corr(X)
+    corr = np.clip(corr, -1.0, 1.0)
+    np.fill_diagonal(corr, np.where(np.diag(n) > 1, 1.0, np.nan))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Two-sided t test with n - 2 degrees of freedom
+        df_resid = n - 2
+        t_sq = corr ** 2 * df_resid / ((1 - corr) * (1 + corr))
+        p_value = special.betainc(df_resid / 2, 0.5, np.where(df_resid > 0, df_resid / (df_resid + t_sq), np.nan))
+        # Normal interval on the Fisher z scale, mapped back to correlations
+        z = np.arctanh(corr)
+        half_width = special.ndtri(1 - alpha / 2) / np.sqrt(n - 3)
+        ci_low, ci_high = np.tanh(z - half_width), np.tanh(z + half_width)
+
+    def frame(values: np.ndarray) -> pd.DataFrame:
+        return pd.DataFrame(values, index=names, columns=names)
+
+    return {
+        "corr": frame(corr),
+        "p_value": frame(p_value),
+        "ci_low": frame(ci_low),
+        "ci_high": frame(ci_high),
+        "n": frame(n.astype(np.int64)),
+    }
+
+
+def correlation_pairs(result: dict, pairs: dict) -> dict:
+    # View named column pairs of a correlation_matrix result as {"corr", "p_value"} dicts
+    return {
+        key: {
+            "corr": float(result["corr"].at[left, right]),
+            "p_value": float(result["p_value"].at[left, right]),
+        }
+        for key, (left, right) in pairs.items()
+    }
@@ -1,18 +1,47 @@
 import os
+import time
+from typing import Optional
+import numpy as np
 import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
-from sklearn.decomposition import PCA
-from sklearn.cluster import KMeans
+from src.data_loading import DEFAULT_CHUNKSIZE, DEFAULT_DATA_PATH, iter_student_data
+from src.incremental import absorb_delta, apply_state, new_state
+from src.rendering import bin_points, draw_label_density, figure_job, render_figures, use_density
+from src.utils.instrumentation import instrument
+from src.utils.logger import get_logger
+from src.utils.memory import peak_rss_mb
+
+logger = get_logger(__name__)
+
+
+def _report_fit(name, start, n_rows, block_bytes, stats=None):
+    # Log fit time and memory, and write them into stats when a dict is passed
+    elapsed = time.perf_counter() - start
+    report = {
+        "rows": n_rows,
+        "seconds": elapsed,
+        "block_mb": block_bytes / (1024 * 1024),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    logger.info("%s: %d rows in %.2fs (largest block %.1f MB, peak RSS %.1f MB)",
+                name, n_rows, elapsed, report["block_mb"], report["peak_rss_mb"])
+    if stats is not None:
+        stats.update(report)
 
 # Advanced EDA: PCA and KMeans Clustering
-def apply_pca(df, n_components=2):
+@instrument
+def apply_pca(df, n_components=2, stats=None):
+    from sklearn.decomposition import PCA
+    from sklearn.preprocessing import StandardScaler
+
+    start = time.perf_counter()
     # Select only numeric columns for PCA
     numeric_df = df.select_dtypes(include=["int64", "float64"])
     # Standardize the data before applying PCA
+    scaled = StandardScaler().fit_transform(numeric_df)
     pca = PCA(n_components=n_components)
     # Fit and transform the data
-    components = pca.fit_transform(numeric_df)
+    components = pca.fit_transform(scaled)
+    _report_fit("PCA", start, len(scaled), scaled.nbytes, stats)
 
     # Create a DataFrame for the PCA components
     pca_df = pd.DataFrame(
@@ -22,25 +51,214 @@ def apply_pca(df, n_components=2):
     return pca_df
 
 # Apply KMeans clustering
-def apply_kmeans(df, n_clusters=3):
+@instrument
+def apply_kmeans(df, n_clusters=3, stats=None):
+    from sklearn.cluster import KMeans
+
+    start = time.perf_counter()
     # Initialize KMeans
     kmeans = KMeans(n_clusters=n_clusters, random_state=42)
     # Fit and predict clusters
     clusters = kmeans.fit_predict(df)
-    df_clustered = df.copy()
-    df_clustered["Cluster"] = clusters
+    _report_fit("KMeans", start, len(df), df.to_numpy().nbytes, stats)
+    # New frame sharing the component columns (copy-on-write)
+    return df.assign(Cluster=clusters)
+
+
+
+def _next_centroids(X, centers, rng):
+    # Warm start for k + 1 clusters: keep the previous centroids and add one by
+    # greedy D^2 sampling (the candidate that lowers the inertia most, as in k-means++)
+    distances = np.min([((X - center) ** 2).sum(axis=1) for center in centers], axis=0)
+    if distances.sum() == 0:
+        return np.vstack([centers, X[rng.integers(len(X))]])
+    n_trials = 2 + int(np.log(len(centers) + 1))
+    candidates = rng.choice(len(X), size=n_trials, p=distances / distances.sum())
+    potentials = [np.minimum(distances, ((X - X[i]) ** 2).sum(axis=1)).sum() for i in candidates]
+    return np.vstack([centers, X[candidates[int(np.argmin(potentials))]]])
+
+
+def _kmeans_sweep_task(X, sample_index, warm_start, task):
+    # Fit KMeans for one seed and a run of cluster counts, scoring each fit
+    from sklearn.cluster import KMeans
+    from sklearn.metrics import calinski_harabasz_score, silhouette_score
+
+    seed, ks = task
+    rng = np.random.default_rng(seed)
+    sample = X[sample_index]
+    rows, centers = [], None
+    for k in ks:
+        start = time.perf_counter()
+        if warm_start and centers is not None and len(centers) == k - 1:
+            kmeans = KMeans(n_clusters=k, init=_next_centroids(X, centers, rng), n_init=1)
+        else:
+            kmeans = KMeans(n_clusters=k, n_init=1, random_state=seed)
+        kmeans.fit(X)
+        centers = kmeans.cluster_centers_
+        labels = kmeans.labels_[sample_index]
+        # Scores on the fixed sample keep the cost bounded on large data
+        scorable = len(np.unique(labels)) > 1
+        rows.append({
+            "n_clusters": k,
+            "seed": seed,
+            "inertia": kmeans.inertia_,
+            "silhouette": silhouette_score(sample, labels) if scorable else np.nan,
+            "calinski_harabasz": calinski_harabasz_score(sample, labels) if scorable else np.nan,
+            "n_iter": kmeans.n_iter_,
+            "seconds": time.perf_counter() - start,
+            "model": kmeans,
+        })
+    return rows
+
+
+def sweep_kmeans(
+    df: pd.DataFrame,
+    k_values=range(2, 9),
+    seeds=(42,),
+    sample_size: int = 5000,
+    warm_start: bool = True,
+    n_jobs: Optional[int] = 1,
+) -> dict:
+    """
+    Choose the number of KMeans clusters for ``apply_pca`` output.
+
+    Every (seed, k) pair is fitted and scored by inertia, silhouette and
+    Calinski-Harabasz, the last two on one fixed random sample of at most
+    ``sample_size`` rows. With ``warm_start`` each seed sweeps k upwards,
+    starting from the previous centroids plus one new centroid, and seeds run
+    in parallel; otherwise every (seed, k) fit is its own parallel task. The k
+    with the best mean silhouette is chosen, using its lowest-inertia seed.
+    Returns ``{"n_clusters", "model", "scores"}``.
+    """
+    from functools import partial
+    from src.utils.parallel import imap_bounded
+
+    X = df.to_numpy(dtype=np.float64)
+    k_values = sorted(k_values)
+    sample_index = np.random.default_rng(0).choice(len(X), min(sample_size, len(X)), replace=False)
+    if warm_start:
+        tasks = [(seed, k_values) for seed in seeds]
+    else:
+        tasks = [(seed, [k]) for seed in seeds for k in k_values]
+    func = partial(_kmeans_sweep_task, X, sample_index, warm_start)
+    start = time.perf_counter()
+    rows = [row for task_rows in imap_bounded(func, tasks, n_jobs=n_jobs) for row in task_rows]
+    logger.info("Swept %d KMeans fits in %.2fs", len(rows), time.perf_counter() - start)
+
+    scores = pd.DataFrame(rows)
+    best_k = scores.groupby("n_clusters")["silhouette"].mean().idxmax()
+    best = scores.loc[scores.loc[scores["n_clusters"] == best_k, "inertia"].idxmin()]
+    logger.info("Chose %d clusters (silhouette %.3f)", best_k, best["silhouette"])
+    return {
+        "n_clusters": int(best_k),
+        "model": best["model"],
+        "scores": scores.drop(columns="model").sort_values(["n_clusters", "seed"], ignore_index=True),
+    }
+
+def stream_pca_kmeans(
+    data_path: str = DEFAULT_DATA_PATH,
+    n_components: int = 2,
+    n_clusters: int = 3,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    state: Optional[dict] = None,
+    dtype=np.float32,
+    stats: Optional[dict] = None,
+) -> pd.DataFrame:
+    """
+    Out-of-core version of ``apply_pca`` followed by ``apply_kmeans``.
+
+    Chunks from the loader are cleaned and feature-engineered with the running
+    incremental ``state`` (computed in a first pass when not given). Then the
+    numeric columns are standardized with running statistics, and
+    ``IncrementalPCA`` and ``MiniBatchKMeans`` are fitted chunk by chunk.
+    A last pass projects every chunk and assigns its clusters. Only one chunk
+    is held at a time, stored as ``dtype``. The result has the PC columns and
+    ``Cluster``, like ``apply_kmeans(apply_pca(df))``. Incremental PCA keeps
+    only ``n_components`` directions between chunks, so components whose
+    variances are close can differ slightly from the in-memory fit.
+    """
+    from sklearn.cluster import MiniBatchKMeans
+    from sklearn.decomposition import IncrementalPCA
+    from sklearn.preprocessing import StandardScaler
+
+    start = time.perf_counter()
+    if state is None:
+        state = absorb_delta(new_state(), data_path, chunksize)
+    columns = []
+
+    def blocks():
+        # Cleaned numeric block of each chunk, with the column set of the first chunk
+        for chunk in iter_student_data(data_path, chunksize=chunksize):
+            chunk = apply_state(chunk, state)
+            if not columns:
+                columns.extend(chunk.select_dtypes(include=["int64", "float64"]).columns)
+            yield chunk[columns].to_numpy(dtype=dtype)
+
+    # Pass 1: running mean and variance of every column
+    scaler = StandardScaler()
+    for block in blocks():
+        scaler.partial_fit(block)
+    # Pass 2: incremental PCA on the standardized chunks
+    pca = IncrementalPCA(n_components=n_components)
+    for block in blocks():
+        # partial_fit needs at least n_components rows (only a short last chunk is skipped)
+        if len(block) >= n_components:
+            pca.partial_fit(scaler.transform(block))
+    # Pass 3: mini-batch k-means on the projected chunks
+    kmeans = MiniBatchKMeans(n_clusters=n_clusters, random_state=42, n_init=3)
+    for block in blocks():
+        if len(block) >= n_clusters:
+            kmeans.partial_fit(pca.transform(scaler.transform(block)).astype(dtype))
+    # Pass 4: project and assign every chunk
+    parts, largest = [], 0
+    for block in blocks():
+        components = pca.transform(scaler.transform(block)).astype(dtype)
+        part = pd.DataFrame(components, columns=[f"PC{i+1}" for i in range(n_components)])
+        part["Cluster"] = kmeans.predict(components).astype(np.int32)
+        parts.append(part)
+        largest = max(largest, block.nbytes)
+    df_clustered = pd.concat(parts, ignore_index=True)
+    _report_fit("Streaming PCA + MiniBatchKMeans", start, len(df_clustered), largest, stats)
     return df_clustered
 
-# Plot PCA results with clusters
-def plot_pca_clusters(pca_df, clusters, output_dir="figures"):
-    os.makedirs(output_dir, exist_ok=True)
-    plt.figure(figsize=(8, 6))
+# Draw the PCA scatter colored by cluster on the given figure
+def draw_pca_clusters(fig, df):
+    import seaborn as sns
+
+    ax = fig.subplots()
     sns.scatterplot(
-        x=pca_df["PC1"],
-        y=pca_df["PC2"],
-        hue=clusters,
-        palette="viridis"
+        x=df["PC1"],
+        y=df["PC2"],
+        hue=df["Cluster"],
+        palette="viridis",
+        ax=ax
     )
-    plt.title("PCA + KMeans Clusters")
-    plt.savefig(f"{output_dir}/eda_pca_kmeans.png")
-    plt.close()
\ No newline at end of file
+    ax.set_title("PCA + KMeans Clusters")
+
+# Draw the binned PCA raster colored by the dominant cluster of each cell
+def draw_pca_cluster_density(fig, grid):
+    ax = fig.subplots()
+    draw_label_density(ax, grid, palette="viridis", title="Cluster")
+    ax.set_xlabel("PC1")
+    ax.set_ylabel("PC2")
+    ax.set_title("PCA + KMeans Clusters")
+
+# Plot PCA results with clusters
+# (density=None switches to a binned raster above DENSITY_ROW_THRESHOLD rows)
+@instrument
+def plot_pca_clusters(pca_df, clusters, output_dir="figures", density=None):
+    os.makedirs(output_dir, exist_ok=True)
+    if use_density(len(pca_df), density):
+        # Ship only the binned grid to the renderer
+        draw = draw_pca_cluster_density
+        data = bin_points(pca_df["PC1"], pca_df["PC2"], labels=np.asarray(clusters))
+    else:
+        # Ship only the two components and the labels to the renderer
+        draw = draw_pca_clusters
+        data = pca_df[["PC1", "PC2"]].assign(Cluster=np.asarray(clusters))
+    render_figures([figure_job(
+        draw,
+        data,
+        f"{output_dir}/eda_pca_kmeans.png",
+        figsize=(8, 6),
+    )])
@@ -1,41 +1,86 @@
 import os
-import seaborn as sns
-import matplotlib.pyplot as plt
-from sklearn.decomposition import PCA
-from sklearn.cluster import KMeans
 import pandas as pd
+from src.analysis.correlation import correlation_matrix
+from src.column_profile import box_stats, ensure_profile
+from src.rendering import figure_job, render_figures
+from src.utils.instrumentation import instrument
 
-def eda_distributions(df, output_dir="figures"):
+# Rows drawn and fitted by the regression pairplot of large frames
+PAIRPLOT_SAMPLE_SIZE = 5000
+
+
+# Centered stress and sleep columns drawn as box plots
+BOXPLOT_COLUMNS = ["Stress_Level_c", "Sleep_Hours_c"]
+
+
+def draw_boxplots(fig, stats, fliers):
+    # Boxplot for stress and sleep variables from precomputed box statistics
+    ax = fig.subplots()
+    ax.bxp([{**row, "label": label, "fliers": fliers[label]} for label, row in stats.iterrows()])
+    ax.set_title("Stress & Sleep Distributions")
+
+
+def draw_pairplot(fig, df):
+    import seaborn as sns
+
+    # Pairplot builds its own figure, which is returned for saving
+    return sns.pairplot(df, kind="reg").figure
+
+
+def draw_correlation(fig, corr):
+    import seaborn as sns
+
+    # Draw correlation heatmap
+    ax = fig.subplots()
+    sns.heatmap(corr, cmap="coolwarm", ax=ax)
+    ax.set_title("Correlation Heatmap")
+
+
+@instrument
+def eda_distributions(df, output_dir="figures", profile=None):
     """Basic distributions and outliers."""
     # Create output directory if it doesn't exist
     os.makedirs(output_dir, exist_ok=True)
-    # Set figure size
-    plt.figure(figsize=(10, 4))
-    # Boxplot for stress and sleep variables
-    sns.boxplot(data=df[["Stress_Level_c", "Sleep_Hours_c"]])
-    plt.title("Stress & Sleep Distributions")
-    plt.savefig(f"{output_dir}/eda_distributions.png")
-    plt.close()
+    # Quartiles, whiskers and outliers come from the column profile, not the rows
+    profile = ensure_profile(df, profile, BOXPLOT_COLUMNS)
+    stats = [box_stats(profile, col) for col in BOXPLOT_COLUMNS]
+    render_figures([figure_job(
+        draw_boxplots,
+        pd.DataFrame([{key: s[key] for key in ("med", "q1", "q3", "whislo", "whishi")} for s in stats],
+                     index=BOXPLOT_COLUMNS),
+        f"{output_dir}/eda_distributions.png",
+        params={"fliers": {s["label"]: s["fliers"] for s in stats}},
+        figsize=(10, 4),
+    )])
 
 
-def eda_pairplot(df, output_dir="figures"):
+@instrument
+def eda_pairplot(df, output_dir="figures", sample_size=PAIRPLOT_SAMPLE_SIZE):
     """Quick look at linearity between variables."""
     # Ensure output directory exists
     os.makedirs(output_dir, exist_ok=True)
+    # Scatter and fit the regression lines on a fixed random sample of large
+    # frames, so figure time does not grow with the row count (None uses all rows)
+    if sample_size is not None and len(df) > sample_size:
+        df = df.sample(n=sample_size, random_state=0)
     # Create pairplot with regression lines
-    sns.pairplot(df[["Stress_Level_c", "Sleep_Hours_c", "Total_Score"]], kind="reg")
-    plt.savefig(f"{output_dir}/eda_pairplot.png")
-    plt.close()
+    render_figures([figure_job(
+        draw_pairplot,
+        df,
+        f"{output_dir}/eda_pairplot.png",
+        columns=["Stress_Level_c", "Sleep_Hours_c", "Total_Score"],
+    )])
 
 
+@instrument
 def eda_correlation(df, output_dir="figures"):
     """Correlation heatmap."""
     # Ensure output directory exists
     os.makedirs(output_dir, exist_ok=True)
-    # Set figure size
-    plt.figure(figsize=(8, 6))
-    # Draw correlation heatmap
-    sns.heatmap(df.corr(numeric_only=True), cmap="coolwarm")
-    plt.title("Correlation Heatmap")
-    plt.savefig(f"{output_dir}/eda_correlation.png")
-    plt.close()
\ No newline at end of file
+    # Only the correlation matrix is shipped to the renderer
+    render_figures([figure_job(
+        draw_correlation,
+        correlation_matrix(df)["corr"],
+        f"{output_dir}/eda_correlation.png",
+        figsize=(8, 6),
+    )])
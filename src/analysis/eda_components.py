@@ -1,39 +1,68 @@
 import os
-import seaborn as sns
-import matplotlib.pyplot as plt
+from src.column_profile import distribution_points, ensure_profile, histogram_edges
+from src.rendering import figure_job, render_figures
+from src.utils.instrumentation import instrument
 
-def eda_score_components(df, output_dir="figures"):
+# Columns representing different score components
+SCORE_COLS = [
+    "Midterm_Score",
+    "Final_Score",
+    "Assignments_Avg",
+    "Quizzes_Avg",
+    "Participation_Score",
+    "Projects_Score",
+    "Total_Score"
+]
+
+def draw_score_distribution(fig, points, col, bins):
+    import seaborn as sns
+
+    # Histogram with KDE of a single score component from its profiled (value, count) pairs
+    ax = fig.subplots()
+    sns.histplot(x=points["value"], weights=points["weight"], bins=bins, kde=True, ax=ax)
+    ax.set_xlabel(col)
+    ax.set_title(f"Distribution of {col}")
+
+def draw_score_correlation(fig, corr):
+    import seaborn as sns
+
+    # Annotated heatmap of a precomputed correlation matrix
+    ax = fig.subplots()
+    sns.heatmap(corr, annot=True, cmap="coolwarm", ax=ax)
+    ax.set_title("Correlation Between Score Components")
+
+@instrument
+def eda_score_components(df, output_dir="figures", n_jobs=1, profile=None):
     """
     Perform EDA on the components contributing to Total_Score.
-    Generates distribution plots and a correlation heatmap.
+    Generates distribution plots and a correlation heatmap
+    (rendered in a process pool when n_jobs > 1). The distributions are
+    drawn from a column profile of df (built when none is passed).
     """
     # Ensure output directory exists
     os.makedirs(output_dir, exist_ok=True)
+    profile = ensure_profile(df, profile, SCORE_COLS)
 
-    # Columns representing different score components
-    score_cols = [
-        "Midterm_Score",
-        "Final_Score",
-        "Assignments_Avg",
-        "Quizzes_Avg",
-        "Participation_Score",
-        "Projects_Score",
-        "Total_Score"
+    # 1) Plot distribution of each score component (each job ships one column's profile)
+    jobs = [
+        figure_job(
+            draw_score_distribution,
+            distribution_points(profile, [col]),
+            f"{output_dir}/dist_{col}.png",
+            params={"col": col, "bins": histogram_edges(profile, col).tolist()},
+            figsize=(6, 4),
+            tight_layout=True,
+        )
+        for col in SCORE_COLS
     ]
 
-    # 1) Plot distribution of each score component
-    for col in score_cols:
-        plt.figure(figsize=(6, 4))
-        sns.histplot(df[col], kde=True)
-        plt.title(f"Distribution of {col}")
-        plt.tight_layout()
-        plt.savefig(f"{output_dir}/dist_{col}.png")
-        plt.close()
-
-    # 2) Correlation heatmap of score components
-    plt.figure(figsize=(8, 6))
-    sns.heatmap(df[score_cols].corr(), annot=True, cmap="coolwarm")
-    plt.title("Correlation Between Score Components")
-    plt.tight_layout()
-    plt.savefig(f"{output_dir}/score_components_corr.png")
-    plt.close()
\ No newline at end of file
+    # 2) Correlation heatmap of score components (only the matrix is shipped)
+    jobs.append(figure_job(
+        draw_score_correlation,
+        df[SCORE_COLS].corr(),
+        f"{output_dir}/score_components_corr.png",
+        figsize=(8, 6),
+        tight_layout=True,
+    ))
+
+    render_figures(jobs, n_jobs=n_jobs)
@@ -1,42 +1,25 @@
+from types import SimpleNamespace
 import pandas as pd
-from scipy.stats import pearsonr
+from src.analysis.correlation import correlation_matrix, correlation_pairs
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Column pairs reported by compute_correlations
+CORRELATION_PAIRS = {
+    "stress_total": ("Stress_Level_c", "Total_Score"),
+    "sleep_total": ("Sleep_Hours_c", "Total_Score"),
+    "stress_sleep": ("Stress_Level_c", "Sleep_Hours_c"),
+}
+
+
 def compute_correlations(df: pd.DataFrame) -> dict:
     # log start of correlation computation
     logger.info("Computing Pearson correlations")
-    # Correlation: stress vs total score
-    stress_total_corr, stress_total_p = pearsonr(
-        df["Stress_Level_c"],
-        df["Total_Score"]
-    )
-    # Correlation: sleep vs total score
-    sleep_total_corr, sleep_total_p = pearsonr(
-        df["Sleep_Hours_c"],
-        df["Total_Score"]
-    )
-    # Correlation: stress vs sleep
-    stress_sleep_corr, stress_sleep_p = pearsonr(
-        df["Stress_Level_c"],
-        df["Sleep_Hours_c"]
-    )
+    # One correlation matrix over stress, sleep and total score
+    result = correlation_matrix(df, ["Stress_Level_c", "Sleep_Hours_c", "Total_Score"])
     # return all correlations and p-values in a dictionary
-    return {
-        "stress_total": {
-            "corr": stress_total_corr,
-            "p_value": stress_total_p
-        },
-        "sleep_total": {
-            "corr": sleep_total_corr,
-            "p_value": sleep_total_p
-        },
-        "stress_sleep": {
-            "corr": stress_sleep_corr,
-            "p_value": stress_sleep_p
-        },
-    }
+    return correlation_pairs(result, CORRELATION_PAIRS)
 
 def extract_model_effects(model) -> dict:
     # log start of model coefficient extraction
@@ -57,4 +40,36 @@ def extract_model_effects(model) -> dict:
             "coef": params.get("Stress_Sleep_Interaction_c"),
             "p_value": pvalues.get("Stress_Sleep_Interaction_c")
         },
-    }
\ No newline at end of file
+    }
+
+def extract_resampled_effects(result: dict) -> dict:
+    # log start of resampled effect extraction
+    logger.info("Extracting %s intervals and p-values", result["method"])
+    keys = {
+        "beta_stress": "Stress_Level_c",
+        "beta_sleep": "Sleep_Hours_c",
+        "beta_interaction": "Stress_Sleep_Interaction_c",
+    }
+    # return the coefficient with its bootstrap interval or permutation p-value
+    effects = {}
+    for key, name in keys.items():
+        effects[key] = {"coef": result["params"].get(name)}
+        if "p_value" in result:
+            effects[key]["p_value"] = result["p_value"].get(name)
+        if "ci_low" in result:
+            effects[key]["ci_low"] = result["ci_low"].get(name)
+            effects[key]["ci_high"] = result["ci_high"].get(name)
+    return effects
+
+
+def extract_multi_outcome_effects(result: dict) -> dict:
+    # log start of per-outcome effect extraction
+    logger.info("Extracting model coefficients and p-values per outcome")
+    # return the extract_model_effects dict of every outcome column
+    return {
+        outcome: extract_model_effects(SimpleNamespace(
+            params=result["params"][outcome],
+            pvalues=result["pvalues"][outcome],
+        ))
+        for outcome in result["params"].columns
+    }
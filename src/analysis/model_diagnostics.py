@@ -1,42 +1,112 @@
 import os
-import seaborn as sns
-import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
-from statsmodels.stats.outliers_influence import variance_inflation_factor
+from src.rendering import bin_points, draw_density, figure_job, render_figures, use_density
+from src.sufficient_stats import CONST_NAME, compute_ols_stats
+from src.utils.instrumentation import instrument
 
 
-def plot_regression_diagnostics(model, output_dir="figures"):
-    # Create output directory if it doesn't exist
-    os.makedirs(output_dir, exist_ok=True)
-    # extract residuals and fitted (predicted) values from the model
-    residuals = model.resid
-    fitted = model.fittedvalues
+def draw_regression_diagnostics(fig, df):
+    import seaborn as sns
 
-    plt.figure(figsize=(10, 4))
+    ax_scatter, ax_hist = fig.subplots(1, 2)
     # Residuals vs Fitted plot
-    plt.subplot(1, 2, 1)
-    sns.scatterplot(x=fitted, y=residuals)
-    plt.axhline(0, color="red")
-    plt.title("Residuals vs Fitted")
+    sns.scatterplot(x=df["fitted"], y=df["residuals"], ax=ax_scatter)
+    ax_scatter.axhline(0, color="red")
+    ax_scatter.set_title("Residuals vs Fitted")
     # Histogram of residuals
-    plt.subplot(1, 2, 2)
-    sns.histplot(residuals, kde=True)
-    plt.title("Residual Distribution")
+    sns.histplot(df["residuals"], kde=True, ax=ax_hist)
+    ax_hist.set_title("Residual Distribution")
+
+
+def draw_regression_diagnostics_density(fig, grid):
+    ax_scatter, ax_hist = fig.subplots(1, 2)
+    # Residuals vs Fitted as a binned density raster
+    draw_density(ax_scatter, grid)
+    ax_scatter.axhline(0, color="red")
+    ax_scatter.set_xlabel("fitted")
+    ax_scatter.set_ylabel("residuals")
+    ax_scatter.set_title("Residuals vs Fitted")
+    # Histogram of residuals from the raster's row margins
+    margin = grid.groupby("y", sort=True)["count"].sum()
+    ax_hist.bar(margin.index, margin.to_numpy(), width=np.diff(margin.index).mean())
+    ax_hist.set_xlabel("residuals")
+    ax_hist.set_title("Residual Distribution")
+
+
+@instrument
+def plot_regression_diagnostics(model, output_dir="figures", density=None):
+    # Create output directory if it doesn't exist
+    os.makedirs(output_dir, exist_ok=True)
+    # extract residuals and fitted (predicted) values from the model
+    data = pd.DataFrame({"fitted": model.fittedvalues, "residuals": model.resid})
+    draw = draw_regression_diagnostics
+    # Above DENSITY_ROW_THRESHOLD rows (or with density=True) only a binned grid is drawn
+    if use_density(len(data), density):
+        draw = draw_regression_diagnostics_density
+        data = bin_points(data["fitted"], data["residuals"])
     # Adjust layout and save figure
-    plt.tight_layout()
-    plt.savefig(f"{output_dir}/regression_diagnostics.png")
-    plt.close()
+    render_figures([figure_job(
+        draw,
+        data,
+        f"{output_dir}/regression_diagnostics.png",
+        figsize=(10, 4),
+        tight_layout=True,
+    )])
+
+
+def gram_stats(df, features):
+    # Sufficient statistics (X'X with a constant, n) of the feature columns of one frame or chunk
+    X = np.column_stack([np.ones(len(df)), df[features].to_numpy(dtype=np.float64)])
+    return compute_ols_stats(X, np.zeros(len(df)), [CONST_NAME] + list(features))
+
+
+def collinearity_diagnostics(df=None, features=None, stats=None):
+    """
+    VIFs, condition indices and variance-decomposition proportions.
+
+    Works from ``stats`` (X'X with a ``const`` column and n, as returned by
+    ``gram_stats`` or ``compute_ols_stats`` and merged across chunks with
+    ``merge_ols_stats``) or from ``df[features]``. All VIFs come from the
+    diagonal of the inverse predictor correlation matrix, which equals one
+    auxiliary regression per column. Condition indices and proportions follow
+    Belsley: eigen-decomposition of the unit-length scaled X'X, constant included.
+    Returns ``{"vif": DataFrame, "condition": DataFrame}``.
+    """
+    if stats is None:
+        stats = gram_stats(df, features)
+    names = list(stats["names"])
+    if CONST_NAME not in names:
+        raise ValueError("Collinearity diagnostics need statistics that include a constant column")
+    xtx, n = np.asarray(stats["xtx"], dtype=np.float64), stats["n"]
+    c = names.index(CONST_NAME)
+    predictors = [i for i in range(len(names)) if i != c]
+
+    # Predictor covariance and correlation from the Gram matrix
+    means = xtx[c, predictors] / n
+    cov = (xtx[np.ix_(predictors, predictors)] - n * np.outer(means, means)) / (n - 1)
+    scale = np.sqrt(np.diag(cov))
+    corr = cov / np.outer(scale, scale)
+    vif = pd.DataFrame({
+        "feature": [names[i] for i in predictors],
+        "VIF": np.diag(np.linalg.pinv(corr, hermitian=True)),
+    })
+
+    # Belsley diagnostics on the columns of X scaled to unit length
+    unit = 1 / np.sqrt(np.diag(xtx))
+    eigenvalues, eigenvectors = np.linalg.eigh(xtx * np.outer(unit, unit))
+    order = np.argsort(eigenvalues)[::-1]
+    eigenvalues, eigenvectors = np.clip(eigenvalues[order], 0, None), eigenvectors[:, order]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        phi = eigenvectors ** 2 / eigenvalues
+        proportions = phi / phi.sum(axis=1, keepdims=True)
+        condition_index = np.sqrt(eigenvalues[0] / eigenvalues)
+    condition = pd.DataFrame(proportions.T, columns=names)
+    condition.insert(0, "condition_index", condition_index)
+    condition.insert(0, "eigenvalue", eigenvalues)
+    return {"vif": vif, "condition": condition}
 
 
 def compute_vif(df, features):
-    # add constant column for VIF computation
-    X = df[features].assign(const=1)
-    # create empty DataFrame for VIF results
-    vif = pd.DataFrame()
-    vif["feature"] = X.columns
-    # compute VIF for each feature
-    vif["VIF"] = [
-        variance_inflation_factor(X.values, i)
-        for i in range(X.shape[1])
-    ]
-    return vif
\ No newline at end of file
+    # VIF of every feature (no constant row), all at once from the correlation matrix
+    return collinearity_diagnostics(df, features)["vif"]
@@ -0,0 +1,231 @@
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import Optional, Tuple
+import numpy as np
+import pandas as pd
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Base directory of the project
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))
+
+# Default location and size bound of the frame cache
+DEFAULT_CACHE_DIR = os.path.join(BASE_DIR, ".cache")
+DEFAULT_MAX_BYTES = 1024 ** 3
+
+# Name of the manifest describing a cached frame
+MANIFEST_NAME = "manifest.json"
+
+# Name used for the index entry in the manifest
+INDEX_NAME = "__index__"
+
+
+def file_digest(path: str, block_size: int = 1024 ** 2) -> str:
+    # Hash the file content in blocks so large exports never sit in memory
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def code_version(*modules) -> str:
+    # Hash the source files of the modules whose output is being cached
+    digest = hashlib.sha256()
+    for module in modules:
+        module = sys.modules[module] if isinstance(module, str) else module
+        with open(module.__file__, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def make_cache_key(*parts: str) -> str:
+    # Combine content hashes, code versions and stage names into one key
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+
+def _save_array(entry_dir: str, name: str, values: np.ndarray) -> None:
+    np.save(os.path.join(entry_dir, name), values, allow_pickle=False)
+
+
+def _encode_column(entry_dir: str, position: int, series: pd.Series) -> dict:
+    # Store one column as .npy blocks and return its manifest record
+    dtype = series.dtype
+    record = {"name": series.name, "dtype": str(dtype), "file": f"{position}.npy"}
+
+    if isinstance(dtype, pd.CategoricalDtype):
+        # Categoricals keep their codes and categories as separate blocks
+        record.update(kind="categorical", categories=f"{position}_categories.npy", ordered=bool(dtype.ordered))
+        _save_array(entry_dir, record["file"], series.cat.codes.to_numpy())
+        categories = dtype.categories.to_numpy()
+        if categories.dtype == object:
+            categories = categories.astype(str)
+        _save_array(entry_dir, record["categories"], categories)
+    elif isinstance(dtype, np.dtype) and dtype.kind in "biufcM":
+        # Plain numeric, boolean and naive datetime columns are stored as-is
+        record["kind"] = "array"
+        _save_array(entry_dir, record["file"], series.to_numpy())
+    else:
+        # Strings and other objects become integer codes plus fixed-width uniques
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        record.update(kind="factorized", categories=f"{position}_categories.npy")
+        _save_array(entry_dir, record["file"], codes.astype(np.int32))
+        _save_array(entry_dir, record["categories"], np.asarray(uniques, dtype=str))
+    return record
+
+
+def _decode_column(entry_dir: str, record: dict, mmap_mode: Optional[str]) -> pd.Series:
+    # Rebuild one column from its .npy blocks
+    values = np.load(os.path.join(entry_dir, record["file"]), mmap_mode=mmap_mode)
+    if record["kind"] == "array":
+        # View the memory map as a plain ndarray so pandas treats it like any other block
+        return pd.Series(values.view(np.ndarray), name=record["name"], copy=False)
+
+    categories = np.load(os.path.join(entry_dir, record["categories"]))
+    if record["kind"] == "categorical":
+        dtype = pd.CategoricalDtype(categories, ordered=record["ordered"])
+        return pd.Series(pd.Categorical.from_codes(values, dtype=dtype), name=record["name"])
+
+    column = pd.Series(pd.Categorical.from_codes(values, categories=categories), name=record["name"])
+    return column.astype(record["dtype"])
+
+
+def save_frame(df: pd.DataFrame, entry_dir: str) -> None:
+    """Write a DataFrame as one .npy block per column plus a JSON manifest."""
+    parent = os.path.dirname(entry_dir)
+    os.makedirs(parent, exist_ok=True)
+    # Write into a temporary directory first so readers never see a partial entry
+    tmp_dir = tempfile.mkdtemp(dir=parent, prefix=".tmp-")
+    try:
+        index = pd.Series(df.index, name=INDEX_NAME)
+        manifest = {
+            "index": None if df.index.equals(pd.RangeIndex(len(df))) else _encode_column(tmp_dir, "index", index),
+            "n_rows": len(df),
+            "columns": [_encode_column(tmp_dir, i, df.iloc[:, i]) for i in range(df.shape[1])],
+        }
+        with open(os.path.join(tmp_dir, MANIFEST_NAME), "w") as f:
+            json.dump(manifest, f)
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        os.replace(tmp_dir, entry_dir)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+
+def load_frame(entry_dir: str, mmap_mode: Optional[str] = "r") -> pd.DataFrame:
+    """Load a DataFrame written by ``save_frame``, memory-mapping numeric blocks."""
+    with open(os.path.join(entry_dir, MANIFEST_NAME)) as f:
+        manifest = json.load(f)
+
+    columns = [_decode_column(entry_dir, record, mmap_mode) for record in manifest["columns"]]
+    df = pd.concat(columns, axis=1) if columns else pd.DataFrame(index=pd.RangeIndex(manifest["n_rows"]))
+    if manifest["index"] is not None:
+        df.index = pd.Index(_decode_column(entry_dir, manifest["index"], mmap_mode), name=None)
+    return df
+
+
+def _entry_size(entry_dir: str) -> int:
+    return sum(entry.stat().st_size for entry in os.scandir(entry_dir) if entry.is_file())
+
+
+def _list_entries(cache_dir: str) -> list:
+    # Return complete cache entries (temporary write directories are skipped)
+    if not os.path.isdir(cache_dir):
+        return []
+    return [
+        entry.path for entry in os.scandir(cache_dir)
+        if entry.is_dir() and os.path.exists(os.path.join(entry.path, MANIFEST_NAME))
+    ]
+
+
+def cache_get(key: str, cache_dir: str = DEFAULT_CACHE_DIR) -> Optional[pd.DataFrame]:
+    # Return the cached frame for a key, or None on a cache miss
+    entry_dir = os.path.join(cache_dir, key)
+    if not os.path.exists(os.path.join(entry_dir, MANIFEST_NAME)):
+        return None
+    # Touch the entry so eviction treats it as recently used
+    os.utime(entry_dir)
+    return load_frame(entry_dir)
+
+
+def cache_put(
+    key: str,
+    df: pd.DataFrame,
+    cache_dir: str = DEFAULT_CACHE_DIR,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+) -> None:
+    # Store a frame under a key and evict old entries beyond the size bound
+    save_frame(df, os.path.join(cache_dir, key))
+    evict_cache(cache_dir, max_bytes)
+
+
+def evict_cache(cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+    # Remove least recently used entries until the cache fits in max_bytes
+    entries = sorted(_list_entries(cache_dir), key=os.path.getmtime)
+    sizes = {entry: _entry_size(entry) for entry in entries}
+    total = sum(sizes.values())
+    while entries and total > max_bytes:
+        oldest = entries.pop(0)
+        total -= sizes[oldest]
+        shutil.rmtree(oldest, ignore_errors=True)
+        logger.info("Evicted cache entry %s", os.path.basename(oldest))
+
+
+def clear_cache(cache_dir: str = DEFAULT_CACHE_DIR, key: Optional[str] = None) -> None:
+    # Force invalidation of one entry, or of the whole cache when no key is given
+    targets = [os.path.join(cache_dir, key)] if key is not None else _list_entries(cache_dir)
+    for target in targets:
+        shutil.rmtree(target, ignore_errors=True)
+    logger.info("Invalidated %d cache entries in %s", len(targets), cache_dir)
+
+
+def load_cleaned_features(
+    data_path: Optional[str] = None,
+    cache_dir: str = DEFAULT_CACHE_DIR,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    refresh: bool = False,
+    compact: bool = False,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Return the cleaned and feature-engineered frames for a data file.
+
+    Both frames are cached under a key built from the file content hash and
+    the source of the cleaning and feature-engineering modules, so editing
+    either the data or that code invalidates the entry. ``refresh=True``
+    forces a rebuild. ``compact=True`` builds the memory-compact variant
+    (see ``src.compaction``), cached under its own key.
+    """
+    from src import compaction, data_cleaning, data_loading, feature_engineering, type_inference
+
+    if data_path is None:
+        data_path = data_loading.DEFAULT_DATA_PATH
+
+    start = time.perf_counter()
+    source_hash = file_digest(data_path)
+    clean_key = make_cache_key(source_hash, code_version(data_cleaning, type_inference, compaction),
+                               "clean-compact" if compact else "clean")
+    features_key = make_cache_key(clean_key, code_version(feature_engineering), "features")
+
+    if refresh:
+        clear_cache(cache_dir, clean_key)
+        clear_cache(cache_dir, features_key)
+
+    df_clean = cache_get(clean_key, cache_dir)
+    df_features = cache_get(features_key, cache_dir)
+    if df_clean is not None and df_features is not None:
+        logger.info("Loaded cleaned and engineered frames from cache in %.3fs", time.perf_counter() - start)
+        return df_clean, df_features
+
+    # Cache miss: run the full load, cleaning and feature engineering stages
+    df_clean = data_cleaning.clean_full_dataset(data_loading.load_student_data(data_path), compact=compact)
+    df_features = feature_engineering.engineer_features(df_clean)
+    cache_put(clean_key, df_clean, cache_dir, max_bytes)
+    cache_put(features_key, df_features, cache_dir, max_bytes)
+    logger.info("Built and cached cleaned and engineered frames in %.3fs", time.perf_counter() - start)
+    return df_clean, df_features
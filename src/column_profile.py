@@ -0,0 +1,264 @@
+"""
+Mergeable, serializable column profiles.
+
+A profile summarizes every column of a frame in one pass. Numeric columns
+(``profile["numeric"]``) keep the value and missing counts, the sum, the sum
+of squared deviations from the mean (``m2``) and a quantile sketch that also
+tracks the minimum and maximum; other columns (``profile["categorical"]``)
+keep the missing count and the frequency of every value. Profiles of
+disjoint chunks of rows merge exactly, except that quantiles become
+approximate once a column has more distinct values than the sketch size
+(``EXACT_SKETCH_SIZE`` never compresses).
+
+Missing-value plans, outlier fences, summary statistics, top categories,
+fixed-bin histograms and box-plot statistics are all read from a profile
+instead of rescanning the rows.
+"""
+import pickle
+from collections import Counter
+from typing import Optional, Sequence, Union
+import numpy as np
+import pandas as pd
+from src.quantile_sketch import (
+    DEFAULT_SKETCH_SIZE, merge_sketches, sketch_from_values, sketch_median, sketch_quantiles,
+)
+
+# Columns with a larger share of missing values are dropped
+MAX_MISSING_RATIO = 0.5
+
+# Sketch bound that never compresses, so medians and quartiles stay exact
+EXACT_SKETCH_SIZE = np.iinfo(np.int64).max
+
+
+def is_numeric_column(series: pd.Series) -> bool:
+    # Numeric columns get medians, everything else (strings, categoricals, booleans) modes
+    return pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+
+
+def new_profile() -> dict:
+    # Profile of zero rows
+    return {"n_rows": 0, "numeric": {}, "categorical": {}}
+
+
+def profile_frame(df: pd.DataFrame, sketch_size: int = DEFAULT_SKETCH_SIZE) -> dict:
+    """
+    Profile every column of ``df`` in one pass.
+
+    The moments of all numeric columns are computed on one float block;
+    each numeric column then gets a quantile sketch of at most
+    ``sketch_size`` centroids and each other column its value counts.
+    """
+    profile = new_profile()
+    profile["n_rows"] = n_rows = len(df)
+    numeric = [col for col in df.columns if is_numeric_column(df[col])]
+    if numeric:
+        block = df[numeric].to_numpy(dtype=np.float64, na_value=np.nan)
+        present = ~np.isnan(block)
+        count = present.sum(axis=0)
+        sums = np.where(present, block, 0.0).sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            deviations = np.where(present, block - sums / count, 0.0)
+        m2 = (deviations * deviations).sum(axis=0)
+        for i, col in enumerate(numeric):
+            profile["numeric"][col] = {
+                "dtype": str(df[col].dtype),
+                "count": int(count[i]),
+                "missing": int(n_rows - count[i]),
+                "sum": float(sums[i]),
+                "m2": float(m2[i]),
+                "sketch": sketch_from_values(block[:, i], sketch_size),
+            }
+    for col in df.columns:
+        if col in profile["numeric"]:
+            continue
+        values = df[col]
+        counts = values.value_counts(dropna=True)
+        profile["categorical"][col] = {
+            "dtype": str(values.dtype),
+            "missing": int(n_rows - counts.sum()),
+            "counts": Counter(counts[counts > 0].to_dict()),
+        }
+    return profile
+
+
+def _merge_numeric(a: dict, b: dict, sketch_size: int) -> dict:
+    # Pooled moments (Chan et al.) and the merged sketch of two numeric summaries
+    n = a["count"] + b["count"]
+    delta = (b["sum"] / b["count"] - a["sum"] / a["count"]) if a["count"] and b["count"] else 0.0
+    return {
+        "dtype": a["dtype"] if a["dtype"] == b["dtype"] else "float64",
+        "count": n,
+        "missing": a["missing"] + b["missing"],
+        "sum": a["sum"] + b["sum"],
+        "m2": a["m2"] + b["m2"] + (delta ** 2 * a["count"] * b["count"] / n if n else 0.0),
+        "sketch": merge_sketches(a["sketch"], b["sketch"], sketch_size),
+    }
+
+
+def merge_profiles(left: dict, right: dict, sketch_size: int = DEFAULT_SKETCH_SIZE) -> dict:
+    # Combine the profiles of two disjoint sets of rows
+    merged = new_profile()
+    merged["n_rows"] = left["n_rows"] + right["n_rows"]
+    for col in dict.fromkeys([*left["numeric"], *right["numeric"]]):
+        a = left["numeric"].get(col)
+        b = right["numeric"].get(col)
+        if a is None or b is None:
+            merged["numeric"][col] = a or b
+            continue
+        merged["numeric"][col] = _merge_numeric(a, b, sketch_size)
+    for col in dict.fromkeys([*left["categorical"], *right["categorical"]]):
+        a = left["categorical"].get(col)
+        b = right["categorical"].get(col)
+        if a is None or b is None:
+            merged["categorical"][col] = a or b
+            continue
+        merged["categorical"][col] = {
+            "dtype": a["dtype"],
+            "missing": a["missing"] + b["missing"],
+            "counts": a["counts"] + b["counts"],
+        }
+    return merged
+
+
+def column_means(profile: dict) -> dict:
+    # Mean of every numeric column
+    return {col: s["sum"] / s["count"] if s["count"] else np.nan for col, s in profile["numeric"].items()}
+
+
+def missing_ratios(profile: dict) -> pd.Series:
+    # Share of missing values of every column
+    n = profile["n_rows"]
+    missing = {col: s["missing"] for kind in ("numeric", "categorical") for col, s in profile[kind].items()}
+    return pd.Series(missing, dtype=np.float64) / n if n else pd.Series(missing, dtype=np.float64)
+
+
+def missing_value_plan(profile: dict, incomplete_only: bool = False) -> dict:
+    # Columns to drop and the fill value (median or mode) of each kept column,
+    # or of each kept column that has missing values
+    n = profile["n_rows"]
+    drop, fill = [], {}
+    for col, s in profile["numeric"].items():
+        if n and s["missing"] / n > MAX_MISSING_RATIO:
+            drop.append(col)
+        elif s["missing"] or not incomplete_only:
+            fill[col] = sketch_median(s["sketch"])
+    for col, s in profile["categorical"].items():
+        if n and s["missing"] / n > MAX_MISSING_RATIO:
+            drop.append(col)
+        elif (s["missing"] or not incomplete_only) and s["counts"]:
+            # Ties resolve to the smallest value, like Series.mode()[0]
+            top = max(s["counts"].values())
+            fill[col] = min(value for value, count in s["counts"].items() if count == top)
+    return {"drop": drop, "fill": fill}
+
+
+def outlier_bounds(profile: dict, k: float = 1.5) -> dict:
+    # IQR fences of every numeric column
+    bounds = {}
+    for col, s in profile["numeric"].items():
+        q1, q3 = sketch_quantiles(s["sketch"], [0.25, 0.75])
+        bounds[col] = (q1 - k * (q3 - q1), q3 + k * (q3 - q1))
+    return bounds
+
+
+def top_categories(profile: dict, column: str, n: int = 10) -> list:
+    # Most frequent (value, count) pairs of a non-numeric column
+    return profile["categorical"][column]["counts"].most_common(n)
+
+
+def profile_summary(profile: dict) -> pd.DataFrame:
+    # One row per column: counts, moments and quartiles, or the most frequent value
+    rows = {}
+    for col, s in profile["numeric"].items():
+        q1, median, q3 = sketch_quantiles(s["sketch"], [0.25, 0.5, 0.75])
+        rows[col] = {
+            "dtype": s["dtype"], "count": s["count"], "missing": s["missing"],
+            "mean": s["sum"] / s["count"] if s["count"] else np.nan,
+            "std": np.sqrt(s["m2"] / (s["count"] - 1)) if s["count"] > 1 else np.nan,
+            "min": s["sketch"]["min"], "25%": q1, "50%": median, "75%": q3, "max": s["sketch"]["max"],
+        }
+    for col, s in profile["categorical"].items():
+        top = s["counts"].most_common(1)
+        rows[col] = {
+            "dtype": s["dtype"], "count": sum(s["counts"].values()), "missing": s["missing"],
+            "unique": len(s["counts"]), "top": top[0][0] if top else None, "freq": top[0][1] if top else 0,
+        }
+    return pd.DataFrame.from_dict(rows, orient="index")
+
+
+def histogram_edges(profile: dict, column: str, bins: Union[int, str] = "auto") -> np.ndarray:
+    # Equal-width bin edges over the column's range; bins="auto" follows numpy's
+    # rule (the narrower of the Sturges and Freedman-Diaconis widths)
+    s = profile["numeric"][column]
+    sketch = s["sketch"]
+    low, high = sketch["min"], sketch["max"]
+    if low == high:
+        low, high = low - 0.5, high + 0.5
+    if bins != "auto":
+        return np.linspace(low, high, int(bins) + 1)
+    n = s["count"]
+    sturges = (sketch["max"] - sketch["min"]) / (np.log2(n) + 1.0)
+    q1, q3 = sketch_quantiles(sketch, [0.25, 0.75])
+    fd = 2.0 * (q3 - q1) * n ** (-1.0 / 3.0)
+    width = min(fd, sturges) if fd else sturges
+    if width and s["dtype"].startswith(("int", "uint")):
+        width = max(width, 1.0)
+    n_bins = int(np.ceil((high - low) / width)) if width else 1
+    return np.linspace(low, high, n_bins + 1)
+
+
+def profile_histogram(profile: dict, column: str, bins: Union[int, str] = "auto") -> tuple:
+    # Fixed-bin histogram (counts, edges) of a numeric column from its sketch
+    # (exact while the sketch holds every distinct value)
+    edges = histogram_edges(profile, column, bins)
+    sketch = profile["numeric"][column]["sketch"]
+    counts, _ = np.histogram(sketch["values"], bins=edges, weights=sketch["weights"])
+    return counts, edges
+
+
+def distribution_points(profile: dict, columns: Sequence[str]) -> pd.DataFrame:
+    # Long frame of the sketch centroids (value, weight) of numeric columns, for weighted plots
+    frames = [
+        pd.DataFrame({
+            "column": col,
+            "value": profile["numeric"][col]["sketch"]["values"],
+            "weight": profile["numeric"][col]["sketch"]["weights"],
+        })
+        for col in columns
+    ]
+    return pd.concat(frames, ignore_index=True)
+
+
+def box_stats(profile: dict, column: str, whis: float = 1.5) -> dict:
+    # Box-plot statistics in the form of matplotlib's Axes.bxp
+    sketch = profile["numeric"][column]["sketch"]
+    values = sketch["values"]
+    q1, median, q3 = sketch_quantiles(sketch, [0.25, 0.5, 0.75])
+    low, high = q1 - whis * (q3 - q1), q3 + whis * (q3 - q1)
+    inside = values[(values >= low) & (values <= high)]
+    return {
+        "label": column,
+        "med": float(median),
+        "q1": float(q1),
+        "q3": float(q3),
+        "whislo": float(inside.min()) if inside.size else float(q1),
+        "whishi": float(inside.max()) if inside.size else float(q3),
+        "fliers": values[(values < low) | (values > high)].tolist(),
+    }
+
+
+def save_profile(profile: dict, path: str) -> None:
+    # Persist a profile for reuse between runs
+    with open(path, "wb") as f:
+        pickle.dump(profile, f)
+
+
+def load_profile(path: str) -> dict:
+    # Load a profile written by save_profile
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def ensure_profile(df: pd.DataFrame, profile: Optional[dict], columns: Sequence[str]) -> dict:
+    # The given profile, or a fresh one of just the columns a consumer reads
+    return profile if profile is not None else profile_frame(df[list(columns)])
@@ -0,0 +1,106 @@
+from typing import Optional, Sequence
+import numpy as np
+import pandas as pd
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Identifier columns the analysis never uses
+PII_COLUMNS = ["Student_ID", "First_Name", "Last_Name", "Email"]
+
+# String columns with at most this many distinct values become categoricals
+MAX_CATEGORIES = 64
+
+# Significant decimal digits float32 always round-trips (FLT_DIG)
+FLOAT32_DIGITS = 6
+
+
+def prune_identifiers(df: pd.DataFrame, columns: Sequence[str] = PII_COLUMNS, mode: str = "drop") -> pd.DataFrame:
+    # Drop identifier columns, or replace them with uint64 hashes (mode="hash") that still join and deduplicate
+    present = [col for col in columns if col in df.columns]
+    if mode == "drop":
+        return df.drop(columns=present)
+    if mode == "hash":
+        return df.assign(**{col: pd.util.hash_pandas_object(df[col], index=False).to_numpy() for col in present})
+    if mode == "keep":
+        return df
+    raise ValueError(f"Unknown identifier mode: {mode}")
+
+
+def _is_text(series: pd.Series) -> bool:
+    return pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)
+
+
+def _float32_safe(values: np.ndarray) -> bool:
+    # True when all values are decimals with at most FLOAT32_DIGITS significant digits
+    # that a float32 round trip (rounded back to their decimals) recovers exactly
+    values = values[np.isfinite(values)]
+    if not len(values):
+        return True
+    limit = np.abs(values).max()
+    for decimals in range(FLOAT32_DIGITS + 1):
+        scaled = values * 10.0 ** decimals
+        if limit * 10.0 ** decimals >= 10 ** FLOAT32_DIGITS:
+            return False
+        if np.all(np.abs(scaled - np.round(scaled)) < 1e-6):
+            restored = np.round(values.astype(np.float32).astype(np.float64), decimals)
+            return bool(np.array_equal(restored, np.round(values, decimals)))
+    return False
+
+
+def _compact_column(series: pd.Series, max_categories: int) -> pd.Series:
+    # Smallest safe representation of one column
+    if _is_text(series):
+        if series.nunique(dropna=True) <= max_categories:
+            return series.astype("category")
+        return series
+    if pd.api.types.is_integer_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return pd.to_numeric(series, downcast="integer")
+    if pd.api.types.is_float_dtype(series) and series.dtype != np.float32 and _float32_safe(series.to_numpy()):
+        return series.astype(np.float32)
+    return series
+
+
+def memory_report(before: pd.DataFrame, after: pd.DataFrame) -> pd.DataFrame:
+    # Bytes and dtype of every column before and after compaction (dropped columns have 0 bytes after)
+    bytes_before = before.memory_usage(index=False, deep=True)
+    bytes_after = after.memory_usage(index=False, deep=True).reindex(bytes_before.index, fill_value=0)
+    report = pd.DataFrame({
+        "dtype_before": before.dtypes.astype(str),
+        "dtype_after": after.dtypes.astype(str).reindex(bytes_before.index, fill_value="dropped"),
+        "bytes_before": bytes_before,
+        "bytes_after": bytes_after,
+    })
+    report.loc["total"] = ["", "", bytes_before.sum(), bytes_after.sum()]
+    return report
+
+
+def compact_frame(
+    df: pd.DataFrame,
+    identifiers: str = "drop",
+    max_categories: int = MAX_CATEGORIES,
+    report: Optional[dict] = None,
+) -> pd.DataFrame:
+    """
+    Return a memory-compact copy of a typed frame.
+
+    Identifier columns are dropped or hashed (``identifiers``), text columns
+    with at most ``max_categories`` distinct values become categoricals,
+    integers are downcast to the smallest integer type that holds their range
+    and floats become float32 when their values have at most
+    ``FLOAT32_DIGITS`` significant digits, so the recorded decimals survive.
+    The per-column byte report is logged and stored under ``report["memory"]``
+    when a dict is passed.
+    """
+    compact = prune_identifiers(df, mode=identifiers)
+    compact = pd.DataFrame(
+        {col: _compact_column(compact[col], max_categories) for col in compact.columns},
+        index=compact.index,
+    )
+    summary = memory_report(df, compact)
+    total = summary.loc["total"]
+    logger.info("Compacted frame from %.2f MB to %.2f MB", total["bytes_before"] / 1e6, total["bytes_after"] / 1e6)
+    logger.info("Bytes per column:\n%s", summary.to_string())
+    if report is not None:
+        report["memory"] = summary
+    return compact
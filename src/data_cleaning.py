@@ -1,5 +1,14 @@
+import os
+from typing import Optional
 import pandas as pd
 import numpy as np
+from src.column_profile import (
+    EXACT_SKETCH_SIZE, is_numeric_column, missing_value_plan, outlier_bounds, profile_frame,
+)
+from src.compaction import compact_frame, prune_identifiers
+from src.type_inference import apply_column_types, infer_column_types, load_schema, save_schema
+from src.validation import DEFAULT_IQR_K, RANGE_RULES, outlier_rules, validate
+from src.utils.instrumentation import instrument
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -11,100 +20,105 @@ def standardize_missing_tokens(df: pd.DataFrame) -> pd.DataFrame:
     return df.replace(missing_tokens, np.nan)
 
 
-def convert_column_types(df: pd.DataFrame) -> pd.DataFrame:
-    # Work on a copy to avoid modifying the original dataframe
-    df = df.copy()
-    # Loop through all columns and try converting object-type columns
-    for col in df.columns:
-    # Only attempt conversion if the column is stored as object (string-like)
-        if df[col].dtype == object:
-        # Try converting the column to numeric (e.g., "3", "4.5")
-            try:    
-                df[col] = pd.to_numeric(df[col])
-                continue # If successful, move to next column
-            except Exception:
-                pass # Not numeric → try next option
-        # Try converting the column to datetime (e.g., "2020-01-01", "01/31/2020")
-            try:     
-                sample = df[col].dropna().astype(str).head(10)
-                if sample.str.contains(r"\d{4}-\d{2}-\d{2}|\d{2}/\d{2}/\d{4}").any():
-                    df[col] = pd.to_datetime(df[col], errors='coerce')
-            except Exception:   # If parsing fails, keep original dtype
-                pass
-
-    return df
-
-
-def detect_invalid_values(df: pd.DataFrame) -> None:
+def convert_column_types(df: pd.DataFrame, schema_path: Optional[str] = None) -> pd.DataFrame:
+    # Decide each text column's type from a bounded sample, then convert it once.
+    # When schema_path points to a saved schema, inference is skipped entirely.
+    if schema_path is not None and os.path.exists(schema_path):
+        schema = load_schema(schema_path)
+    else:
+        schema = infer_column_types(df)
+        # Persist the inferred schema for later runs
+        if schema_path is not None:
+            save_schema(schema, schema_path)
+    return apply_column_types(df, schema)
+
+
+def detect_invalid_values(df: pd.DataFrame) -> dict:
     # Detect and log invalid values for key columns
+    # (stress within 1-10, non-negative sleep hours, total score within 0-100)
+    result = validate(df, RANGE_RULES)
+    log_validation_summary(result)
+    return result
 
-     # Stress level should be between 1 and 10
-    if "Stress_Level (1-10)" in df.columns:
-        invalid = df[(df["Stress_Level (1-10)"] < 1) | (df["Stress_Level (1-10)"] > 10)]
-        logger.info("Invalid stress values: %d", len(invalid))
-    
-    # Sleep hours cannot be negative
-    if "Sleep_Hours_per_Night" in df.columns:
-        invalid = df[df["Sleep_Hours_per_Night"] < 0]
-        logger.info("Invalid sleep hours: %d", len(invalid))
-    
-    # Total score should be between 0 and 100
-    if "Total_Score" in df.columns:
-        invalid = df[(df["Total_Score"] < 0) | (df["Total_Score"] > 100)]
-        logger.info("Invalid total score values: %d", len(invalid))
 
+def profile_bounds(profile: Optional[dict], columns) -> Optional[dict]:
+    # IQR fences of the outlier rules read from a column profile (None computes them from the rows)
+    if profile is None:
+        return None
+    fences = outlier_bounds(profile, DEFAULT_IQR_K)
+    return {f"outlier_{col}": fences[col] for col in columns}
 
-def detect_outliers(df: pd.DataFrame) -> None:
-    # Detect outliers using the IQR rule (1.5 * IQR)
 
-    # Select only numeric columns for outlier detection
+def detect_outliers(df: pd.DataFrame, profile: Optional[dict] = None) -> dict:
+    # Detect outliers using the IQR rule (1.5 * IQR), with all quartiles computed in one call
+    # or taken from the column profile
     numeric_cols = df.select_dtypes(include=[np.number]).columns
-    for col in numeric_cols:
-        # Calculate Q1 and Q3 for the column
-        q1, q3 = df[col].quantile([0.25, 0.75])
-        iqr = q3 - q1
-        # Define lower and upper bounds for outliers
-        lower, upper = q1 - 1.5 * iqr, q3 + 1.5 * iqr
-        # Identify rows where the value is outside the allowed range
-        outliers = df[(df[col] < lower) | (df[col] > upper)]
-        # Log the number of detected outliers (if any)
-        if len(outliers) > 0:
-            logger.info("Outliers in %s: %d", col, len(outliers))
-
-
-def handle_missing_values(df: pd.DataFrame) -> pd.DataFrame:
-    # Work on a copy to avoid modifying the original dataframe
-    df = df.copy()
-    # Loop through all columns and handle missing values
-    for col in df.columns:
-        # Calculate the percentage of missing values in the column
-        missing_ratio = df[col].isna().mean()
-        # If more than 50% of the column is missing → drop the entire column
-        if missing_ratio > 0.5:  
-            df = df.drop(columns=[col])
-            continue
-        # If the column is numeric → fill missing values with the median
-        if df[col].dtype in [np.float64, np.int64]:  
-            df[col] = df[col].fillna(df[col].median())
-        # If the column is categorical/string → fill missing values with the mode
-        else:   
-            df[col] = df[col].fillna(df[col].mode()[0])
-    return df
+    result = validate(df, outlier_rules(numeric_cols), profile_bounds(profile, numeric_cols))
+    log_validation_summary(result)
+    return result
+
+
+def log_validation_summary(result: dict) -> None:
+    # Log range violations always and outliers only when some were found
+    for row in result["summary"].itertuples(index=False):
+        if row.type == "range":
+            logger.info("Invalid values in %s (%s): %d", row.column, row.rule, row.violations)
+        elif row.violations > 0:
+            logger.info("Outliers in %s: %d", row.column, row.violations)
+
+
+def validate_dataset(df: pd.DataFrame, profile: Optional[dict] = None) -> dict:
+    # Evaluate the range checks and IQR outlier rules in a single vectorized pass
+    numeric_cols = df.select_dtypes(include=[np.number]).columns
+    result = validate(df, RANGE_RULES + outlier_rules(numeric_cols), profile_bounds(profile, numeric_cols))
+    log_validation_summary(result)
+    return result
+
+
+def apply_missing_value_plan(df: pd.DataFrame, plan: dict) -> pd.DataFrame:
+    # One drop and one fillna for all columns (returns a new frame; untouched
+    # columns are shared under copy-on-write)
+    df = df.drop(columns=plan["drop"])
+    return df.fillna(plan["fill"]) if plan["fill"] else df
+
+
+def handle_missing_values(df: pd.DataFrame, profile: Optional[dict] = None) -> pd.DataFrame:
+    # With a column profile of df the plan is read from it without touching the rows
+    if profile is not None:
+        return apply_missing_value_plan(df, missing_value_plan(profile, incomplete_only=True))
+    # Calculate the percentage of missing values of every column at once
+    missing_ratio = df.isna().mean()
+    # Columns with more than 50% missing values → dropped together in a single drop
+    drop = missing_ratio.index[missing_ratio > 0.5]
+    # Fill values: median for numeric columns, mode for categorical/string columns
+    incomplete = [col for col in df.columns if 0 < missing_ratio[col] <= 0.5]
+    fill_values = {
+        col: df[col].median() if is_numeric_column(df[col]) else df[col].mode()[0]
+        for col in incomplete
+    }
+    return apply_missing_value_plan(df, {"drop": list(drop), "fill": fill_values})
 
 # Full data cleaning pipeline
-def clean_full_dataset(df_raw: pd.DataFrame) -> pd.DataFrame:
+@instrument
+def clean_full_dataset(df_raw: pd.DataFrame, schema_path: Optional[str] = None, compact: bool = False) -> pd.DataFrame:
     # Apply all cleaning steps in sequence
     logger.info("Starting full dataset cleaning pipeline")
+    if compact:
+        # Drop identifier columns before any cleaning step touches them
+        df_raw = prune_identifiers(df_raw)
     # Standardize all missing-value tokens (e.g., 'NA', 'None', blanks → np.nan)
     df = standardize_missing_tokens(df_raw)
     # Convert columns to their correct data types (numeric, categorical, etc.)
-    df = convert_column_types(df)
-    # Detect invalid values (values outside expected ranges)
-    detect_invalid_values(df)
-    # Detect outliers in numeric columns
-    detect_outliers(df)
+    df = convert_column_types(df, schema_path)
+    if compact:
+        # Categoricals for low-cardinality text, smallest safe numeric types
+        df = compact_frame(df)
+    # One exact profile of all columns feeds the outlier fences and the missing-value plan
+    profile = profile_frame(df, EXACT_SKETCH_SIZE)
+    # Detect invalid values (values outside expected ranges) and outliers in numeric columns
+    validate_dataset(df, profile)
     # Handle missing values (imputation or removal)
-    df = handle_missing_values(df)
+    df = handle_missing_values(df, profile)
     logger.info("Final cleaned dataset shape: %s", df.shape)
     
     return df
\ No newline at end of file
@@ -1,6 +1,13 @@
+import glob
 import os
+import time
+from functools import partial
+from typing import Iterator, Optional
+import numpy as np
 import pandas as pd
 from src.utils.logger import get_logger
+from src.utils.memory import peak_rss_mb
+from src.utils.parallel import imap_bounded
 
 # Create a logger for this module
 logger = get_logger(__name__)
@@ -11,18 +18,292 @@ BASE_DIR = os.path.dirname(os.path.dirname(__file__))
 # Default path to the dataset
 DEFAULT_DATA_PATH = os.path.join(BASE_DIR, "data", "Students_Grading_Dataset_Biased.csv")
 
-def load_student_data(data_path: str = DEFAULT_DATA_PATH) -> pd.DataFrame:
-    """Load the student dataset from a CSV file."""
+# Default number of rows per chunk in streaming mode
+DEFAULT_CHUNKSIZE = 100_000
 
+# Tokens treated as missing values while parsing
+MISSING_TOKENS = ["", " ", "NA", "N/A", "None", "?", "null", "Null"]
+
+# Explicit column schema of the student export (what pandas infers on the full file, with the
+# integer columns nullable so chunks with missing values still parse)
+STUDENT_SCHEMA = {
+    "Student_ID": "str",
+    "First_Name": "str",
+    "Last_Name": "str",
+    "Email": "str",
+    "Gender": "str",
+    "Age": "Int64",
+    "Department": "str",
+    "Attendance (%)": "float64",
+    "Midterm_Score": "float64",
+    "Final_Score": "float64",
+    "Assignments_Avg": "float64",
+    "Quizzes_Avg": "float64",
+    "Participation_Score": "float64",
+    "Projects_Score": "float64",
+    "Total_Score": "float64",
+    "Grade": "str",
+    "Study_Hours_per_Week": "float64",
+    "Extracurricular_Activities": "str",
+    "Internet_Access_at_Home": "str",
+    "Parent_Education_Level": "str",
+    "Family_Income_Level": "str",
+    "Stress_Level (1-10)": "Int64",
+    "Sleep_Hours_per_Night": "float64",
+}
+
+# Column naming the file each row was read from in multi-file loads
+SOURCE_COLUMN = "Source_Partition"
+
+
+def _check_data_path(data_path: str) -> None:
     # Verify the file exists before loading
     if not os.path.exists(data_path):
         logger.error("Data file not found at path: %s", data_path)
         raise FileNotFoundError(f"Data file not found at {data_path}")
 
+
+def load_student_data(
+    data_path: str = DEFAULT_DATA_PATH,
+    chunksize: Optional[int] = None,
+    **stream_kwargs,
+) -> pd.DataFrame:
+    """
+    Load the student dataset from a CSV file.
+
+    By default the whole file is read with a single untyped ``pd.read_csv``.
+    When ``chunksize`` is given, the file is read through ``iter_student_data``
+    with the explicit schema and the chunks are concatenated once. A directory
+    or glob pattern is read with ``load_partitioned_data`` (keyword arguments
+    are passed on).
+    """
+    if is_partitioned_source(data_path):
+        return load_partitioned_data(data_path, **stream_kwargs)
+    if chunksize is not None:
+        chunks = iter_student_data(data_path, chunksize=chunksize, **stream_kwargs)
+        df = pd.concat(chunks, ignore_index=True)
+        logger.info("Data loaded successfully with shape %s", df.shape)
+        return df
+
+    _check_data_path(data_path)
+
     # Log the loading process
     logger.info("Loading data from %s", data_path)
     # Read the CSV into a DataFrame
     df = pd.read_csv(data_path)
      # Log the shape of the loaded dataset
     logger.info("Data loaded successfully with shape %s", df.shape)
-    return df
\ No newline at end of file
+    return df
+
+
+def iter_student_data(
+    data_path: str = DEFAULT_DATA_PATH,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    usecols: Optional[list] = None,
+    dtype: Optional[dict] = None,
+    na_values: Optional[list] = None,
+    engine: str = "c",
+    stats: Optional[dict] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream the student dataset in chunks of ``chunksize`` rows.
+
+    Columns are parsed with an explicit schema (``STUDENT_SCHEMA`` by default,
+    restricted to ``usecols``) and ``MISSING_TOKENS`` become NaN while parsing.
+    ``engine="pyarrow"`` uses the pyarrow streaming CSV reader when it is
+    installed; its chunks follow pyarrow's block boundaries instead of an exact
+    row count. Throughput and peak memory are logged once the file is consumed,
+    and written into ``stats`` when a dict is passed.
+    """
+    _check_data_path(data_path)
+
+    if dtype is None:
+        dtype = STUDENT_SCHEMA
+    if usecols is not None:
+        dtype = {col: dtype[col] for col in usecols if col in dtype}
+    if na_values is None:
+        na_values = MISSING_TOKENS
+
+    logger.info("Streaming data from %s in chunks of %d rows (engine=%s)", data_path, chunksize, engine)
+    if engine == "pyarrow":
+        chunks = _iter_pyarrow_chunks(data_path, chunksize, usecols, dtype, na_values)
+    else:
+        chunks = pd.read_csv(
+            data_path,
+            chunksize=chunksize,
+            usecols=usecols,
+            dtype=dtype,
+            na_values=na_values,
+            engine=engine,
+        )
+
+    start = time.perf_counter()
+    n_rows = 0
+    n_chunks = 0
+    for chunk in chunks:
+        n_rows += len(chunk)
+        n_chunks += 1
+        yield chunk
+
+    # Report throughput and memory once the whole file has been streamed
+    elapsed = time.perf_counter() - start
+    rows_per_sec = n_rows / elapsed if elapsed > 0 else float("inf")
+    peak_mb = peak_rss_mb()
+    logger.info(
+        "Streamed %d rows in %d chunks in %.2fs (%.0f rows/sec, peak RSS %.1f MB)",
+        n_rows, n_chunks, elapsed, rows_per_sec, peak_mb,
+    )
+    if stats is not None:
+        stats.update({
+            "rows": n_rows,
+            "chunks": n_chunks,
+            "seconds": elapsed,
+            "rows_per_sec": rows_per_sec,
+            "peak_rss_mb": peak_mb,
+        })
+
+
+def _iter_pyarrow_chunks(data_path, chunksize, usecols, dtype, na_values):
+    # Stream record batches with pyarrow and convert each one to pandas
+    try:
+        import pyarrow as pa
+        from pyarrow import csv as pa_csv
+    except ImportError as exc:
+        raise ImportError("engine='pyarrow' requires the pyarrow package") from exc
+
+    arrow_types = {"int64": pa.int64(), "Int64": pa.int64(), "float64": pa.float64(), "str": pa.string()}
+    # Approximate the requested rows per chunk with a byte-sized block
+    row_bytes = 256
+    read_options = pa_csv.ReadOptions(block_size=chunksize * row_bytes)
+    convert_options = pa_csv.ConvertOptions(
+        column_types={col: arrow_types[str(t)] for col, t in dtype.items() if str(t) in arrow_types},
+        include_columns=usecols,
+        null_values=na_values,
+        strings_can_be_null=True,
+    )
+    with pa_csv.open_csv(data_path, read_options=read_options, convert_options=convert_options) as reader:
+        for batch in reader:
+            yield batch.to_pandas().astype(dtype)
+
+
+def is_partitioned_source(data_path: str) -> bool:
+    # A directory or a glob pattern names a set of CSV files
+    return os.path.isdir(data_path) or glob.has_magic(data_path)
+
+
+def resolve_data_files(source: str) -> list:
+    # Sorted CSV files of a directory, a glob pattern or a single path
+    if os.path.isdir(source):
+        files = glob.glob(os.path.join(source, "*.csv"))
+    elif glob.has_magic(source):
+        files = glob.glob(source, recursive=True)
+    else:
+        files = [source] if os.path.exists(source) else []
+    if not files:
+        logger.error("No data files match %s", source)
+        raise FileNotFoundError(f"No data files match {source}")
+    return sorted(files)
+
+
+def check_header(path: str, schema: dict = STUDENT_SCHEMA) -> dict:
+    # Compare a file's header with the expected columns (order does not matter: columns are read by name)
+    header = list(pd.read_csv(path, nrows=0).columns)
+    return {
+        "path": path,
+        "missing": [col for col in schema if col not in header],
+        "unexpected": [col for col in header if col not in schema],
+        "reordered": [col for col in header if col in schema] != [col for col in schema if col in header],
+    }
+
+
+def _partition_labels(files: list) -> list:
+    # File paths relative to their common directory, without the extension
+    root = os.path.dirname(files[0]) if len(files) == 1 else os.path.commonpath(files)
+    return [os.path.splitext(os.path.relpath(path, root))[0] for path in files]
+
+
+def _read_partition(schema: dict, na_values: list, path: str) -> tuple:
+    # Parse one file by column name with the explicit schema and time it
+    start = time.perf_counter()
+    df = pd.read_csv(path, usecols=list(schema), dtype=schema, na_values=na_values)[list(schema)]
+    return df, time.perf_counter() - start
+
+
+def load_partitioned_data(
+    source: str,
+    n_jobs: Optional[int] = 1,
+    schema: dict = STUDENT_SCHEMA,
+    na_values: Optional[list] = None,
+    on_mismatch: str = "raise",
+    stats: Optional[dict] = None,
+) -> pd.DataFrame:
+    """
+    Load every CSV file of a directory or glob pattern into one frame.
+
+    Each header is checked against ``schema`` first. Files missing expected
+    columns raise a ``ValueError`` listing all of them, or are skipped with
+    ``on_mismatch="skip"``; unexpected columns are reported and ignored, and
+    reordered columns are read by name. Files are parsed in a pool of
+    ``n_jobs`` worker processes and concatenated once, with a categorical
+    ``SOURCE_COLUMN`` naming each row's file. Per-file and aggregate
+    throughput are logged and written into ``stats`` when a dict is passed.
+    """
+    if on_mismatch not in ("raise", "skip"):
+        raise ValueError(f"Unknown mismatch mode: {on_mismatch}")
+    if na_values is None:
+        na_values = MISSING_TOKENS
+    files = resolve_data_files(source)
+    logger.info("Loading %d files from %s", len(files), source)
+
+    # Header checks before any file is parsed
+    checks = [check_header(path, schema) for path in files]
+    for check in checks:
+        if check["unexpected"]:
+            logger.warning("%s: ignoring unexpected columns %s", check["path"], check["unexpected"])
+        if check["reordered"]:
+            logger.info("%s: columns are in a different order; reading them by name", check["path"])
+    mismatched = [check for check in checks if check["missing"]]
+    for check in mismatched:
+        logger.error("%s: missing columns %s", check["path"], check["missing"])
+    if mismatched and on_mismatch == "raise":
+        details = "; ".join(f"{check['path']}: {check['missing']}" for check in mismatched)
+        raise ValueError(f"{len(mismatched)} files do not match the schema: {details}")
+    files = [check["path"] for check in checks if not check["missing"]]
+    if not files:
+        raise ValueError(f"No file under {source} matches the schema")
+
+    start = time.perf_counter()
+    results = list(imap_bounded(partial(_read_partition, schema, na_values), files, n_jobs=n_jobs))
+    frames = [df for df, _ in results]
+    # One concatenation, then the source labels as codes into the file names
+    df = pd.concat(frames, ignore_index=True)
+    labels = _partition_labels(files)
+    codes = np.repeat(np.arange(len(files)), [len(frame) for frame in frames])
+    df[SOURCE_COLUMN] = pd.Categorical.from_codes(codes, categories=labels)
+    elapsed = time.perf_counter() - start
+
+    per_file = pd.DataFrame({
+        "partition": labels,
+        "rows": [len(frame) for frame in frames],
+        "mb": [os.path.getsize(path) / 1e6 for path in files],
+        "seconds": [seconds for _, seconds in results],
+    })
+    per_file["rows_per_sec"] = per_file["rows"] / per_file["seconds"]
+    for row in per_file.itertuples(index=False):
+        logger.info("%s: %d rows, %.1f MB in %.2fs (%.0f rows/sec)",
+                    row.partition, row.rows, row.mb, row.seconds, row.rows_per_sec)
+    rows_per_sec = len(df) / elapsed if elapsed > 0 else float("inf")
+    mb_per_sec = per_file["mb"].sum() / elapsed if elapsed > 0 else float("inf")
+    logger.info("Loaded %d rows from %d files in %.2fs (%.0f rows/sec, %.1f MB/sec)",
+                len(df), len(files), elapsed, rows_per_sec, mb_per_sec)
+    if stats is not None:
+        stats.update({
+            "files": per_file,
+            "skipped": [check["path"] for check in mismatched],
+            "rows": len(df),
+            "seconds": elapsed,
+            "rows_per_sec": rows_per_sec,
+            "mb_per_sec": mb_per_sec,
+            "peak_rss_mb": peak_rss_mb(),
+        })
+    return df
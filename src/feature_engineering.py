@@ -1,4 +1,6 @@
+from typing import Optional
 import pandas as pd
+from src.utils.instrumentation import instrument
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -6,25 +8,34 @@ logger = get_logger(__name__)
 def add_interaction_term(df: pd.DataFrame) -> pd.DataFrame:
     # Adds interaction term between stress level and sleep hours
     logger.info("Adding interaction term: Stress_Level * Sleep_Hours_per_Night")
-    df = df.copy()
-    df["Stress_Sleep_Interaction"] = (df["Stress_Level (1-10)"] * df["Sleep_Hours_per_Night"])
-    return df
+    # assign returns a new frame without copying the existing columns (copy-on-write)
+    return df.assign(Stress_Sleep_Interaction=df["Stress_Level (1-10)"] * df["Sleep_Hours_per_Night"])
 
-def add_centered_variables(df: pd.DataFrame) -> pd.DataFrame:
+def add_centered_variables(df: pd.DataFrame, means: Optional[dict] = None) -> pd.DataFrame:
     # Centers stress and sleep variables and adds their interaction term
+    # (means can be supplied, e.g. running means from incremental mode, instead of computed from df)
     logger.info("Centering stress and sleep variables")
-    df = df.copy()
+    if means is None:
+        means = {
+            "Stress_Level (1-10)": df["Stress_Level (1-10)"].mean(),
+            "Sleep_Hours_per_Night": df["Sleep_Hours_per_Night"].mean(),
+        }
     # Center each variable by subtracting its mean
-    df["Stress_Level_c"] = df["Stress_Level (1-10)"] - df["Stress_Level (1-10)"].mean()
-    df["Sleep_Hours_c"] = (df["Sleep_Hours_per_Night"] - df["Sleep_Hours_per_Night"].mean())
-    # Create interaction term using centered variables
-    df["Stress_Sleep_Interaction_c"] = (df["Stress_Level_c"] * df["Sleep_Hours_c"])
-    return df
+    stress_c = df["Stress_Level (1-10)"] - means["Stress_Level (1-10)"]
+    sleep_c = df["Sleep_Hours_per_Night"] - means["Sleep_Hours_per_Night"]
+    # Add the centered variables and their interaction term in one assignment
+    return df.assign(
+        Stress_Level_c=stress_c,
+        Sleep_Hours_c=sleep_c,
+        Stress_Sleep_Interaction_c=stress_c * sleep_c,
+    )
 
+@instrument
 def engineer_features(df: pd.DataFrame) -> pd.DataFrame:
     # Main function to perform feature engineering
     df = add_interaction_term(df)
     df = add_centered_variables(df)
-    # Log final set of engineered features
-    logger.info("Feature engineering completed with columns: %s", df.columns)
+    # Log the size of the result; the full column list only at debug level
+    logger.info("Feature engineering completed with %d columns", df.shape[1])
+    logger.debug("Engineered columns: %s", list(df.columns))
     return df
\ No newline at end of file
@@ -0,0 +1,172 @@
+"""
+Cross-validated comparison of regression specifications.
+
+A specification is a dict ``{"name": str, "terms": [...]}``. A term is the
+name of a column or a ``(label, func)`` pair where ``func(df)`` returns the
+term's values (see ``square``, ``product`` and ``spline_basis``). The design
+of all terms of all specifications is built once, the per-fold Gram matrices
+of that design are accumulated in one scan per repetition, and every
+specification is then fitted and scored from sub-blocks of those matrices:
+adding a term to a specification does not rescan the data.
+"""
+import time
+from functools import partial
+from typing import Optional, Sequence
+import numpy as np
+import pandas as pd
+from src.modeling import INTERACTION_PREDICTORS, OUTCOME_COL
+from src.sufficient_stats import CONST_NAME, compute_grouped_ols_stats, compute_ols_stats, fit_ols_batch
+from src.utils.logger import get_logger
+from src.utils.parallel import imap_bounded
+
+logger = get_logger(__name__)
+
+
+def square(column: str) -> tuple:
+    # Quadratic term of a column
+    return (f"{column}^2", lambda df: df[column] ** 2)
+
+
+def product(left: str, right: str) -> tuple:
+    # Product (interaction) of two columns
+    return (f"{left}:{right}", lambda df: df[left] * df[right])
+
+
+def spline_basis(df: pd.DataFrame, column: str, n_knots: int = 3) -> list:
+    # Cubic truncated-power spline terms with knots at evenly spaced quantiles of df[column]
+    knots = df[column].quantile(np.linspace(0, 1, n_knots + 2)[1:-1]).to_numpy()
+    terms = [square(column), (f"{column}^3", lambda frame: frame[column] ** 3)]
+    for knot in knots:
+        terms.append((f"({column}-{knot:.3g})+^3",
+                      lambda frame, knot=knot: np.maximum(frame[column] - knot, 0) ** 3))
+    return terms
+
+
+def default_specifications(df: pd.DataFrame) -> list:
+    # The current centered interaction model and the variants we compare it with
+    base = list(INTERACTION_PREDICTORS)
+    return [
+        {"name": "interaction", "terms": base},
+        {"name": "quadratic", "terms": base + [square("Stress_Level_c"), square("Sleep_Hours_c")]},
+        {"name": "splines", "terms": base + spline_basis(df, "Stress_Level_c")
+            + spline_basis(df, "Sleep_Hours_c")},
+        {"name": "covariates", "terms": base + ["Study_Hours_per_Week", "Attendance (%)"]},
+    ]
+
+
+def _term_label(term) -> str:
+    return term if isinstance(term, str) else term[0]
+
+
+def build_design(df: pd.DataFrame, specifications: Sequence[dict], outcome: str = OUTCOME_COL) -> tuple:
+    """
+    Design matrix of the union of all specification terms.
+
+    Returns ``(X, y, labels)``: X starts with the constant, terms shared by
+    several specifications appear once, and rows with any missing term or
+    outcome are dropped so every specification is scored on the same rows.
+    """
+    columns = {CONST_NAME: pd.Series(1.0, index=df.index)}
+    for spec in specifications:
+        for term in spec["terms"]:
+            label = _term_label(term)
+            if label not in columns:
+                columns[label] = df[term] if isinstance(term, str) else term[1](df)
+    design = pd.DataFrame(columns).assign(**{"__y": df[outcome]}).dropna()
+    labels = list(columns)
+    return design[labels].to_numpy(dtype=np.float64), design["__y"].to_numpy(dtype=np.float64), labels
+
+
+def _fold_ids(n_rows: int, n_folds: int, seed: int) -> np.ndarray:
+    # Random, balanced assignment of rows to folds
+    ids = np.arange(n_rows) % n_folds
+    return np.random.default_rng(seed).permutation(ids)
+
+
+def _evaluate_repeat(X: np.ndarray, y: np.ndarray, columns: list, n_folds: int, seed: int) -> list:
+    # One scan for the per-fold statistics, then score every specification from them
+    folds = compute_grouped_ols_stats(X, y, _fold_ids(len(y), n_folds, seed), n_folds)
+    total = {key: folds[key].sum(axis=0) for key in ["xtx", "xty", "yty", "sum_y", "n"]}
+    rows = []
+    for index in columns:
+        start = time.perf_counter()
+        block = np.ix_(index, index)
+        # Training statistics of each fold are the totals minus the held-out fold
+        train = {
+            "names": [CONST_NAME] + [f"x{i}" for i in index[1:]],
+            "xtx": total["xtx"][block] - folds["xtx"][(slice(None),) + block],
+            "xty": total["xty"][index] - folds["xty"][:, index],
+            "yty": total["yty"] - folds["yty"],
+            "sum_y": total["sum_y"] - folds["sum_y"],
+            "n": total["n"] - folds["n"],
+        }
+        beta = fit_ols_batch(train)["params"]
+        # Held-out squared error from the fold's own statistics
+        xtx_test, xty_test = folds["xtx"][(slice(None),) + block], folds["xty"][:, index]
+        sse = (folds["yty"] - 2 * np.einsum("fi,fi->f", beta, xty_test)
+               + np.einsum("fi,fij,fj->f", beta, xtx_test, beta))
+        # Baseline: predicting the training mean of y
+        train_mean = train["sum_y"] / train["n"]
+        sst = folds["yty"] - 2 * train_mean * folds["sum_y"] + folds["n"] * train_mean ** 2
+        rows.append({"sse": sse, "sst": sst, "n": folds["n"], "seconds": time.perf_counter() - start})
+    return rows
+
+
+def _full_fit_criteria(full: dict, index: list) -> dict:
+    # AIC and BIC of the specification fitted on all rows (Gaussian likelihood, as statsmodels)
+    xtx, xty, n = full["xtx"][np.ix_(index, index)], full["xty"][index], full["n"]
+    beta = np.linalg.pinv(xtx, hermitian=True) @ xty
+    ssr = full["yty"] - 2 * beta @ xty + beta @ xtx @ beta
+    k = np.linalg.matrix_rank(xtx)
+    llf = -n / 2 * (np.log(2 * np.pi) + np.log(ssr / n) + 1)
+    return {"aic": -2 * llf + 2 * k, "bic": -2 * llf + k * np.log(n)}
+
+
+def compare_specifications(
+    df: pd.DataFrame,
+    specifications: Optional[Sequence[dict]] = None,
+    outcome: str = OUTCOME_COL,
+    n_folds: int = 5,
+    n_repeats: int = 1,
+    seed: int = 0,
+    n_jobs: Optional[int] = 1,
+) -> pd.DataFrame:
+    """
+    K-fold (or repeated k-fold) cross-validation of regression specifications.
+
+    Repetitions run in a process pool when ``n_jobs`` > 1; each one scans the
+    data once. Returns one row per specification with the out-of-sample RMSE
+    (and its spread across folds), out-of-sample R-squared, in-sample AIC and
+    BIC, and the time spent fitting and scoring it, sorted by RMSE.
+    """
+    if specifications is None:
+        specifications = default_specifications(df)
+    X, y, labels = build_design(df, specifications, outcome)
+    columns = [[0] + [labels.index(_term_label(term)) for term in spec["terms"]] for spec in specifications]
+    logger.info("Cross-validating %d specifications (%d terms, %d rows, %d x %d folds)",
+                len(specifications), len(labels) - 1, len(y), n_repeats, n_folds)
+
+    start = time.perf_counter()
+    seeds = np.random.SeedSequence(seed).generate_state(n_repeats)
+    func = partial(_evaluate_repeat, X, y, columns, n_folds)
+    repeats = list(imap_bounded(func, [int(s) for s in seeds], n_jobs=n_jobs))
+    logger.info("Cross-validation finished in %.2fs", time.perf_counter() - start)
+
+    # Gram matrix of the whole design for the in-sample criteria
+    full = compute_ols_stats(X, y, labels)
+    rows = []
+    for i, spec in enumerate(specifications):
+        results = [repeat[i] for repeat in repeats]
+        sse = np.concatenate([r["sse"] for r in results])
+        sst = np.concatenate([r["sst"] for r in results])
+        n = np.concatenate([r["n"] for r in results])
+        rows.append({
+            "specification": spec["name"],
+            "n_terms": len(spec["terms"]),
+            "cv_rmse": np.sqrt(sse.sum() / n.sum()),
+            "cv_rmse_std": np.sqrt(sse / n).std(),
+            "cv_r2": 1 - sse.sum() / sst.sum(),
+            **_full_fit_criteria(full, columns[i]),
+            "seconds": sum(r["seconds"] for r in results),
+        })
+    return pd.DataFrame(rows).sort_values("cv_rmse", ignore_index=True)
@@ -1,34 +1,236 @@
+from typing import Iterable, Optional, Sequence, Union
+import numpy as np
 import pandas as pd
-import statsmodels.api as sm
+from src.sufficient_stats import (
+    CONST_NAME,
+    SuffStatsOLSResults,
+    compute_grouped_ols_stats,
+    compute_ols_stats,
+    fit_ols_batch,
+    fit_ols_from_stats,
+    merge_ols_stats,
+    reparametrize_ols_stats,
+)
+from src.utils.instrumentation import instrument
 from src.utils.logger import get_logger
+from src.utils.parallel import imap_bounded, resolve_n_jobs
 
 logger = get_logger(__name__)
 
-def build_interaction_regression_model(df: pd.DataFrame):
+# Predictors of the interaction model: centered stress, centered sleep, and their interaction
+INTERACTION_PREDICTORS = [
+    "Stress_Level_c",
+    "Sleep_Hours_c",
+    "Stress_Sleep_Interaction_c"
+]
+
+# Raw columns the centered predictors are derived from, and the outcome
+STRESS_COL = "Stress_Level (1-10)"
+SLEEP_COL = "Sleep_Hours_per_Night"
+OUTCOME_COL = "Total_Score"
+
+
+@instrument
+def build_interaction_regression_model(df: pd.DataFrame, engine: str = "statsmodels"):
     # Build a linear regression model including the interaction term
+    # (engine="suffstats" fits from X'X / X'y without keeping the data on the result)
 
     logger.info("Building regression model with interaction")
 
     # Define predictors: centered stress, centered sleep, and their interaction
-    predictors = [
-        "Stress_Level_c",
-        "Sleep_Hours_c",
-        "Stress_Sleep_Interaction_c"
-    ]
-
-    # Extract predictor matrix and add constant term
-    X = df[predictors]
-    X = sm.add_constant(X)
+    predictors = INTERACTION_PREDICTORS
+
     # Define dependent variable
-    y = df["Total_Score"]
+    y = df[OUTCOME_COL]
 
-    # Fit OLS regression model
-    model = sm.OLS(y, X).fit()
+    if engine == "suffstats":
+        # Prepend the constant term and fit without importing statsmodels
+        X = np.column_stack([np.ones(len(df)), df[predictors].to_numpy(dtype=np.float64)])
+        model = fit_ols_from_stats(compute_ols_stats(X, y.to_numpy(), [CONST_NAME] + predictors))
+    else:
+        import statsmodels.api as sm
+
+        # Extract predictor matrix and add constant term
+        X = df[predictors]
+        X = sm.add_constant(X)
+        # Fit OLS regression model
+        model = sm.OLS(y, X).fit()
     logger.info("Model fitting completed")
     return model
 
 
+def raw_interaction_stats(chunk: pd.DataFrame) -> dict:
+    # Sufficient statistics of [1, stress, sleep, stress * sleep] for one chunk of raw rows
+    columns = [STRESS_COL, SLEEP_COL, OUTCOME_COL]
+    values = chunk[columns].to_numpy(dtype=np.float64)
+    # Rows with a missing stress, sleep or outcome value cannot enter the fit
+    values = values[~np.isnan(values).any(axis=1)]
+    stress, sleep, y = values.T
+    X = np.column_stack([np.ones(len(y)), stress, sleep, stress * sleep])
+    return compute_ols_stats(X, y, [CONST_NAME, STRESS_COL, SLEEP_COL, "Stress_Sleep_Interaction"])
+
+
+def center_interaction_stats(stats: dict) -> dict:
+    """
+    Turn raw interaction statistics into those of the centered model.
+
+    Centering is an affine change of the design, X_c = X_raw @ T, where T only
+    depends on the stress and sleep means (read from the first row of X'X), so
+    the centered fit needs no second pass over the data.
+    """
+    n = stats["n"]
+    mean_stress = stats["xtx"][0, 1] / n
+    mean_sleep = stats["xtx"][0, 2] / n
+    T = np.array([
+        [1.0, -mean_stress, -mean_sleep, mean_stress * mean_sleep],
+        [0.0, 1.0, 0.0, -mean_sleep],
+        [0.0, 0.0, 1.0, -mean_stress],
+        [0.0, 0.0, 0.0, 1.0],
+    ])
+    return reparametrize_ols_stats(stats, T, [CONST_NAME] + INTERACTION_PREDICTORS)
+
+
+def build_interaction_model_from_chunks(
+    chunks: Iterable[pd.DataFrame],
+    n_jobs: Optional[int] = 1,
+) -> SuffStatsOLSResults:
+    """
+    Fit the centered interaction model from a stream of raw data chunks.
+
+    Each chunk is reduced to sufficient statistics (in a process pool when
+    ``n_jobs`` > 1), the partial results are merged, and the centered model is
+    solved once. The coefficients, standard errors, p-values, R-squared and
+    covariance match the statsmodels fit on the full feature-engineered frame.
+    """
+    logger.info("Building regression model with interaction from data chunks")
+    partials = imap_bounded(raw_interaction_stats, chunks, n_jobs=n_jobs)
+    stats = center_interaction_stats(merge_ols_stats(partials))
+    model = fit_ols_from_stats(stats)
+    logger.info("Model fitting completed on %d rows", stats["n"])
+    return model
+
+
+
+def _fit_group_partition(task: tuple) -> dict:
+    # Accumulate and solve the statistics of the groups owned by one partition
+    X, y, codes, group_ids, names = task
+    local = np.searchsorted(group_ids, codes)
+    fit = fit_ols_batch(compute_grouped_ols_stats(X, y, local, len(group_ids), names))
+    fit["group_ids"] = group_ids
+    return fit
+
+
+def build_grouped_interaction_models(
+    df: pd.DataFrame,
+    by: Union[str, Sequence[str]],
+    n_jobs: Optional[int] = 1,
+) -> pd.DataFrame:
+    """
+    Fit the interaction model separately for every stratum of ``by``.
+
+    The per-group X'X, X'y and y'y are accumulated in one vectorized scan and
+    all group systems are solved in one batched solve. Groups are split into
+    partitions that are processed in a process pool when ``n_jobs`` > 1.
+    Predictors keep the centering of ``df`` (the pooled means). Returns a tidy
+    table with one row per group and term: coefficient, standard error, t,
+    p-value, observations and R-squared of the group's fit.
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    logger.info("Building interaction models per %s", ", ".join(by))
+    data = df.dropna(subset=INTERACTION_PREDICTORS + [OUTCOME_COL])
+    grouper = data.groupby(by, sort=True, observed=True)
+    codes = grouper.ngroup().to_numpy()
+    keys = grouper.size().index.to_frame(index=False)
+    # Rows with a missing group key are not part of any stratum
+    keep = codes >= 0
+    X = np.column_stack([np.ones(keep.sum()), data.loc[keep, INTERACTION_PREDICTORS].to_numpy(dtype=np.float64)])
+    y = data.loc[keep, OUTCOME_COL].to_numpy(dtype=np.float64)
+    codes = codes[keep]
+    names = [CONST_NAME] + INTERACTION_PREDICTORS
+
+    # Round-robin partitions of the group codes, one task per partition
+    n_parts = min(resolve_n_jobs(n_jobs), len(keys)) or 1
+    tasks = []
+    for part in range(n_parts):
+        group_ids = np.arange(part, len(keys), n_parts)
+        rows = codes % n_parts == part
+        tasks.append((X[rows], y[rows], codes[rows], group_ids, names))
+    fits = list(imap_bounded(_fit_group_partition, tasks, n_jobs=n_jobs))
+
+    # One row per (group, term), in group order
+    n_terms = len(names)
+    group_ids = np.concatenate([fit["group_ids"] for fit in fits])
+    order = np.argsort(group_ids)
+
+    def stack(key: str) -> np.ndarray:
+        return np.concatenate([fit[key] for fit in fits])[order]
+
+    table = keys.loc[np.repeat(np.arange(len(keys)), n_terms)].reset_index(drop=True)
+    table["term"] = np.tile(names, len(keys))
+    table["coef"] = stack("params").ravel()
+    table["std_err"] = stack("bse").ravel()
+    table["t_value"] = stack("tvalues").ravel()
+    table["p_value"] = stack("pvalues").ravel()
+    table["nobs"] = np.repeat(stack("nobs"), n_terms).astype(np.int64)
+    table["rsquared"] = np.repeat(stack("rsquared"), n_terms)
+    logger.info("Fitted %d group models on %d rows", len(keys), len(y))
+    return table
+
+
+def build_multi_outcome_model(df: pd.DataFrame, outcomes: Optional[Sequence[str]] = None) -> dict:
+    """
+    Fit the interaction model for several outcome columns at once.
+
+    The shared design [const, stress_c, sleep_c, interaction_c] is factorized
+    with one SVD and all outcomes (``SCORE_COLS`` by default) are solved
+    against it together; the coefficient covariance up to scale is shared as
+    well. Rows with a missing predictor or outcome are dropped. Returns
+    DataFrames (terms x outcomes) ``params``, ``bse``, ``tvalues``,
+    ``pvalues`` and Series ``rsquared`` plus ``df_resid`` and ``nobs``.
+    """
+    from scipy import stats as sp_stats
+
+    if outcomes is None:
+        from src.analysis.eda_components import SCORE_COLS
+        outcomes = SCORE_COLS
+    outcomes = list(outcomes)
+    logger.info("Building interaction model for %d outcomes", len(outcomes))
+    data = df.dropna(subset=INTERACTION_PREDICTORS + outcomes)
+    names = [CONST_NAME] + INTERACTION_PREDICTORS
+    X = np.column_stack([np.ones(len(data)), data[INTERACTION_PREDICTORS].to_numpy(dtype=np.float64)])
+    Y = data[outcomes].to_numpy(dtype=np.float64)
+
+    # One factorization of the design serves every outcome (pinv semantics, as statsmodels)
+    U, singular, Vt = np.linalg.svd(X, full_matrices=False)
+    keep = singular > singular.max() * max(X.shape) * np.finfo(np.float64).eps
+    U, singular, Vt = U[:, keep], singular[keep], Vt[keep]
+    beta = Vt.T @ ((U.T @ Y) / singular[:, None])
+    cov_unscaled = (Vt.T / singular ** 2) @ Vt
+
+    df_resid = float(len(data) - keep.sum())
+    ssr = ((Y - X @ beta) ** 2).sum(axis=0)
+    scale = ssr / df_resid
+    bse = np.sqrt(np.outer(np.diag(cov_unscaled), scale))
+    tvalues = beta / bse
+
+    def frame(values: np.ndarray) -> pd.DataFrame:
+        return pd.DataFrame(values, index=names, columns=outcomes)
+
+    centered_tss = ((Y - Y.mean(axis=0)) ** 2).sum(axis=0)
+    logger.info("Model fitting completed")
+    return {
+        "params": frame(beta),
+        "bse": frame(bse),
+        "tvalues": frame(tvalues),
+        "pvalues": frame(2 * sp_stats.t.sf(np.abs(tvalues), df_resid)),
+        "rsquared": pd.Series(1 - ssr / centered_tss, index=outcomes),
+        "df_resid": df_resid,
+        "nobs": float(len(data)),
+    }
+
 def summarize_model(model) -> str:
     # Return a text summary of the fitted regression model
     logger.info("Generating model summary")
-    return model.summary().as_text()
\ No newline at end of file
+    if isinstance(model, SuffStatsOLSResults):
+        return model.summary_text()
+    return model.summary().as_text()
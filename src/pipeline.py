@@ -0,0 +1,215 @@
+import hashlib
+import inspect
+import os
+import pickle
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Callable, Optional, Sequence
+from src.utils.logger import get_logger
+from src.utils.parallel import resolve_n_jobs
+
+logger = get_logger(__name__)
+
+# Base directory of the project
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))
+
+# Default location of memoized stage outputs
+DEFAULT_STAGE_CACHE_DIR = os.path.join(BASE_DIR, ".cache", "stages")
+
+
+def stage(
+    name: str,
+    func: Callable,
+    inputs: Sequence[str] = (),
+    outputs: Sequence[str] = (),
+    params: Optional[dict] = None,
+    files: Sequence[str] = (),
+    fingerprint: Optional[Callable[[], str]] = None,
+) -> dict:
+    """
+    Declare one pipeline stage.
+
+    ``func`` is called with the values named in ``inputs`` as positional
+    arguments and ``params`` as keyword arguments. Its return value is bound
+    to ``outputs`` (unpacked when several names are given). ``files`` are
+    paths the stage writes; a memoized stage reruns if any is missing.
+    ``fingerprint`` adds external state to the key, e.g. a data file hash.
+    """
+    return {
+        "name": name,
+        "func": func,
+        "inputs": list(inputs),
+        "outputs": list(outputs),
+        "params": params or {},
+        "files": list(files),
+        "fingerprint": fingerprint,
+    }
+
+
+def _is_project_function(obj, root_module: str) -> bool:
+    # Functions of the stage's own module or of the src package are followed
+    module = getattr(obj, "__module__", None) or ""
+    return inspect.isfunction(obj) and (module == root_module or module.startswith("src."))
+
+
+def function_fingerprint(func: Callable) -> str:
+    # Hash a function's source together with the project functions it calls (transitively)
+    seen, digest = set(), hashlib.sha256()
+    todo = [func]
+    while todo:
+        # Decorated functions (e.g. instrumented stages) are hashed through to the wrapped code
+        current = inspect.unwrap(todo.pop())
+        if current in seen:
+            continue
+        seen.add(current)
+        digest.update(inspect.getsource(current).encode("utf-8"))
+        for name in sorted(current.__code__.co_names):
+            helper = current.__globals__.get(name)
+            if _is_project_function(helper, func.__module__):
+                todo.append(helper)
+    return digest.hexdigest()
+
+
+def _stage_keys(stages: list) -> dict:
+    # Key each stage by its code, parameters, fingerprint and upstream keys (Merkle style)
+    producer = {output: s for s in stages for output in s["outputs"]}
+    keys = {}
+    for s in stages:
+        digest = hashlib.sha256()
+        digest.update(function_fingerprint(s["func"]).encode("utf-8"))
+        digest.update(repr(sorted(s["params"].items())).encode("utf-8"))
+        if s["fingerprint"] is not None:
+            digest.update(s["fingerprint"]().encode("utf-8"))
+        for name in s["inputs"]:
+            digest.update(f"{name}={keys[producer[name]['name']]}".encode("utf-8"))
+        keys[s["name"]] = digest.hexdigest()
+    return keys
+
+
+def _topological_order(stages: list) -> list:
+    # Order stages so every input is produced before it is consumed
+    producer = {output: s["name"] for s in stages for output in s["outputs"]}
+    by_name = {s["name"]: s for s in stages}
+    ordered, done = [], set()
+
+    def visit(s, path=()):
+        if s["name"] in done:
+            return
+        if s["name"] in path:
+            raise ValueError(f"Pipeline has a cycle through stage {s['name']}")
+        for name in s["inputs"]:
+            if name not in producer:
+                raise ValueError(f"Stage {s['name']} needs {name}, which no stage produces")
+            visit(by_name[producer[name]], path + (s["name"],))
+        done.add(s["name"])
+        ordered.append(s)
+
+    for s in stages:
+        visit(s)
+    return ordered
+
+
+def _timed_call(func: Callable, args: list, kwargs: dict) -> tuple:
+    # Run a stage function and measure its wall time (executed inside the worker)
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def _memo_path(cache_dir: str, key: str) -> str:
+    return os.path.join(cache_dir, f"{key}.pkl")
+
+
+def _is_memoized(s: dict, key: str, cache_dir: str) -> bool:
+    return os.path.exists(_memo_path(cache_dir, key)) and all(os.path.exists(f) for f in s["files"])
+
+
+def _store(s: dict, key: str, result, cache_dir: str) -> dict:
+    # Bind a stage result to its output names and memoize it on disk
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = _memo_path(cache_dir, key) + ".tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, _memo_path(cache_dir, key))
+    return _bind(s, result)
+
+
+def _bind(s: dict, result) -> dict:
+    # Map a stage result onto its declared output names
+    if not s["outputs"]:
+        return {}
+    if len(s["outputs"]) == 1:
+        return {s["outputs"][0]: result}
+    return dict(zip(s["outputs"], result))
+
+
+def _load(s: dict, key: str, cache_dir: str) -> dict:
+    with open(_memo_path(cache_dir, key), "rb") as f:
+        return _bind(s, pickle.load(f))
+
+
+def run_pipeline(
+    stages: list,
+    n_jobs: Optional[int] = 1,
+    use_threads: bool = False,
+    cache_dir: str = DEFAULT_STAGE_CACHE_DIR,
+    targets: Optional[Sequence[str]] = None,
+) -> tuple:
+    """
+    Run a DAG of stages, skipping those memoized under the same key.
+
+    Stages whose inputs are available run concurrently in a process pool
+    (or thread pool) of ``n_jobs`` workers. Outputs of memoized stages are
+    only loaded from disk when a rerun stage or a requested target needs them.
+    Returns the ``targets`` outputs (all outputs by default) and one timing
+    record per stage.
+    """
+    stages = _topological_order(stages)
+    keys = _stage_keys(stages)
+    producer = {output: s for s in stages for output in s["outputs"]}
+    to_run = [s for s in stages if not _is_memoized(s, keys[s["name"]], cache_dir)]
+    values, timings = {}, {}
+
+    def inputs_of(s):
+        # Materialize upstream values, loading memoized ones on demand
+        for name in s["inputs"]:
+            if name not in values:
+                upstream = producer[name]
+                values.update(_load(upstream, keys[upstream["name"]], cache_dir))
+        return [values[name] for name in s["inputs"]]
+
+    def finish(s, result, seconds):
+        values.update(_store(s, keys[s["name"]], result, cache_dir))
+        timings[s["name"]] = {"stage": s["name"], "seconds": seconds, "cached": False}
+        logger.info("Stage %s finished in %.2fs", s["name"], seconds)
+
+    n_jobs = resolve_n_jobs(n_jobs)
+    if n_jobs == 1:
+        for s in to_run:
+            finish(s, *_timed_call(s["func"], inputs_of(s), s["params"]))
+    else:
+        executor_class = ThreadPoolExecutor if use_threads else ProcessPoolExecutor
+        waiting, running = list(to_run), {}
+        with executor_class(max_workers=n_jobs) as executor:
+            while waiting or running:
+                # Submit every stage whose upstream stages are all finished
+                blocked = {name for w in waiting + list(running.values()) for name in w["outputs"]}
+                for s in [w for w in waiting if not blocked & set(w["inputs"])]:
+                    waiting.remove(s)
+                    running[executor.submit(_timed_call, s["func"], inputs_of(s), s["params"])] = s
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finish(running.pop(future), *future.result())
+
+    for s in stages:
+        if s["name"] not in timings:
+            timings[s["name"]] = {"stage": s["name"], "seconds": 0.0, "cached": True}
+            logger.info("Stage %s is up to date", s["name"])
+
+    wanted = targets if targets is not None else list(producer)
+    outputs = {}
+    for name in wanted:
+        if name not in values:
+            values.update(_load(producer[name], keys[producer[name]["name"]], cache_dir))
+        outputs[name] = values[name]
+    return outputs, [timings[s["name"]] for s in stages]
@@ -0,0 +1,95 @@
+from typing import Sequence
+import numpy as np
+
+# Maximum number of (value, weight) centroids kept per sketch
+DEFAULT_SKETCH_SIZE = 4096
+
+
+def _compress(values: np.ndarray, weights: np.ndarray, max_size: int) -> tuple:
+    # Collapse sorted centroids into at most max_size groups of roughly equal weight
+    if len(values) <= max_size:
+        return values, weights
+    cum_before = np.cumsum(weights) - weights
+    groups = np.minimum((cum_before / weights.sum() * max_size).astype(np.int64), max_size - 1)
+    group_weights = np.bincount(groups, weights=weights)
+    group_sums = np.bincount(groups, weights=values * weights)
+    keep = group_weights > 0
+    return group_sums[keep] / group_weights[keep], group_weights[keep]
+
+
+def _build(values: np.ndarray, weights: np.ndarray, vmin: float, vmax: float, max_size: int) -> dict:
+    # Merge equal values (np.unique sorts them), then compress if the sketch is over its size bound
+    unique, inverse = np.unique(values, return_inverse=True)
+    weights = np.bincount(inverse, weights=weights)
+    exact = len(unique) <= max_size
+    unique, weights = _compress(unique, weights, max_size)
+    return {"values": unique, "weights": weights, "min": vmin, "max": vmax, "exact": exact}
+
+
+def sketch_from_values(values, max_size: int = DEFAULT_SKETCH_SIZE) -> dict:
+    """
+    Build a mergeable quantile sketch from the non-missing values of an array.
+
+    The sketch stores sorted (value, weight) centroids. Columns with at most
+    ``max_size`` distinct values are represented exactly, so their quantiles
+    equal pandas' ``quantile``; wider columns are compressed into centroids
+    of equal weight, which bounds the rank error of a quantile by about
+    ``1 / max_size`` per compression.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    if values.size == 0:
+        return {"values": values, "weights": values.copy(), "min": np.nan, "max": np.nan, "exact": True}
+    return _build(values, np.ones_like(values), values.min(), values.max(), max_size)
+
+
+def merge_sketches(left: dict, right: dict, max_size: int = DEFAULT_SKETCH_SIZE) -> dict:
+    # Combine two sketches built from disjoint sets of rows
+    if left["values"].size == 0:
+        return right
+    if right["values"].size == 0:
+        return left
+    merged = _build(
+        np.concatenate([left["values"], right["values"]]),
+        np.concatenate([left["weights"], right["weights"]]),
+        np.fmin(left["min"], right["min"]),
+        np.fmax(left["max"], right["max"]),
+        max_size,
+    )
+    merged["exact"] = merged["exact"] and left["exact"] and right["exact"]
+    return merged
+
+
+def sketch_count(sketch: dict) -> float:
+    # Number of values summarized by the sketch
+    return float(sketch["weights"].sum())
+
+
+def sketch_median(sketch: dict) -> float:
+    # Median as the mean of the two middle values, the same arithmetic as Series.median()
+    n = sketch_count(sketch)
+    if n == 0:
+        return np.nan
+    cum = np.cumsum(sketch["weights"])
+    middle = np.searchsorted(cum, [(n - 1) // 2, n // 2], side="right")
+    return float(np.mean(sketch["values"][np.minimum(middle, len(cum) - 1)]))
+
+
+def sketch_quantiles(sketch: dict, qs: Sequence[float]) -> np.ndarray:
+    # Quantiles with pandas' linear interpolation over the expanded sorted values
+    qs = np.asarray(qs, dtype=np.float64)
+    n = sketch_count(sketch)
+    if n == 0:
+        return np.full(qs.shape, np.nan)
+    cum = np.cumsum(sketch["weights"])
+    position = qs * (n - 1)
+    lower = np.floor(position)
+    upper = np.minimum(lower + 1, n - 1)
+    values = sketch["values"]
+    last = len(values) - 1
+    v_lower = values[np.minimum(np.searchsorted(cum, lower, side="right"), last)]
+    v_upper = values[np.minimum(np.searchsorted(cum, upper, side="right"), last)]
+    result = v_lower + (position - lower) * (v_upper - v_lower)
+    # Extremes are tracked exactly even after compression
+    result = np.where(qs <= 0, sketch["min"], result)
+    return np.where(qs >= 1, sketch["max"], result)
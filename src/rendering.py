@@ -0,0 +1,222 @@
+import hashlib
+import os
+from typing import Callable, Optional, Sequence
+import numpy as np
+import pandas as pd
+from src.pipeline import function_fingerprint
+from src.utils.logger import get_logger
+from src.utils.parallel import imap_bounded
+
+logger = get_logger(__name__)
+
+# Base directory of the project
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))
+
+# Where the content key of every rendered PNG is recorded
+DEFAULT_RENDER_CACHE_DIR = os.path.join(BASE_DIR, ".cache", "render")
+
+# Scatter plots with more rows than this are drawn as binned density rasters
+DENSITY_ROW_THRESHOLD = 50_000
+
+# Cells per axis of a density raster
+DEFAULT_DENSITY_BINS = 256
+
+
+def figure_job(
+    draw: Callable,
+    data: pd.DataFrame,
+    path: str,
+    columns: Optional[Sequence[str]] = None,
+    params: Optional[dict] = None,
+    figsize: tuple = (6.4, 4.8),
+    tight_layout: bool = False,
+) -> dict:
+    """
+    Describe one figure to render.
+
+    ``draw(fig, data, **params)`` fills a fresh ``matplotlib.figure.Figure``;
+    seaborn grid plots that build their own figure may return it instead.
+    Only ``columns`` of ``data`` (all columns by default) are shipped to the
+    worker that renders the figure.
+    """
+    if columns is not None:
+        data = data[list(columns)]
+    return {
+        "draw": draw,
+        "data": data,
+        "path": path,
+        "params": params or {},
+        "figsize": figsize,
+        "tight_layout": tight_layout,
+    }
+
+
+def _job_key(job: dict) -> str:
+    # Hash the drawing code, parameters, figure options and the shipped data
+    digest = hashlib.sha256()
+    digest.update(function_fingerprint(job["draw"]).encode("utf-8"))
+    digest.update(repr(sorted(job["params"].items())).encode("utf-8"))
+    digest.update(repr((job["figsize"], job["tight_layout"])).encode("utf-8"))
+    data = job["data"]
+    digest.update(repr(list(zip(data.columns, map(str, data.dtypes)))).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _key_path(cache_dir: str, path: str) -> str:
+    name = hashlib.sha256(os.path.abspath(path).encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, f"{name}.key")
+
+
+def _is_current(job: dict, key: str, cache_dir: str) -> bool:
+    # A PNG is current when it exists and was rendered from the same key
+    key_path = _key_path(cache_dir, job["path"])
+    if not (os.path.exists(job["path"]) and os.path.exists(key_path)):
+        return False
+    with open(key_path) as f:
+        return f.read() == key
+
+
+def _headless_figure_class():
+    # Import matplotlib on first render and force a non-interactive backend,
+    # since figures are only ever written to files
+    import matplotlib
+    matplotlib.use("Agg", force=True)
+    from matplotlib.figure import Figure
+    return Figure
+
+
+def render_figure(job: dict) -> str:
+    # Draw a job on an object-oriented Figure (no pyplot state) and save it
+    Figure = _headless_figure_class()
+    fig = Figure(figsize=job["figsize"])
+    result = job["draw"](fig, job["data"], **job["params"])
+    if isinstance(result, Figure):
+        fig = result
+    if job["tight_layout"]:
+        fig.tight_layout()
+    os.makedirs(os.path.dirname(job["path"]) or ".", exist_ok=True)
+    fig.savefig(job["path"])
+    if result is not None:
+        # Grid plots are created through pyplot, so release them there
+        import matplotlib.pyplot as plt
+        plt.close(result)
+    return job["path"]
+
+
+def render_figures(
+    jobs: Sequence[dict],
+    n_jobs: Optional[int] = 1,
+    cache_dir: str = DEFAULT_RENDER_CACHE_DIR,
+    force: bool = False,
+) -> list:
+    """
+    Render figure jobs, skipping PNGs whose data and parameters are unchanged.
+
+    With ``n_jobs`` > 1 the jobs are fanned out to a process pool. Returns the
+    paths that were actually re-rendered.
+    """
+    todo = []
+    for job in jobs:
+        key = _job_key(job)
+        if force or not _is_current(job, key, cache_dir):
+            todo.append((job, key))
+        else:
+            logger.info("Figure %s is up to date", job["path"])
+
+    rendered = list(imap_bounded(render_figure, [job for job, _ in todo], n_jobs=n_jobs))
+    os.makedirs(cache_dir, exist_ok=True)
+    for (job, key), path in zip(todo, rendered):
+        with open(_key_path(cache_dir, job["path"]), "w") as f:
+            f.write(key)
+        logger.info("Rendered figure %s", path)
+    return rendered
+
+
+def use_density(n_rows: int, density: Optional[bool] = None) -> bool:
+    # density=None switches to a raster automatically above DENSITY_ROW_THRESHOLD rows
+    if density is None:
+        return n_rows > DENSITY_ROW_THRESHOLD
+    return density
+
+
+def bin_points(x, y, labels=None, bins: int = DEFAULT_DENSITY_BINS) -> pd.DataFrame:
+    """
+    Bin a point cloud into a ``bins`` x ``bins`` raster.
+
+    Returns one row per cell (row-major, y outer) with the cell centre ``x``,
+    ``y`` and the point ``count``. When integer ``labels`` (e.g. cluster ids)
+    are given, ``label`` holds the most frequent label of each cell (-1 for
+    empty cells). Only this grid, not the points, needs to reach the renderer.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    keep = np.isfinite(x) & np.isfinite(y)
+    x, y = x[keep], y[keep]
+
+    def cell_index(values):
+        # Bin edges over the value range (widened when all values are equal)
+        low, high = (values.min(), values.max()) if len(values) else (0.0, 1.0)
+        if high <= low:
+            low, high = low - 0.5, high + 0.5
+        index = ((values - low) / (high - low) * bins).astype(np.int64)
+        centers = low + (np.arange(bins) + 0.5) * (high - low) / bins
+        return np.minimum(index, bins - 1), centers
+
+    ix, x_centers = cell_index(x)
+    iy, y_centers = cell_index(y)
+    cells = iy * bins + ix
+    grid = pd.DataFrame({
+        "x": np.tile(x_centers, bins),
+        "y": np.repeat(y_centers, bins),
+        "count": np.bincount(cells, minlength=bins * bins),
+    })
+    if labels is not None:
+        uniques, codes = np.unique(np.asarray(labels)[keep], return_inverse=True)
+        per_label = np.bincount(codes * bins * bins + cells, minlength=len(uniques) * bins * bins)
+        per_label = per_label.reshape(len(uniques), bins * bins)
+        dominant = uniques[per_label.argmax(axis=0)] if len(uniques) else np.zeros(bins * bins, dtype=np.int64)
+        grid["label"] = np.where(grid["count"] > 0, dominant, -1).astype(np.int64)
+    return grid
+
+
+def _grid_extent(grid: pd.DataFrame) -> tuple:
+    # Image extent of a bin_points grid (cell centres +/- half a cell)
+    bins = int(np.sqrt(len(grid)))
+    x_centers, y_centers = grid["x"].to_numpy()[:bins], grid["y"].to_numpy()[::bins]
+    half_x = (x_centers[1] - x_centers[0]) / 2 if bins > 1 else 0.5
+    half_y = (y_centers[1] - y_centers[0]) / 2 if bins > 1 else 0.5
+    return bins, (x_centers[0] - half_x, x_centers[-1] + half_x, y_centers[0] - half_y, y_centers[-1] + half_y)
+
+
+def draw_density(ax, grid: pd.DataFrame, cmap: str = "viridis"):
+    # Log-scaled point density of a bin_points grid; empty cells stay blank
+    from matplotlib.colors import LogNorm
+
+    bins, extent = _grid_extent(grid)
+    counts = grid["count"].to_numpy(dtype=np.float64).reshape(bins, bins)
+    image = ax.imshow(np.where(counts > 0, counts, np.nan), origin="lower", extent=extent,
+                      aspect="auto", cmap=cmap, norm=LogNorm(vmin=1, vmax=max(counts.max(), 1)),
+                      interpolation="nearest")
+    ax.figure.colorbar(image, ax=ax, label="points per cell")
+    return image
+
+
+def draw_label_density(ax, grid: pd.DataFrame, palette: str = "viridis", title: str = "label"):
+    # Color each cell by its dominant label, with opacity growing with log density
+    from matplotlib import colormaps
+    from matplotlib.patches import Patch
+
+    bins, extent = _grid_extent(grid)
+    counts = grid["count"].to_numpy(dtype=np.float64)
+    labels = grid["label"].to_numpy()
+    uniques = np.unique(labels[labels >= 0])
+    colors = colormaps[palette](np.linspace(0, 1, max(len(uniques), 1)))
+    rgba = np.zeros((len(grid), 4))
+    filled = labels >= 0
+    rgba[filled] = colors[np.searchsorted(uniques, labels[filled])]
+    rgba[:, 3] = np.log1p(counts) / np.log1p(max(counts.max(), 1))
+    ax.imshow(rgba.reshape(bins, bins, 4), origin="lower", extent=extent, aspect="auto",
+              interpolation="nearest")
+    handles = [Patch(color=color, label=str(label)) for label, color in zip(uniques, colors)]
+    ax.legend(handles=handles, title=title)
@@ -0,0 +1,166 @@
+"""
+Batched bootstrap and permutation inference for OLS coefficients.
+
+Each batch of resamples is solved at once from stacked normal equations:
+bootstrap resamples become row-count weights, so the weighted X'X and X'y of
+a whole batch are two matrix products with the per-row outer products of the
+design. Permutation tests use the Freedman-Lane scheme (residuals of the model
+without the tested predictor are permuted) and a single solve for all
+permuted outcomes. Batches get independent child seeds of one
+``SeedSequence``, so results do not depend on ``n_jobs``.
+"""
+import time
+from functools import partial
+from typing import Optional, Sequence
+import numpy as np
+import pandas as pd
+from src.modeling import INTERACTION_PREDICTORS, OUTCOME_COL
+from src.sufficient_stats import CONST_NAME
+from src.utils.logger import get_logger
+from src.utils.parallel import imap_bounded
+
+logger = get_logger(__name__)
+
+# Upper bound on the cells of one batch's (resamples x rows) weight matrix
+MAX_BATCH_CELLS = 2 ** 24
+
+
+def _batch_sizes(n_resamples: int, n_rows: int, batch_size: Optional[int]) -> list:
+    # Split the resamples into batches that keep the weight matrix bounded
+    if batch_size is None:
+        batch_size = max(1, min(256, MAX_BATCH_CELLS // max(n_rows, 1)))
+    sizes = [batch_size] * (n_resamples // batch_size)
+    if n_resamples % batch_size:
+        sizes.append(n_resamples % batch_size)
+    return sizes
+
+
+def _bootstrap_batch(X: np.ndarray, y: np.ndarray, task: tuple) -> np.ndarray:
+    # Coefficients of a batch of case-resampled fits
+    seed, size = task
+    rng = np.random.default_rng(seed)
+    n, p = X.shape
+    # Resampled row indices as per-row counts (weights) of each resample
+    idx = rng.integers(0, n, size=(size, n)) + (np.arange(size) * n)[:, None]
+    weights = np.bincount(idx.ravel(), minlength=size * n).reshape(size, n).astype(np.float64)
+    outer = (X[:, :, None] * X[:, None, :]).reshape(n, p * p)
+    xtx = (weights @ outer).reshape(size, p, p)
+    xty = weights @ (X * y[:, None])
+    return np.einsum("bij,bj->bi", np.linalg.pinv(xtx, hermitian=True), xty)
+
+
+def _permutation_batch(X: np.ndarray, xtx_inv: np.ndarray, fitted: np.ndarray,
+                       residuals: np.ndarray, column: int, task: tuple) -> np.ndarray:
+    # t statistics of one coefficient for a batch of permuted residuals
+    seed, size = task
+    rng = np.random.default_rng(seed)
+    n, p = X.shape
+    y_perm = fitted + rng.permuted(np.broadcast_to(residuals, (size, n)), axis=1)
+    xty = y_perm @ X
+    beta = xty @ xtx_inv
+    rss = np.einsum("bn,bn->b", y_perm, y_perm) - np.einsum("bi,bi->b", beta, xty)
+    return beta[:, column] / np.sqrt(rss / (n - p) * xtx_inv[column, column])
+
+
+def _bca_interval(draws: np.ndarray, estimate: np.ndarray, jackknife: np.ndarray, alpha: float) -> tuple:
+    # Bias-corrected and accelerated percentile interval of every coefficient
+    from scipy.special import ndtr, ndtri
+
+    below = (draws < estimate).mean(axis=0) + 0.5 * (draws == estimate).mean(axis=0)
+    z0 = ndtri(below)
+    u = jackknife.mean(axis=0) - jackknife
+    with np.errstate(divide="ignore", invalid="ignore"):
+        accel = (u ** 3).sum(axis=0) / (6 * ((u ** 2).sum(axis=0)) ** 1.5)
+    z = ndtri(np.array([alpha / 2, 1 - alpha / 2]))[:, None]
+    levels = ndtr(z0 + (z0 + z) / (1 - accel * (z0 + z)))
+    low = [np.quantile(draws[:, j], levels[0, j]) for j in range(draws.shape[1])]
+    high = [np.quantile(draws[:, j], levels[1, j]) for j in range(draws.shape[1])]
+    return np.array(low), np.array(high)
+
+
+def _jackknife_params(X: np.ndarray, y: np.ndarray, xtx_inv: np.ndarray, beta: np.ndarray) -> np.ndarray:
+    # Leave-one-out coefficients in closed form (Sherman-Morrison downdate)
+    influence = X @ xtx_inv
+    leverage = np.einsum("ni,ni->n", influence, X)
+    residuals = y - X @ beta
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return beta - influence * (residuals / (1 - leverage))[:, None]
+
+
+def resample_ols(
+    X: np.ndarray,
+    y: np.ndarray,
+    names: Sequence[str],
+    method: str = "bootstrap",
+    n_resamples: int = 2000,
+    interval: str = "bca",
+    alpha: float = 0.05,
+    batch_size: Optional[int] = None,
+    n_jobs: Optional[int] = 1,
+    seed: int = 0,
+) -> dict:
+    """
+    Bootstrap intervals or permutation p-values for every OLS coefficient.
+
+    ``method="bootstrap"`` resamples rows and returns percentile or BCa
+    intervals (``interval``); ``method="permutation"`` returns Freedman-Lane
+    p-values for every coefficient except the intercept. Batches run in a
+    process pool when ``n_jobs`` > 1. The result also reports the number of
+    refits per second.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    names = list(names)
+    n = len(y)
+    xtx_inv = np.linalg.pinv(X.T @ X, hermitian=True)
+    beta = xtx_inv @ (X.T @ y)
+    sizes = _batch_sizes(n_resamples, n, batch_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = list(zip(seeds, sizes))
+    result = {"method": method, "n_resamples": n_resamples, "params": pd.Series(beta, index=names)}
+
+    start = time.perf_counter()
+    if method == "bootstrap":
+        draws = np.vstack(list(imap_bounded(partial(_bootstrap_batch, X, y), tasks, n_jobs=n_jobs)))
+        if interval == "bca":
+            low, high = _bca_interval(draws, beta, _jackknife_params(X, y, xtx_inv, beta), alpha)
+        elif interval == "percentile":
+            low, high = np.quantile(draws, [alpha / 2, 1 - alpha / 2], axis=0)
+        else:
+            raise ValueError(f"Unknown interval type: {interval}")
+        result.update({
+            "ci_low": pd.Series(low, index=names),
+            "ci_high": pd.Series(high, index=names),
+            "draws": pd.DataFrame(draws, columns=names),
+        })
+        n_refits = n_resamples
+    elif method == "permutation":
+        p_values = pd.Series(np.nan, index=names)
+        tested = [j for j, name in enumerate(names) if name != CONST_NAME]
+        for j in tested:
+            # Fit the model without predictor j, then permute its residuals
+            reduced = np.delete(X, j, axis=1)
+            fitted = reduced @ np.linalg.lstsq(reduced, y, rcond=None)[0]
+            stat = beta[j] / np.sqrt((y - X @ beta) @ (y - X @ beta) / (n - X.shape[1]) * xtx_inv[j, j])
+            func = partial(_permutation_batch, X, xtx_inv, fitted, y - fitted, j)
+            null = np.concatenate(list(imap_bounded(func, tasks, n_jobs=n_jobs)))
+            p_values.iloc[j] = (1 + np.sum(np.abs(null) >= abs(stat))) / (n_resamples + 1)
+        result["p_value"] = p_values
+        n_refits = n_resamples * len(tested)
+    else:
+        raise ValueError(f"Unknown resampling method: {method}")
+
+    seconds = time.perf_counter() - start
+    result["seconds"] = seconds
+    result["refits_per_sec"] = n_refits / seconds if seconds > 0 else np.inf
+    logger.info("%s: %d refits on %d rows in %.2fs (%.0f refits/sec)",
+                method.capitalize(), n_refits, n, seconds, result["refits_per_sec"])
+    return result
+
+
+def resample_interaction_effects(df: pd.DataFrame, method: str = "bootstrap", **kwargs) -> dict:
+    # Resampling inference for the centered stress x sleep interaction model
+    data = df[INTERACTION_PREDICTORS + [OUTCOME_COL]].dropna()
+    X = np.column_stack([np.ones(len(data)), data[INTERACTION_PREDICTORS].to_numpy(dtype=np.float64)])
+    return resample_ols(X, data[OUTCOME_COL].to_numpy(), [CONST_NAME] + INTERACTION_PREDICTORS,
+                        method=method, **kwargs)
@@ -0,0 +1,222 @@
+from functools import reduce
+from typing import Iterable, Optional, Sequence
+import numpy as np
+import pandas as pd
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Name of the intercept column (matches statsmodels' add_constant)
+CONST_NAME = "const"
+
+
+def compute_ols_stats(X: np.ndarray, y: np.ndarray, names: Optional[Sequence[str]] = None) -> dict:
+    """
+    Accumulate the OLS sufficient statistics of one chunk of rows.
+
+    The result holds X'X, X'y, y'y, sum(y) and n; statistics of different
+    chunks can be combined with ``merge_ols_stats`` in any order.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if names is None:
+        names = [f"x{i}" for i in range(X.shape[1])]
+    return {
+        "names": list(names),
+        "xtx": X.T @ X,
+        "xty": X.T @ y,
+        "yty": float(y @ y),
+        "sum_y": float(y.sum()),
+        "n": int(len(y)),
+    }
+
+
+
+def compute_grouped_ols_stats(X: np.ndarray, y: np.ndarray, groups: np.ndarray, n_groups: int,
+                              names: Optional[Sequence[str]] = None) -> dict:
+    """
+    Sufficient statistics of every group in one vectorized scan.
+
+    ``groups`` holds integer group codes in ``[0, n_groups)``. Rows are sorted
+    by group once and the per-row outer products are summed per group with
+    ``np.add.reduceat``. Returns the keys of ``compute_ols_stats`` with a
+    leading group axis; groups without rows get zero statistics.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    groups = np.asarray(groups)
+    n_rows, p = X.shape
+    if names is None:
+        names = [f"x{i}" for i in range(p)]
+    order = np.argsort(groups, kind="stable")
+    X, y, groups = X[order], y[order], groups[order]
+    present, starts = np.unique(groups, return_index=True)
+
+    def per_group(values: np.ndarray) -> np.ndarray:
+        # Sum rows per group, leaving zeros for groups without rows
+        out = np.zeros((n_groups,) + values.shape[1:])
+        if n_rows:
+            out[present] = np.add.reduceat(values, starts, axis=0)
+        return out
+
+    outer = (X[:, :, None] * X[:, None, :]).reshape(n_rows, p * p)
+    return {
+        "names": list(names),
+        "xtx": per_group(outer).reshape(n_groups, p, p),
+        "xty": per_group(X * y[:, None]),
+        "yty": per_group(y * y),
+        "sum_y": per_group(y),
+        "n": np.bincount(groups, minlength=n_groups),
+    }
+
+def merge_ols_stats(stats_list: Iterable[dict]) -> dict:
+    # Add up the sufficient statistics of several chunks or partitions
+    def merge_two(left: dict, right: dict) -> dict:
+        if left["names"] != right["names"]:
+            raise ValueError("Cannot merge OLS statistics with different predictors")
+        return {
+            "names": left["names"],
+            "xtx": left["xtx"] + right["xtx"],
+            "xty": left["xty"] + right["xty"],
+            "yty": left["yty"] + right["yty"],
+            "sum_y": left["sum_y"] + right["sum_y"],
+            "n": left["n"] + right["n"],
+        }
+
+    return reduce(merge_two, stats_list)
+
+
+def reparametrize_ols_stats(stats: dict, T: np.ndarray, names: Sequence[str]) -> dict:
+    # Express the statistics in the design X @ T (e.g. after centering predictors)
+    return {
+        **stats,
+        "names": list(names),
+        "xtx": T.T @ stats["xtx"] @ T,
+        "xty": T.T @ stats["xty"],
+    }
+
+
+def fit_ols_from_stats(stats: dict) -> "SuffStatsOLSResults":
+    # Solve the normal equations and derive the usual OLS inference quantities
+    return SuffStatsOLSResults(stats)
+
+
+class SuffStatsOLSResults:
+    """
+    OLS results computed from sufficient statistics only.
+
+    Mirrors the parts of statsmodels' ``RegressionResults`` the pipeline uses
+    (``params``, ``bse``, ``tvalues``, ``pvalues``, ``rsquared``,
+    ``rsquared_adj``, ``fvalue``, ``cov_params()``, ``conf_int()``) without
+    keeping the data, residuals or fitted values. The pseudo-inverse of X'X is
+    used, as in statsmodels, so rank-deficient designs behave the same way.
+    """
+
+    def __init__(self, stats: dict):
+        from scipy import stats as sp_stats
+
+        self.stats = stats
+        names = stats["names"]
+        xtx, xty = stats["xtx"], stats["xty"]
+        n = stats["n"]
+
+        self.nobs = float(n)
+        self.normalized_cov_params = np.linalg.pinv(xtx, hermitian=True)
+        beta = self.normalized_cov_params @ xty
+        rank = np.linalg.matrix_rank(xtx)
+        self.k_constant = int(CONST_NAME in names)
+        self.df_model = float(rank - self.k_constant)
+        self.df_resid = float(n - rank)
+
+        # Residual and total sums of squares from y'y, X'y and sum(y)
+        self.ssr = max(float(stats["yty"] - 2 * beta @ xty + beta @ xtx @ beta), 0.0)
+        if self.k_constant:
+            self.centered_tss = stats["yty"] - stats["sum_y"] ** 2 / n
+        else:
+            self.centered_tss = stats["yty"]
+        self.scale = self.ssr / self.df_resid
+
+        self.params = pd.Series(beta, index=names)
+        cov = self.scale * self.normalized_cov_params
+        self.bse = pd.Series(np.sqrt(np.diag(cov)), index=names)
+        self.tvalues = self.params / self.bse
+        self.pvalues = pd.Series(2 * sp_stats.t.sf(np.abs(self.tvalues), self.df_resid), index=names)
+
+        self.rsquared = 1 - self.ssr / self.centered_tss
+        self.rsquared_adj = 1 - (n - self.k_constant) / self.df_resid * (1 - self.rsquared)
+        ess = self.centered_tss - self.ssr
+        self.fvalue = (ess / self.df_model) / self.scale if self.df_model > 0 else np.nan
+        self.f_pvalue = sp_stats.f.sf(self.fvalue, self.df_model, self.df_resid) if self.df_model > 0 else np.nan
+
+    def cov_params(self) -> pd.DataFrame:
+        # Covariance matrix of the coefficient estimates
+        names = self.params.index
+        return pd.DataFrame(self.scale * self.normalized_cov_params, index=names, columns=names)
+
+    def conf_int(self, alpha: float = 0.05) -> pd.DataFrame:
+        # Confidence intervals for the coefficients based on the t distribution
+        from scipy import stats as sp_stats
+
+        q = sp_stats.t.ppf(1 - alpha / 2, self.df_resid)
+        return pd.DataFrame({0: self.params - q * self.bse, 1: self.params + q * self.bse})
+
+    def predict(self, exog) -> np.ndarray:
+        # Mean prediction for a design matrix with the same columns as the fit
+        return np.asarray(exog, dtype=np.float64) @ self.params.to_numpy()
+
+    def summary_text(self) -> str:
+        # Plain-text coefficient table with the overall fit statistics
+        table = pd.DataFrame({
+            "coef": self.params,
+            "std err": self.bse,
+            "t": self.tvalues,
+            "P>|t|": self.pvalues,
+        })
+        header = (
+            f"OLS (sufficient statistics)  No. Observations: {int(self.nobs)}  "
+            f"R-squared: {self.rsquared:.3f}  Adj. R-squared: {self.rsquared_adj:.3f}  "
+            f"F-statistic: {self.fvalue:.3f}  Prob (F-statistic): {self.f_pvalue:.3g}"
+        )
+        return f"{header}\n{table.to_string(float_format=lambda v: f'{v:.4f}')}"
+
+
+def fit_ols_batch(stats: dict) -> dict:
+    """
+    Solve many OLS problems at once from stacked sufficient statistics.
+
+    ``stats`` holds the usual keys with a leading group axis: ``xtx``
+    (g, p, p), ``xty`` (g, p) and ``yty``, ``sum_y``, ``n`` (g,). Returns a
+    dict of arrays: ``params``, ``bse``, ``tvalues``, ``pvalues`` (g, p) and
+    ``df_resid``, ``rsquared``, ``nobs`` (g,). Groups without residual degrees
+    of freedom get NaN inference.
+    """
+    from scipy import stats as sp_stats
+
+    xtx, xty = stats["xtx"], stats["xty"]
+    n = np.asarray(stats["n"], dtype=np.float64)
+    cov_unscaled = np.linalg.pinv(xtx, hermitian=True)
+    beta = np.einsum("gij,gj->gi", cov_unscaled, xty)
+    rank = np.linalg.matrix_rank(xtx, hermitian=True)
+    df_resid = n - rank
+    ssr = np.maximum(stats["yty"] - 2 * np.einsum("gi,gi->g", beta, xty)
+                     + np.einsum("gi,gij,gj->g", beta, xtx, beta), 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scale = np.where(df_resid > 0, ssr / df_resid, np.nan)
+        bse = np.sqrt(np.diagonal(cov_unscaled, axis1=1, axis2=2) * scale[:, None])
+        tvalues = beta / bse
+        pvalues = 2 * sp_stats.t.sf(np.abs(tvalues), df_resid[:, None])
+        if CONST_NAME in stats["names"]:
+            centered_tss = stats["yty"] - np.asarray(stats["sum_y"]) ** 2 / n
+        else:
+            centered_tss = np.asarray(stats["yty"], dtype=np.float64)
+        rsquared = 1 - ssr / centered_tss
+    return {
+        "names": list(stats["names"]),
+        "params": beta,
+        "bse": bse,
+        "tvalues": tvalues,
+        "pvalues": pvalues,
+        "df_resid": df_resid,
+        "rsquared": rsquared,
+        "nobs": n,
+    }
@@ -0,0 +1,136 @@
+import json
+import os
+from typing import Optional
+import numpy as np
+import pandas as pd
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Number of non-null values inspected per column when inferring its type
+DEFAULT_SAMPLE_SIZE = 1000
+
+# Datetime formats tried, in order, on the sampled values
+DATETIME_FORMATS = [
+    "%Y-%m-%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%m/%d/%Y",
+    "%d/%m/%Y",
+    "%m/%d/%Y %H:%M",
+    "%d/%m/%Y %H:%M",
+]
+
+# Shape a value must have before datetime formats are tried at all
+DATETIME_PATTERN = r"\d{4}-\d{2}-\d{2}|\d{2}/\d{2}/\d{4}"
+
+
+def _is_text_column(series: pd.Series) -> bool:
+    # Object columns and (pandas >= 3) string columns both hold raw text
+    return pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)
+
+
+def sample_positions(n_rows: int, sample_size: int = DEFAULT_SAMPLE_SIZE, seed: int = 0) -> np.ndarray:
+    # Sorted row positions inspected by infer_column_types (all rows when there are few)
+    if n_rows <= sample_size:
+        return np.arange(n_rows)
+    rng = np.random.default_rng(seed)
+    return np.sort(rng.choice(n_rows, size=sample_size, replace=False))
+
+
+def _sample_values(series: pd.Series, sample_size: int, seed: int) -> pd.Series:
+    # Draw a bounded random sample of rows and keep the non-null values
+    if len(series) > sample_size:
+        series = series.iloc[sample_positions(len(series), sample_size, seed)]
+    return series.dropna().astype(str)
+
+
+def _infer_numeric(sample: pd.Series) -> Optional[str]:
+    # Return the numeric dtype the sample fits in, or None if any value is not numeric
+    values = pd.to_numeric(sample, errors="coerce")
+    if values.isna().any():
+        return None
+    is_integer = np.array_equal(values, np.floor(values))
+    return "int64" if is_integer else "float64"
+
+
+def _infer_datetime_format(sample: pd.Series) -> Optional[str]:
+    # Return the first format that parses every sampled value
+    if not sample.str.contains(DATETIME_PATTERN).any():
+        return None
+    for fmt in DATETIME_FORMATS:
+        if pd.to_datetime(sample, format=fmt, errors="coerce").notna().all():
+            return fmt
+    return None
+
+
+def infer_column_types(
+    df: pd.DataFrame,
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+    seed: int = 0,
+) -> dict:
+    """
+    Infer a conversion schema for the text columns of ``df``.
+
+    Each column is decided from at most ``sample_size`` randomly drawn rows.
+    The schema maps column names to ``{"kind": "numeric", "dtype": ...}`` or
+    ``{"kind": "datetime", "format": ...}``; columns that stay text are omitted.
+    """
+    schema = {}
+    for col in df.columns:
+        if not _is_text_column(df[col]):
+            continue
+        sample = _sample_values(df[col], sample_size, seed)
+        if sample.empty:
+            continue
+        numeric_dtype = _infer_numeric(sample)
+        if numeric_dtype is not None:
+            schema[col] = {"kind": "numeric", "dtype": numeric_dtype}
+            continue
+        datetime_format = _infer_datetime_format(sample)
+        if datetime_format is not None:
+            schema[col] = {"kind": "datetime", "format": datetime_format}
+    logger.info("Inferred types for %d of %d columns", len(schema), df.shape[1])
+    return schema
+
+
+def _convert_numeric(series: pd.Series, dtype: str) -> Optional[pd.Series]:
+    # Cast a column in one pass with an explicit dtype (much cheaper than to_numeric);
+    # a value outside the sample that does not parse rejects the conversion
+    if dtype == "int64" and series.hasnans:
+        dtype = "float64"
+    try:
+        return series.astype(dtype)
+    except (TypeError, ValueError):
+        return None
+
+
+def apply_column_types(df: pd.DataFrame, schema: dict) -> pd.DataFrame:
+    # Convert each column of the schema once, with an explicit dtype or format
+    converted = {}
+    for col, spec in schema.items():
+        if col not in df.columns:
+            continue
+        if spec["kind"] == "numeric":
+            values = _convert_numeric(df[col], spec["dtype"])
+            if values is None:
+                logger.info("Column %s has non-numeric values outside the sample; keeping text", col)
+                continue
+            converted[col] = values
+        elif spec["kind"] == "datetime":
+            converted[col] = pd.to_datetime(df[col], format=spec["format"], errors="coerce")
+    # New frame either way; unconverted columns are shared, not copied (copy-on-write)
+    return df.assign(**converted) if converted else df.copy(deep=False)
+
+
+def save_schema(schema: dict, path: str) -> None:
+    # Persist an inferred schema as JSON so later runs can skip inference
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(schema, f, indent=2)
+
+
+def load_schema(path: str) -> dict:
+    # Load a schema written by save_schema
+    with open(path) as f:
+        return json.load(f)
@@ -0,0 +1,164 @@
+"""
+Per-stage timing and memory instrumentation.
+
+``instrument`` (a decorator) and ``stage_timer`` (a context manager) measure
+wall time, CPU time, the growth of peak RSS and the rows going in and out of
+a stage, and emit one JSON record per call on the ``instrumentation`` logger.
+Its records are written by a background queue listener to a dated
+``*_metrics.jsonl`` file, so measuring never blocks on I/O.
+
+Two opt-in extras are configured with ``configure_instrumentation`` (or the
+environment variables below, which worker processes inherit):
+
+* ``trace_memory`` starts ``tracemalloc`` and adds each stage's peak traced
+  allocation above what was allocated when it started (nested stages
+  included) to its record;
+* ``profile_dir`` runs every outermost stage under ``cProfile`` and dumps
+  its profile to ``<profile_dir>/<stage>-<pid>.prof``, with the top
+  functions by cumulative time in a ``.txt`` next to it.
+"""
+import contextlib
+import cProfile
+import functools
+import json
+import logging
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Optional
+import pandas as pd
+from src.utils.logger import BackgroundQueueHandler, _LazyFileHandler, log_path
+from src.utils.memory import peak_rss_mb
+
+# Environment variables holding the opt-in settings
+TRACE_MEMORY_ENV = "STRESS_TRACE_MEMORY"
+PROFILE_DIR_ENV = "STRESS_PROFILE_DIR"
+
+# Functions listed in the text summary of a stage profile
+PROFILE_TOP_N = 30
+
+# Open stages of the current thread (innermost last)
+_local = threading.local()
+
+
+def _metrics_logger() -> logging.Logger:
+    # JSON lines only, written by their own background listener
+    logger = logging.getLogger("instrumentation")
+    logger.setLevel(logging.INFO)
+    if not logger.handlers:
+        file_handler = _LazyFileHandler(log_path("metrics.jsonl"))
+        file_handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(BackgroundQueueHandler(file_handler))
+        logger.propagate = False
+    return logger
+
+
+def configure_instrumentation(trace_memory: Optional[bool] = None, profile_dir: Optional[str] = None) -> None:
+    # Turn the opt-in memory tracing and profiling on or off (None leaves a setting unchanged)
+    if trace_memory is not None:
+        os.environ[TRACE_MEMORY_ENV] = "1" if trace_memory else ""
+    if profile_dir is not None:
+        os.environ[PROFILE_DIR_ENV] = profile_dir
+
+
+def _count_rows(value) -> Optional[int]:
+    # Rows of a frame, or of the first frame of a tuple of outputs
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return len(value)
+    if isinstance(value, tuple):
+        return next((len(v) for v in value if isinstance(v, (pd.DataFrame, pd.Series))), None)
+    return None
+
+
+def _dump_profile(profiler: cProfile.Profile, profile_dir: str, name: str) -> str:
+    # Write the raw profile and a readable top list of cumulative hot paths next to it
+    os.makedirs(profile_dir, exist_ok=True)
+    path = os.path.join(profile_dir, f"{name}-{os.getpid()}.prof")
+    profiler.dump_stats(path)
+    with open(os.path.splitext(path)[0] + ".txt", "w") as f:
+        pstats.Stats(profiler, stream=f).sort_stats("cumulative").print_stats(PROFILE_TOP_N)
+    return path
+
+
+@contextlib.contextmanager
+def stage_timer(name: str, rows_in: Optional[int] = None):
+    """
+    Measure the enclosed block as stage ``name`` and emit its JSON record.
+
+    Yields the record dict; set ``record["rows_out"]`` inside the block to
+    report the rows produced. The record is emitted even if the block raises.
+    """
+    stack = _local.__dict__.setdefault("stack", [])
+    trace = bool(os.environ.get(TRACE_MEMORY_ENV))
+    if trace and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    if trace and stack:
+        # Keep the enclosing stage's peak before resetting it for this one
+        stack[-1]["traced_peak"] = max(stack[-1]["traced_peak"], tracemalloc.get_traced_memory()[1])
+    if trace:
+        tracemalloc.reset_peak()
+    traced_start = tracemalloc.get_traced_memory()[0] if trace else 0
+
+    profile_dir = os.environ.get(PROFILE_DIR_ENV)
+    # Only one cProfile profiler can be active, so nested stages are part of the outermost profile
+    profiler = cProfile.Profile() if profile_dir and not stack else None
+
+    record = {"stage": name, "rows_in": rows_in, "rows_out": None}
+    frame = {"traced_peak": 0}
+    stack.append(frame)
+    rss_before = peak_rss_mb()
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield record
+        record["status"] = "ok"
+    except BaseException:
+        record["status"] = "error"
+        raise
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        rss_after = peak_rss_mb()
+        record.update({
+            "wall_seconds": time.perf_counter() - start,
+            "cpu_seconds": time.process_time() - cpu_start,
+            "peak_rss_mb": rss_after,
+            "peak_rss_growth_mb": rss_after - rss_before,
+        })
+        stack.pop()
+        if trace:
+            peak = max(frame["traced_peak"], tracemalloc.get_traced_memory()[1])
+            record["peak_alloc_mb"] = (peak - traced_start) / 1e6
+            if stack:
+                stack[-1]["traced_peak"] = max(stack[-1]["traced_peak"], peak)
+        if profiler is not None:
+            record["profile"] = _dump_profile(profiler, profile_dir, name)
+        record.update({"pid": os.getpid(), "time": datetime.now().isoformat(timespec="milliseconds")})
+        _metrics_logger().info(json.dumps(record))
+
+
+def instrument(func: Optional[Callable] = None, name: Optional[str] = None):
+    """
+    Decorate a stage function so each call is measured by ``stage_timer``.
+
+    The stage is named after the function unless ``name`` is given; the rows
+    of the first frame argument and of the returned frame are recorded.
+    Usable as ``@instrument`` or ``@instrument(name=...)``.
+    """
+    if func is None:
+        return functools.partial(instrument, name=name)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        rows_in = next((n for n in map(_count_rows, (*args, *kwargs.values())) if n is not None), None)
+        with stage_timer(name or func.__qualname__, rows_in=rows_in) as record:
+            result = func(*args, **kwargs)
+            record["rows_out"] = _count_rows(result)
+        return result
+
+    return wrapper
@@ -1,22 +1,71 @@
 import logging
 import os
+import queue
+import threading
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 
-# Utility function to set up a logger
-def get_logger(name: str) -> logging.Logger:
-    log_dir = "logs"
-    os.makedirs(log_dir, exist_ok=True)
-    # Create a log file with a timestamp
-    log_filename = os.path.join(
-        log_dir,
-        f"{datetime.now().strftime('%Y%m%d')}_project.log"
-    )
-    # Configure the logger
-    logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
-    # Avoid adding multiple handlers to the logger
-    if not logger.handlers:
-        file_handler = logging.FileHandler(log_filename)
+# Handlers shared by every project logger, created on first use
+_handlers = []
+
+
+class _LazyFileHandler(logging.FileHandler):
+    # File handler that creates its directory and opens the file on the first record
+    def __init__(self, filename: str):
+        super().__init__(filename, delay=True)
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+
+class BackgroundQueueHandler(QueueHandler):
+    """
+    Queue handler whose records are written by a background listener thread.
+
+    The calling thread only formats the message and enqueues the record; the
+    target handlers (file and console I/O) run on the listener. The listener
+    is started lazily in whichever process emits, so worker processes forked
+    from the pipeline get their own, and it is stopped (draining the queue)
+    when the process exits.
+    """
+
+    def __init__(self, *targets: logging.Handler):
+        super().__init__(queue.SimpleQueue())
+        self.targets = targets
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _ensure_listener(self) -> None:
+        if self._pid == os.getpid():
+            return
+        from multiprocessing import util
+
+        with self._lock:
+            if self._pid != os.getpid():
+                # A forked child inherits the parent's queue but not its listener thread
+                self.queue = queue.SimpleQueue()
+                listener = QueueListener(self.queue, *self.targets, respect_handler_level=True)
+                listener.start()
+                # multiprocessing runs its finalizers at exit in the main process and in pool workers
+                util.Finalize(listener, listener.stop, exitpriority=0)
+                self._pid = os.getpid()
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        self._ensure_listener()
+        super().enqueue(record)
+
+
+def log_path(suffix: str, log_dir: str = "logs") -> str:
+    # Dated log file of the project
+    return os.path.join(log_dir, f"{datetime.now().strftime('%Y%m%d')}_{suffix}")
+
+
+def _shared_handlers() -> list:
+    # Build the file and console handlers once per process, behind one queue
+    if not _handlers:
+        # Create a log file with a timestamp
+        file_handler = _LazyFileHandler(log_path("project.log"))
         console_handler = logging.StreamHandler()
         # Set formatter for both handlers
         formatter = logging.Formatter(
@@ -25,8 +74,18 @@ def get_logger(name: str) -> logging.Logger:
         # Apply the formatter to both handlers
         file_handler.setFormatter(formatter)
         console_handler.setFormatter(formatter)
+        _handlers.append(BackgroundQueueHandler(file_handler, console_handler))
+    return _handlers
+
 
-        logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
+# Utility function to set up a logger
+def get_logger(name: str) -> logging.Logger:
+    # Configure the logger
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.INFO)
+    # Avoid adding multiple handlers to the logger
+    if not logger.handlers:
+        for handler in _shared_handlers():
+            logger.addHandler(handler)
 
-    return logger
\ No newline at end of file
+    return logger
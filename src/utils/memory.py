@@ -0,0 +1,26 @@
+import sys
+
+try:
+    import resource
+except ImportError:  # resource is not available on Windows
+    resource = None
+
+
+def peak_rss_mb() -> float:
+    # Return the peak resident set size of the current process in megabytes
+    if resource is None:
+        return float("nan")
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def enable_copy_on_write() -> None:
+    # pandas >= 3 always uses copy-on-write; older versions have to opt in so that
+    # derived frames share unchanged columns instead of copying them
+    import pandas as pd
+
+    if int(pd.__version__.split(".")[0]) < 3:
+        pd.set_option("mode.copy_on_write", True)
@@ -0,0 +1,43 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, Optional
+
+
+def resolve_n_jobs(n_jobs: Optional[int]) -> int:
+    # Map None/-1 to the number of available cores and clamp to at least one worker
+    if n_jobs is None or n_jobs < 0:
+        return os.cpu_count() or 1
+    return max(1, n_jobs)
+
+
+def imap_bounded(
+    func: Callable,
+    items: Iterable,
+    n_jobs: Optional[int] = 1,
+    use_threads: bool = False,
+    max_pending: Optional[int] = None,
+) -> Iterator:
+    """
+    Apply ``func`` to each item in a worker pool and yield results in order.
+
+    At most ``max_pending`` items (twice the worker count by default) are in
+    flight at once, so a lazy iterator of chunks is never fully materialized.
+    With a single worker the items are processed inline without a pool.
+    """
+    n_jobs = resolve_n_jobs(n_jobs)
+    if n_jobs == 1:
+        for item in items:
+            yield func(item)
+        return
+
+    max_pending = max_pending or 2 * n_jobs
+    executor_class = ThreadPoolExecutor if use_threads else ProcessPoolExecutor
+    with executor_class(max_workers=n_jobs) as executor:
+        pending = deque()
+        for item in items:
+            pending.append(executor.submit(func, item))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
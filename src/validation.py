@@ -0,0 +1,151 @@
+from typing import Iterable, Optional
+import numpy as np
+import pandas as pd
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Supported rule types and the fields each one reads:
+#   range       -> "min" and/or "max" (inclusive bounds)
+#   not_null    -> no extra fields
+#   domain      -> "values" (allowed categories; missing values are not flagged)
+#   iqr         -> "k" (fences at Q1 - k*IQR and Q3 + k*IQR)
+#   zscore      -> "threshold" (absolute standardized distance from the mean)
+NUMERIC_RULE_TYPES = ("range", "iqr", "zscore")
+
+# Range checks on the key columns of the student dataset
+RANGE_RULES = [
+    {"name": "invalid_stress", "column": "Stress_Level (1-10)", "type": "range", "min": 1, "max": 10},
+    {"name": "invalid_sleep", "column": "Sleep_Hours_per_Night", "type": "range", "min": 0},
+    {"name": "invalid_total_score", "column": "Total_Score", "type": "range", "min": 0, "max": 100},
+]
+
+# Default IQR multiplier for outlier fences
+DEFAULT_IQR_K = 1.5
+
+
+def outlier_rules(columns: Iterable[str], method: str = "iqr", k: float = DEFAULT_IQR_K, threshold: float = 3.0) -> list:
+    # Declare one IQR or z-score outlier rule per column
+    rules = []
+    for col in columns:
+        rule = {"name": f"outlier_{col}", "column": col, "type": method}
+        rule.update({"k": k} if method == "iqr" else {"threshold": threshold})
+        rules.append(rule)
+    return rules
+
+
+def _numeric_bounds(block: np.ndarray, rules: list, fixed: Optional[dict] = None) -> tuple:
+    # Compute the lower and upper bound of every numeric rule in vectorized form;
+    # rules named in ``fixed`` take their (lower, upper) from it instead
+    fixed = fixed or {}
+    n_rules = len(rules)
+    lower = np.full(n_rules, -np.inf)
+    upper = np.full(n_rules, np.inf)
+    types = np.array(["fixed" if rule["name"] in fixed else rule["type"] for rule in rules])
+
+    for i, rule in enumerate(rules):
+        if rule["name"] in fixed:
+            lower[i], upper[i] = fixed[rule["name"]]
+        elif rule["type"] == "range":
+            lower[i] = rule.get("min", -np.inf)
+            upper[i] = rule.get("max", np.inf)
+
+    # All quartiles are computed in one call over the IQR columns
+    iqr_idx = np.flatnonzero(types == "iqr")
+    if iqr_idx.size:
+        q1, q3 = np.nanquantile(block[:, iqr_idx], [0.25, 0.75], axis=0)
+        k = np.array([rules[i].get("k", DEFAULT_IQR_K) for i in iqr_idx])
+        lower[iqr_idx] = q1 - k * (q3 - q1)
+        upper[iqr_idx] = q3 + k * (q3 - q1)
+
+    # Means and standard deviations are computed in one call over the z-score columns
+    z_idx = np.flatnonzero(types == "zscore")
+    if z_idx.size:
+        mean = np.nanmean(block[:, z_idx], axis=0)
+        std = np.nanstd(block[:, z_idx], axis=0, ddof=1)
+        threshold = np.array([rules[i].get("threshold", 3.0) for i in z_idx])
+        lower[z_idx] = mean - threshold * std
+        upper[z_idx] = mean + threshold * std
+
+    return lower, upper
+
+
+def _other_mask(df: pd.DataFrame, rule: dict) -> np.ndarray:
+    # Evaluate a non-numeric rule on a single column
+    values = df[rule["column"]]
+    if rule["type"] == "not_null":
+        return values.isna().to_numpy()
+    if rule["type"] == "domain":
+        return (~values.isin(rule["values"]) & values.notna()).to_numpy()
+    raise ValueError(f"Unknown validation rule type: {rule['type']}")
+
+
+def validate(df: pd.DataFrame, rules: list, bounds: Optional[dict] = None) -> dict:
+    """
+    Evaluate declarative validation rules and return row-level violation masks.
+
+    Numeric rules (range, IQR, z-score) are evaluated together on one float
+    block of the referenced columns. Rules on missing columns are skipped.
+    ``bounds`` maps rule names to precomputed ``(lower, upper)`` fences, so a
+    partition of the rows can be checked against statistics of all rows.
+    The result holds the rule list, one bit-packed violation mask per rule
+    (``masks``, shape ``(n_rules, ceil(n_rows / 8))``) and a ``summary`` frame
+    with the violation count of each rule.
+    """
+    rules = [rule for rule in rules if rule["column"] in df.columns]
+    numeric_rules = [rule for rule in rules if rule["type"] in NUMERIC_RULE_TYPES]
+    other_rules = [rule for rule in rules if rule["type"] not in NUMERIC_RULE_TYPES]
+    n_rows = len(df)
+
+    masks = np.empty((len(rules), n_rows), dtype=bool)
+    if numeric_rules:
+        # One float block holds every column referenced by a numeric rule
+        columns = list(dict.fromkeys(rule["column"] for rule in numeric_rules))
+        block = df[columns].to_numpy(dtype=np.float64, na_value=np.nan)
+        positions = [columns.index(rule["column"]) for rule in numeric_rules]
+        values = block[:, positions]
+        lower, upper = _numeric_bounds(values, numeric_rules, bounds)
+        # NaN compares False on both sides, so missing values are never flagged
+        masks[:len(numeric_rules)] = ((values < lower) | (values > upper)).T
+    for i, rule in enumerate(other_rules, start=len(numeric_rules)):
+        masks[i] = _other_mask(df, rule)
+
+    ordered = numeric_rules + other_rules
+    counts = masks.sum(axis=1)
+    summary = pd.DataFrame({
+        "rule": [rule["name"] for rule in ordered],
+        "column": [rule["column"] for rule in ordered],
+        "type": [rule["type"] for rule in ordered],
+        "violations": counts,
+        "fraction": counts / n_rows if n_rows else np.zeros(len(ordered)),
+    })
+    return {
+        "rules": ordered,
+        "n_rows": n_rows,
+        "masks": np.packbits(masks, axis=1),
+        "summary": summary,
+    }
+
+
+def rule_mask(result: dict, name: str) -> np.ndarray:
+    # Unpack the boolean violation mask of one rule
+    names = [rule["name"] for rule in result["rules"]]
+    packed = result["masks"][names.index(name)]
+    return np.unpackbits(packed, count=result["n_rows"]).astype(bool)
+
+
+def violation_mask(result: dict, names: Optional[Iterable[str]] = None) -> np.ndarray:
+    # Combine the masks of the given rules (all rules by default) with a bitwise OR
+    rows = list(range(len(result["rules"])))
+    if names is not None:
+        wanted = set(names)
+        rows = [i for i, rule in enumerate(result["rules"]) if rule["name"] in wanted]
+    if not rows:
+        return np.zeros(result["n_rows"], dtype=bool)
+    combined = np.bitwise_or.reduce(result["masks"][rows], axis=0)
+    return np.unpackbits(combined, count=result["n_rows"]).astype(bool)
+
+
+def filter_valid_rows(df: pd.DataFrame, result: dict, names: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    # Keep only the rows that violate none of the given rules
+    return df[~violation_mask(result, names)]
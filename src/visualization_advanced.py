@@ -1,9 +1,8 @@
 import os
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import statsmodels.api as sm
+from src.rendering import figure_job, render_figures
+from src.utils.instrumentation import instrument
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -26,11 +25,119 @@ def prepare_exog(stress_range, sleep_level):
     )
 
     # Add constant column for the regression model
-    exog = sm.add_constant(exog, has_constant='add')
+    exog.insert(0, 'const', 1.0)
 
     return exog
 
 
+# Mean prediction with confidence intervals from the coefficient vector and covariance
+def predict_mean_ci(model, exog, alpha=0.05):
+    """
+    Return a DataFrame with 'mean', 'mean_ci_lower' and 'mean_ci_upper' for the
+    rows of exog. Works for statsmodels results and sufficient-statistics fits,
+    since only params, cov_params() and df_resid are used.
+    """
+    from scipy import stats
+
+    exog = exog[model.params.index]
+    X = exog.to_numpy(dtype=float)
+    mean = X @ model.params.to_numpy()
+    # Standard error of the mean prediction: sqrt(x' Cov x) per row
+    se = np.sqrt(np.einsum("ij,jk,ik->i", X, model.cov_params().to_numpy(), X))
+    q = stats.t.ppf(1 - alpha / 2, model.df_resid)
+    return pd.DataFrame({
+        "mean": mean,
+        "mean_se": se,
+        "mean_ci_lower": mean - q * se,
+        "mean_ci_upper": mean + q * se,
+    }, index=exog.index)
+
+
+# Mean predictions and confidence bands over a whole stress x sleep grid
+def predict_grid(model, stress_values, sleep_values, alpha=0.05):
+    """
+    Predict the interaction model on every (sleep, stress) pair at once.
+
+    Returns a dict with the grid axes ("stress", "sleep") and 2D arrays of
+    shape (len(sleep), len(stress)): "mean", "mean_se", "mean_ci_lower" and
+    "mean_ci_upper". Only the coefficient vector and covariance matrix are
+    used, so dense grids cost one einsum.
+    """
+    from scipy import stats
+
+    stress = np.asarray(stress_values, dtype=float)
+    sleep = np.asarray(sleep_values, dtype=float)
+    s, h = np.meshgrid(stress, sleep)
+    columns = {
+        "const": np.ones_like(s),
+        "Stress_Level_c": s,
+        "Sleep_Hours_c": h,
+        "Stress_Sleep_Interaction_c": s * h,
+    }
+    # Design of every grid point, in the order of the model's coefficients
+    X = np.stack([columns[name] for name in model.params.index], axis=-1)
+    mean = X @ model.params.to_numpy()
+    se = np.sqrt(np.einsum("...j,jk,...k->...", X, model.cov_params().to_numpy(), X))
+    q = stats.t.ppf(1 - alpha / 2, model.df_resid)
+    return {
+        "stress": stress,
+        "sleep": sleep,
+        "mean": mean,
+        "mean_se": se,
+        "mean_ci_lower": mean - q * se,
+        "mean_ci_upper": mean + q * se,
+    }
+
+
+# Stress slope at given sleep levels (simple slopes) with t-based inference
+def simple_slopes(model, sleep_values, alpha=0.05):
+    """
+    Return a DataFrame with the conditional stress slope b_stress + b_int * sleep
+    at each centered sleep level, its standard error, t, p-value and CI.
+    """
+    from scipy import stats
+
+    sleep = np.asarray(sleep_values, dtype=float)
+    b, cov = model.params, model.cov_params()
+    s, i = "Stress_Level_c", "Stress_Sleep_Interaction_c"
+    slope = b[s] + b[i] * sleep
+    se = np.sqrt(cov.at[s, s] + 2 * sleep * cov.at[s, i] + sleep ** 2 * cov.at[i, i])
+    t = slope / se
+    q = stats.t.ppf(1 - alpha / 2, model.df_resid)
+    return pd.DataFrame({
+        "sleep": sleep,
+        "slope": slope,
+        "se": se,
+        "t": t,
+        "p_value": 2 * stats.t.sf(np.abs(t), model.df_resid),
+        "ci_lower": slope - q * se,
+        "ci_upper": slope + q * se,
+    })
+
+
+# Sleep levels where the stress slope changes significance (Johnson-Neyman)
+def johnson_neyman(model, alpha=0.05):
+    """
+    Solve (b_s + b_i h)^2 = t^2 (V_ss + 2 h V_si + h^2 V_ii) for the centered
+    sleep level h. Returns {"bounds": sorted real roots, "significant_at_zero":
+    whether the slope is significant at mean sleep}; significance flips at
+    each bound.
+    """
+    from scipy import stats
+
+    b, cov = model.params, model.cov_params()
+    s, i = "Stress_Level_c", "Stress_Sleep_Interaction_c"
+    q2 = stats.t.ppf(1 - alpha / 2, model.df_resid) ** 2
+    coefficients = [
+        b[i] ** 2 - q2 * cov.at[i, i],
+        2 * (b[s] * b[i] - q2 * cov.at[s, i]),
+        b[s] ** 2 - q2 * cov.at[s, s],
+    ]
+    roots = np.roots(coefficients)
+    bounds = np.sort(roots[np.isreal(roots)].real)
+    return {"bounds": bounds, "significant_at_zero": bool(coefficients[2] > 0)}
+
+
 # Prepare ranges for plotting the interaction effect
 def prepare_interaction_ranges(df):
     """
@@ -53,57 +160,98 @@ def prepare_interaction_ranges(df):
     return stress_range, sleep_levels
 
 
-# Plot the interaction effect with confidence intervals
-def plot_interaction_effect(df, model, output_dir="figures"):
-    """
-    Plot the interaction between Stress and Sleep, including 95% confidence intervals.
-    Saves the figure to the specified output directory.
-    """
-    os.makedirs(output_dir, exist_ok=True)
-    logger.info("Plotting interaction effect with confidence intervals")
-
-    stress_range, sleep_levels = prepare_interaction_ranges(df)
-
-    plt.figure(figsize=(8, 6))
-
-    for sleep_level in sleep_levels:
-        # Build exogenous variables for prediction
-        exog = prepare_exog(stress_range, sleep_level)
+# Long table of a prediction grid (one row per sleep level and stress value)
+def grid_frame(grid):
+    n_sleep, n_stress = grid["mean"].shape
+    return pd.DataFrame({
+        "stress": np.tile(grid["stress"], n_sleep),
+        "sleep": np.repeat(grid["sleep"], n_stress),
+        **{key: grid[key].ravel() for key in ["mean", "mean_se", "mean_ci_lower", "mean_ci_upper"]},
+    })
 
-        # Get prediction with confidence intervals
-        predictions = model.get_prediction(exog)
-        frame = predictions.summary_frame(alpha=0.05)
 
-        # Extract mean prediction and confidence intervals
-        y_pred = frame['mean']
-        y_lower = frame['mean_ci_lower']   # CI for mean prediction
-        y_upper = frame['mean_ci_upper']
+# Draw the prediction lines and confidence bands on the given figure
+def draw_interaction_effect(fig, predictions, y_limits):
+    ax = fig.subplots()
 
+    for sleep_level, frame in predictions.groupby("sleep_level", sort=False):
         label = f"Sleep (centered) = {sleep_level:.2f}"
 
         # Plot prediction line
-        line, = plt.plot(stress_range, y_pred, label=label)
+        line, = ax.plot(frame["stress"], frame["mean"], label=label)
 
         # Plot confidence interval band
-        plt.fill_between(
-            stress_range,
-            y_lower,
-            y_upper,
+        ax.fill_between(
+            frame["stress"],
+            frame["mean_ci_lower"],
+            frame["mean_ci_upper"],
             color=line.get_color(),
             alpha=0.1
         )
 
     # Set y-axis limits based on observed data
-    plt.ylim(df['Total_Score'].min(), df['Total_Score'].max())
+    ax.set_ylim(*y_limits)
 
-    plt.xlabel("Stress Level (centered)")
-    plt.ylabel("Total Score")
-    plt.title("Interaction: Stress × Sleep (with 95% CI)")
-    plt.legend()
+    ax.set_xlabel("Stress Level (centered)")
+    ax.set_ylabel("Total Score")
+    ax.set_title("Interaction: Stress × Sleep (with 95% CI)")
+    ax.legend()
 
+
+# Plot the interaction effect with confidence intervals
+@instrument
+def plot_interaction_effect(df, model, output_dir="figures"):
+    """
+    Plot the interaction between Stress and Sleep, including 95% confidence intervals.
+    Saves the figure to the specified output directory.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    logger.info("Plotting interaction effect with confidence intervals")
+
+    stress_range, sleep_levels = prepare_interaction_ranges(df)
+
+    # Predictions with confidence intervals for all sleep levels in one step
+    grid = predict_grid(model, stress_range, sleep_levels, alpha=0.05)
+    predictions = grid_frame(grid).rename(columns={"sleep": "sleep_level"})
+
+    # Only the prediction table is shipped to the renderer
     path = f"{output_dir}/interaction_effect_v2.png"
-    plt.tight_layout()
-    plt.savefig(path)
-    plt.close()
+    render_figures([figure_job(
+        draw_interaction_effect,
+        predictions,
+        path,
+        params={"y_limits": (df['Total_Score'].min(), df['Total_Score'].max())},
+        figsize=(8, 6),
+        tight_layout=True,
+    )])
+
+    logger.info("Saved improved interaction plot to %s", path)
+
 
-    logger.info("Saved improved interaction plot to %s", path)
\ No newline at end of file
+# Draw the predicted Total_Score over the stress x sleep plane
+def draw_response_surface(fig, predictions):
+    ax = fig.subplots()
+    surface = predictions.pivot(index="sleep", columns="stress", values="mean")
+    image = ax.pcolormesh(surface.columns, surface.index, surface.to_numpy(), shading="nearest", cmap="viridis")
+    fig.colorbar(image, ax=ax, label="Predicted Total Score")
+    ax.set_xlabel("Stress Level (centered)")
+    ax.set_ylabel("Sleep Hours (centered)")
+    ax.set_title("Response Surface: Stress × Sleep")
+
+
+# Plot the full response surface of the interaction model as a heatmap
+@instrument
+def plot_response_surface(df, model, output_dir="figures", resolution=100):
+    os.makedirs(output_dir, exist_ok=True)
+    logger.info("Plotting interaction response surface")
+    stress = np.linspace(df["Stress_Level_c"].min(), df["Stress_Level_c"].max(), resolution)
+    sleep = np.linspace(df["Sleep_Hours_c"].min(), df["Sleep_Hours_c"].max(), resolution)
+    path = f"{output_dir}/interaction_response_surface.png"
+    render_figures([figure_job(
+        draw_response_surface,
+        grid_frame(predict_grid(model, stress, sleep)),
+        path,
+        figsize=(8, 6),
+        tight_layout=True,
+    )])
+    logger.info("Saved response surface plot to %s", path)
@@ -1,32 +1,51 @@
 import os
+from typing import Optional
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+from src.column_profile import distribution_points, ensure_profile, histogram_edges
+from src.rendering import figure_job, render_figures
+from src.utils.instrumentation import instrument
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
-def plot_distributions(df: pd.DataFrame, output_dir: str = "figures"):
-    # Ensure the output directory exists (create if missing)
-    os.makedirs(output_dir, exist_ok=True)
+STRESS_COL = "Stress_Level (1-10)"
+SLEEP_COL = "Sleep_Hours_per_Night"
 
-    logger.info("Plotting distributions of stress and sleep")
-    # Create a single figure with two side-by-side subplots
-    plt.figure(figsize=(10, 4))
+def draw_distributions(fig, points: pd.DataFrame, sleep_bins: list):
+    import seaborn as sns
+
+    # Create two side-by-side subplots on the given figure
+    ax_stress, ax_sleep = fig.subplots(1, 2)
+    stress = points[points["column"] == STRESS_COL]
+    sleep = points[points["column"] == SLEEP_COL]
 
-    # Left plot: distribution of stress levels (1-10)
-    plt.subplot(1, 2, 1)
-    sns.histplot(df["Stress_Level (1-10)"], bins=range(1, 12), discrete=True, kde=True)
-    plt.title("Stress Level Distribution")
+    # Left plot: distribution of stress levels (1-10), weighted by the profile counts
+    sns.histplot(x=stress["value"], weights=stress["weight"], bins=range(1, 12), discrete=True, kde=True,
+                 ax=ax_stress)
+    ax_stress.set_xlabel(STRESS_COL)
+    ax_stress.set_title("Stress Level Distribution")
 
     # Right plot: distribution of sleep hours per night
-    plt.subplot(1, 2, 2)
-    sns.histplot(df["Sleep_Hours_per_Night"], kde=True)
-    plt.title("Sleep Hours per Night Distribution")
+    sns.histplot(x=sleep["value"], weights=sleep["weight"], bins=sleep_bins, kde=True, ax=ax_sleep)
+    ax_sleep.set_xlabel(SLEEP_COL)
+    ax_sleep.set_title("Sleep Hours per Night Distribution")
 
-    # Save the combined figure
+@instrument
+def plot_distributions(df: pd.DataFrame, output_dir: str = "figures", profile: Optional[dict] = None):
+    # Ensure the output directory exists (create if missing)
+    os.makedirs(output_dir, exist_ok=True)
+
+    logger.info("Plotting distributions of stress and sleep")
+    # Only the profiled (value, count) pairs are shipped to the renderer, not the rows
+    profile = ensure_profile(df, profile, [STRESS_COL, SLEEP_COL])
     path = f"{output_dir}/stress_sleep_distributions.png"
-    plt.tight_layout()
-    plt.savefig(path)
-    plt.close()
-    logger.info("Saved distributions plot to %s", path)
\ No newline at end of file
+    # Render the combined figure (skipped if the data has not changed)
+    render_figures([figure_job(
+        draw_distributions,
+        distribution_points(profile, [STRESS_COL, SLEEP_COL]),
+        path,
+        params={"sleep_bins": histogram_edges(profile, SLEEP_COL).tolist()},
+        figsize=(10, 4),
+        tight_layout=True,
+    )])
+    logger.info("Saved distributions plot to %s", path)
@@ -31,4 +31,30 @@ def test_compute_correlations_output():
 
     # Validate that correlation and p-value are floats
     assert isinstance(result["stress_total"]["corr"], float)
-    assert isinstance(result["stress_total"]["p_value"], float)
\ No newline at end of file
+    assert isinstance(result["stress_total"]["p_value"], float)
+
+def test_correlation_matrix_matches_scipy():
+    import numpy as np
+    from scipy.stats import pearsonr, spearmanr
+    from src.analysis.correlation import correlation_matrix
+
+    # Test that the vectorized matrix reproduces per-pair scipy results
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(200, 3)), columns=["a", "b", "c"])
+    df["b"] += df["a"]
+    result = correlation_matrix(df)
+    corr, p_value = pearsonr(df["a"], df["b"])
+    ci = pearsonr(df["a"], df["b"]).confidence_interval()
+    assert np.isclose(result["corr"].at["a", "b"], corr)
+    assert np.isclose(result["p_value"].at["a", "b"], p_value)
+    assert np.isclose(result["ci_low"].at["a", "b"], ci.low)
+    assert np.isclose(result["ci_high"].at["a", "b"], ci.high)
+    spearman = correlation_matrix(df, method="spearman")
+    assert np.isclose(spearman["corr"].at["a", "c"], spearmanr(df["a"], df["c"])[0])
+
+    # Pairwise-complete handling matches pandas on data with gaps
+    df.loc[::7, "a"] = np.nan
+    df.loc[::5, "c"] = np.nan
+    pairwise = correlation_matrix(df, pairwise=True)
+    assert np.allclose(pairwise["corr"], df.corr())
+    assert pairwise["n"].at["a", "c"] == len(df[["a", "c"]].dropna())
@@ -0,0 +1,30 @@
+import pandas as pd
+from src.cache import cache_get, cache_put, load_frame, save_frame
+
+# Test that a frame survives the columnar round trip with its dtypes
+def test_save_and_load_frame_round_trip(tmp_path):
+    # Create a small sample DataFrame with numeric, string and missing values
+    df = pd.DataFrame({
+        "Student_ID": ["S1", "S2", None],
+        "Stress_Level (1-10)": [3, 5, 7],
+        "Total_Score": [90.5, 85.0, 80.25],
+        "Gender": pd.Categorical(["Male", "Female", "Male"]),
+    })
+
+    save_frame(df, str(tmp_path / "entry"))
+    loaded = load_frame(str(tmp_path / "entry"))
+
+    # Verify that values, dtypes and missing entries are preserved
+    pd.testing.assert_frame_equal(loaded, df)
+
+
+# Test that the cache evicts the least recently used entry beyond its size bound
+def test_cache_put_evicts_old_entries(tmp_path):
+    df = pd.DataFrame({"Total_Score": range(1000)}, dtype="float64")
+
+    cache_put("old", df, str(tmp_path), max_bytes=10_000)
+    cache_put("new", df, str(tmp_path), max_bytes=10_000)
+
+    # Only the newest entry fits in the size bound
+    assert cache_get("old", str(tmp_path)) is None
+    pd.testing.assert_frame_equal(cache_get("new", str(tmp_path)), df)
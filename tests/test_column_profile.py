@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+from src.column_profile import (
+    load_profile, merge_profiles, missing_value_plan, profile_frame, profile_histogram, profile_summary, save_profile,
+)
+from src.data_loading import load_student_data
+
+# Test that profiles of chunks merge into the profile of all rows and survive a save/load round trip
+def test_merged_profile_matches_full_scan(tmp_path):
+    df = load_student_data()
+    merged = merge_profiles(profile_frame(df.iloc[:1700]), profile_frame(df.iloc[1700:]))
+    path = str(tmp_path / "profile.pkl")
+    save_profile(merged, path)
+    summary = profile_summary(load_profile(path))
+
+    # Moments, quartiles and counts against pandas on the full frame
+    numeric = df.select_dtypes("number").columns
+    described = df[numeric].describe().T
+    for col in ["count", "mean", "std", "min", "25%", "50%", "75%", "max"]:
+        np.testing.assert_allclose(summary.loc[numeric, col].astype(float), described[col], rtol=1e-10)
+    assert summary.loc["Grade", "freq"] == df["Grade"].value_counts().iloc[0]
+    assert summary.loc["Parent_Education_Level", "missing"] == df["Parent_Education_Level"].isna().sum()
+
+    # Medians and modes of the plan equal the ones pandas computes
+    fill = missing_value_plan(merged, incomplete_only=True)["fill"]
+    assert fill["Attendance (%)"] == df["Attendance (%)"].median()
+    assert fill["Parent_Education_Level"] == df["Parent_Education_Level"].mode()[0]
+
+# Test that the automatic fixed-bin histogram matches numpy's on the raw values
+def test_profile_histogram_matches_numpy():
+    df = load_student_data()
+    counts, edges = profile_histogram(profile_frame(df), "Total_Score")
+    expected_counts, expected_edges = np.histogram(df["Total_Score"], bins="auto")
+    np.testing.assert_allclose(edges, expected_edges)
+    np.testing.assert_array_equal(counts, expected_counts)
@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+from src.compaction import compact_frame
+from src.data_cleaning import handle_missing_values
+
+# Test that compaction prunes identifiers, narrows dtypes and still supports missing-value handling
+def test_compact_frame_and_missing_values():
+    df = pd.DataFrame({
+        "Student_ID": ["S1", "S2", "S3", "S4"],
+        "Email": ["a@x.com", "b@x.com", "c@x.com", "d@x.com"],
+        "Gender": ["Male", None, "Female", "Male"],
+        "Stress_Level (1-10)": [3, 5, 7, 8],
+        "Sleep_Hours_per_Night": [8.5, np.nan, 6.0, 5.5],
+        "Total_Score": [90.1234567891, 85.0, 80.0, 70.0],
+    })
+    report = {}
+    compact = compact_frame(df, report=report)
+
+    assert "Student_ID" not in compact.columns and "Email" not in compact.columns
+    assert isinstance(compact["Gender"].dtype, pd.CategoricalDtype)
+    assert compact["Stress_Level (1-10)"].dtype == np.int8
+    assert compact["Sleep_Hours_per_Night"].dtype == np.float32
+    # Values that float32 cannot hold within the tolerance stay float64
+    assert compact["Total_Score"].dtype == np.float64
+    assert report["memory"].loc["total", "bytes_after"] < report["memory"].loc["total", "bytes_before"]
+
+    # Medians still fill numeric columns and modes fill categoricals
+    filled = handle_missing_values(compact)
+    assert filled["Sleep_Hours_per_Night"].iloc[1] == np.float32(6.0)
+    assert filled["Gender"].iloc[1] == "Male"
+    hashed = compact_frame(df, identifiers="hash")
+    assert hashed["Student_ID"].dtype == np.uint64 and hashed["Student_ID"].is_unique
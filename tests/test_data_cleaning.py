@@ -1,5 +1,6 @@
 import pandas as pd
-from src.data_cleaning import clean_full_dataset
+from src.data_cleaning import clean_full_dataset, convert_column_types
+from src.type_inference import load_schema
 
 # Test that cleaning a full dataset retains the same number of rows and expected columns
 def test_clean_full_dataset_keeps_shape():
@@ -16,4 +17,23 @@ def test_clean_full_dataset_keeps_shape():
 
     # Check that the cleaned DataFrame has the expected number of rows and columns
     assert len(df_clean) == 2
-    assert "Attendance (%)" in df_clean.columns
\ No newline at end of file
+    assert "Attendance (%)" in df_clean.columns
+
+# Test that text columns are converted from a sampled schema that is persisted for reuse
+def test_convert_column_types_infers_and_persists_schema(tmp_path):
+    df = pd.DataFrame({
+        "Age": ["18", "21", None],
+        "Total_Score": ["85.5", "90", "70.25"],
+        "Enrolled": ["2020-01-31", "2021-09-01", "2022-02-15"],
+        "Grade": ["A", "B", "C"],
+    })
+    schema_path = str(tmp_path / "schema.json")
+
+    converted = convert_column_types(df, schema_path)
+
+    # Check the inferred dtypes and that the schema file was written
+    assert converted["Age"].dtype == "float64"
+    assert converted["Total_Score"].dtype == "float64"
+    assert pd.api.types.is_datetime64_any_dtype(converted["Enrolled"])
+    assert not pd.api.types.is_numeric_dtype(converted["Grade"])
+    assert load_schema(schema_path)["Enrolled"] == {"kind": "datetime", "format": "%Y-%m-%d"}
@@ -1,5 +1,6 @@
 import pandas as pd
-from src.data_loading import load_student_data
+import pytest
+from src.data_loading import SOURCE_COLUMN, load_partitioned_data, load_student_data, iter_student_data
 
 # Test that loading student data returns a DataFrame with expected structure
 def test_load_student_data_structure():
@@ -9,4 +10,50 @@ def test_load_student_data_structure():
     assert isinstance(df, pd.DataFrame)
     assert not df.empty
     assert "Student_ID" in df.columns
-    assert "Total_Score" in df.columns
\ No newline at end of file
+    assert "Total_Score" in df.columns
+
+# Test that streaming the data in chunks yields the same rows as the default load
+def test_iter_student_data_chunks_match_full_load():
+    df = load_student_data()
+    stats = {}
+    chunks = list(iter_student_data(chunksize=1000, stats=stats))
+
+    # Validate chunk sizes, reported stats and the concatenated content
+    assert len(chunks) == 5
+    assert stats["rows"] == len(df)
+    assert stats["rows_per_sec"] > 0
+    streamed = pd.concat(chunks, ignore_index=True)
+    assert streamed["Stress_Level (1-10)"].dtype == "Int64"
+    pd.testing.assert_frame_equal(streamed, df, check_dtype=False)
+
+# Test that a chunk with missing values in the integer columns still parses
+def test_iter_student_data_missing_integers(tmp_path):
+    df = load_student_data()
+    df.loc[3, "Age"] = None
+    df.loc[1500, "Stress_Level (1-10)"] = None
+    path = tmp_path / "students.csv"
+    df.to_csv(path, index=False)
+
+    streamed = pd.concat(iter_student_data(str(path), chunksize=1000), ignore_index=True)
+    assert streamed["Age"].isna().sum() == 1
+    assert pd.isna(streamed.loc[1500, "Stress_Level (1-10)"])
+
+# Test that a directory of per-term files loads in schema order with a source column,
+# and that a file missing a column is reported instead of misaligned
+def test_load_partitioned_data_checks_headers(tmp_path):
+    df = load_student_data()
+    df.iloc[:2000].to_csv(tmp_path / "term1.csv", index=False)
+    # Reordered columns are read by name
+    df.iloc[2000:][df.columns[::-1]].to_csv(tmp_path / "term2.csv", index=False)
+
+    stats = {}
+    loaded = load_student_data(str(tmp_path), n_jobs=2, stats=stats)
+
+    assert list(stats["files"]["rows"]) == [2000, 3000]
+    assert loaded[SOURCE_COLUMN].value_counts().to_dict() == {"term1": 2000, "term2": 3000}
+    pd.testing.assert_frame_equal(loaded.drop(columns=SOURCE_COLUMN), df, check_dtype=False)
+
+    df.drop(columns="Age").to_csv(tmp_path / "term3.csv", index=False)
+    with pytest.raises(ValueError, match="term3.csv"):
+        load_partitioned_data(str(tmp_path / "term*.csv"))
+    assert len(load_partitioned_data(str(tmp_path / "term*.csv"), on_mismatch="skip")) == len(df)
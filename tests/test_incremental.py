@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+from src.analysis.model_analysis import compute_correlations, extract_model_effects
+from src.data_cleaning import handle_missing_values
+from src.data_loading import iter_student_data, load_student_data
+from src.feature_engineering import engineer_features
+from src.incremental import absorb_delta, apply_state, incremental_results, new_state, update_state
+from src.modeling import build_interaction_regression_model
+
+# Test that absorbing a delta file matches a full recompute on all rows
+def test_incremental_matches_full_recompute(tmp_path):
+    df = load_student_data()
+    # Write the last 1000 rows as a delta file
+    delta_path = tmp_path / "delta.csv"
+    df.iloc[4000:].to_csv(delta_path, index=False)
+
+    base = next(iter_student_data(chunksize=4000))
+    state = update_state(new_state(), [base])
+    state = absorb_delta(state, str(delta_path))
+    results = incremental_results(state)
+
+    # Full recompute on the combined rows
+    df_features = engineer_features(handle_missing_values(df))
+    model = build_interaction_regression_model(df_features)
+    expected_effects = extract_model_effects(model)
+    expected_corr = compute_correlations(df_features)
+
+    for name, effect in expected_effects.items():
+        assert np.isclose(results["effects"][name]["coef"], effect["coef"], rtol=1e-8)
+        assert np.isclose(results["effects"][name]["p_value"], effect["p_value"], rtol=1e-6)
+    for name, corr in expected_corr.items():
+        assert np.isclose(results["correlations"][name]["corr"], corr["corr"], rtol=1e-8)
+        assert np.isclose(results["correlations"][name]["p_value"], corr["p_value"], rtol=1e-6)
+
+    # Medians of low-cardinality columns are exact, so imputed and centered rows match
+    refreshed = apply_state(df, state)
+    pd.testing.assert_frame_equal(refreshed, df_features, check_dtype=False)
@@ -0,0 +1,40 @@
+import json
+import logging
+import tracemalloc
+import pandas as pd
+from src.utils.instrumentation import configure_instrumentation, instrument, stage_timer
+
+# Test that an instrumented stage emits one JSON record with timings, rows and (nested) peak allocation
+def test_instrument_emits_json_records(monkeypatch, tmp_path):
+    records = []
+    handler = logging.Handler()
+    handler.emit = lambda record: records.append(json.loads(record.getMessage()))
+    metrics = logging.getLogger("instrumentation")
+    monkeypatch.setattr(metrics, "handlers", [handler])
+    monkeypatch.setattr(metrics, "propagate", False)
+    # Registered with monkeypatch so the settings are undone after the test
+    monkeypatch.setenv("STRESS_TRACE_MEMORY", "")
+    monkeypatch.setenv("STRESS_PROFILE_DIR", "")
+    configure_instrumentation(trace_memory=True, profile_dir=str(tmp_path))
+
+    @instrument(name="double")
+    def double(df):
+        with stage_timer("allocate"):
+            # About 8 MB allocated inside the nested stage
+            values = pd.Series(range(1_000_000), dtype="int64")
+        return pd.concat([df, df]).assign(total=values.sum())
+
+    try:
+        double(pd.DataFrame({"x": range(10)}))
+    finally:
+        tracemalloc.stop()
+
+    # The inner record is emitted first, then the outer one
+    inner, outer = records
+    assert inner["stage"] == "allocate" and outer["stage"] == "double"
+    assert (outer["rows_in"], outer["rows_out"], outer["status"]) == (10, 20, "ok")
+    assert outer["wall_seconds"] >= inner["wall_seconds"] > 0
+    assert outer["peak_alloc_mb"] >= inner["peak_alloc_mb"] > 7
+    # Only the outermost stage is profiled
+    assert "profile" not in inner
+    assert (tmp_path / "double-{}.prof".format(outer["pid"])).exists()
@@ -0,0 +1,24 @@
+import os
+import subprocess
+import sys
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Libraries the numbers-only path must never import
+PLOTTING_AND_HEAVY_MODULES = ["matplotlib", "seaborn", "sklearn", "statsmodels"]
+
+
+# Test that the numbers-only entry point never imports plotting or heavy modeling libraries
+def test_numbers_only_skips_heavy_imports(tmp_path):
+    code = (
+        "import sys, main\n"
+        f"results = main.numbers_only(cache_dir={str(tmp_path)!r})\n"
+        "assert set(results) == {'correlations', 'effects', 'summary'}\n"
+        f"print([m for m in {PLOTTING_AND_HEAVY_MODULES!r} if m in sys.modules])\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=project_root, capture_output=True, text=True, check=True,
+    ).stdout
+
+    # Verify that none of the heavy modules were loaded
+    assert output.strip().splitlines()[-1] == "[]"
@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+from src.analysis.model_diagnostics import collinearity_diagnostics, compute_vif, gram_stats
+from src.sufficient_stats import merge_ols_stats
+
+# Test that closed-form VIFs match auxiliary regressions and work from merged chunk statistics
+def test_collinearity_diagnostics():
+    from statsmodels.stats.outliers_influence import variance_inflation_factor
+
+    # Create a sample where one column is nearly the sum of two others
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(300, 3)), columns=["a", "b", "c"])
+    df["d"] = df["a"] + df["b"] + rng.normal(0, 0.1, 300)
+    features = ["a", "b", "c", "d"]
+
+    vif = compute_vif(df, features)
+    X = df[features].assign(const=1).to_numpy()
+    expected = [variance_inflation_factor(X, i) for i in range(len(features))]
+    assert list(vif["feature"]) == features
+    np.testing.assert_allclose(vif["VIF"], expected)
+
+    # Chunked statistics give the same result, and the largest condition index flags the near-dependency
+    stats = merge_ols_stats([gram_stats(df.iloc[:100], features), gram_stats(df.iloc[100:], features)])
+    result = collinearity_diagnostics(stats=stats)
+    np.testing.assert_allclose(result["vif"]["VIF"], expected)
+    condition = result["condition"]
+    assert condition["condition_index"].iloc[-1] > 10
+    assert condition.iloc[-1][["a", "b", "d"]].min() > 0.9
+    np.testing.assert_allclose(condition[["const"] + features].sum(), 1.0)
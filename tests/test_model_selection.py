@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+from src.feature_engineering import engineer_features
+from src.model_selection import compare_specifications, square
+
+# Test that cross-validation prefers the specification matching the data and reports all metrics
+def test_compare_specifications_prefers_true_model():
+    # Create a sample where Total_Score is quadratic in stress
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "Stress_Level (1-10)": rng.integers(1, 11, 400),
+        "Sleep_Hours_per_Night": rng.uniform(4, 9, 400),
+    })
+    df["Total_Score"] = 80 - 0.8 * (df["Stress_Level (1-10)"] - 5.5) ** 2 + rng.normal(0, 2, 400)
+    df_features = engineer_features(df)
+    specifications = [
+        {"name": "interaction", "terms": ["Stress_Level_c", "Sleep_Hours_c", "Stress_Sleep_Interaction_c"]},
+        {"name": "quadratic", "terms": ["Stress_Level_c", "Sleep_Hours_c", square("Stress_Level_c")]},
+    ]
+
+    result = compare_specifications(df_features, specifications, n_folds=5, n_repeats=2)
+    assert list(result["specification"]) == ["quadratic", "interaction"]
+    assert {"cv_rmse", "cv_r2", "aic", "bic", "seconds"} <= set(result.columns)
+    best = result.iloc[0]
+    assert 1.8 < best["cv_rmse"] < 2.3
+    assert best["aic"] < result.iloc[1]["aic"]
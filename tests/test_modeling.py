@@ -1,6 +1,7 @@
+import numpy as np
 import pandas as pd
 from src.feature_engineering import engineer_features
-from src.modeling import build_interaction_regression_model
+from src.modeling import build_interaction_model_from_chunks, build_interaction_regression_model
 
 # Test that building an interaction regression model runs without errors
 def test_build_interaction_regression_model_runs():
@@ -17,4 +18,75 @@ def test_build_interaction_regression_model_runs():
 
     # Verify that the model has been created and has parameters
     assert hasattr(model, "params")
-    assert len(model.params) > 0
\ No newline at end of file
+    assert len(model.params) > 0
+
+# Test that the sufficient-statistics engine reproduces the statsmodels fit, also from merged chunks
+def test_suffstats_engine_matches_statsmodels():
+    # Create a random sample DataFrame for testing
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "Stress_Level (1-10)": rng.integers(1, 11, 200),
+        "Sleep_Hours_per_Night": rng.uniform(4, 9, 200),
+        "Total_Score": rng.uniform(50, 100, 200),
+    })
+    df_features = engineer_features(df)
+
+    expected = build_interaction_regression_model(df_features)
+    pooled = build_interaction_regression_model(df_features, engine="suffstats")
+    chunked = build_interaction_model_from_chunks([df.iloc[:70], df.iloc[70:150], df.iloc[150:]])
+
+    # Compare coefficients, inference and fit statistics
+    for model in (pooled, chunked):
+        np.testing.assert_allclose(model.params, expected.params, rtol=1e-8)
+        np.testing.assert_allclose(model.bse, expected.bse, rtol=1e-8)
+        np.testing.assert_allclose(model.pvalues, expected.pvalues, rtol=1e-6)
+        np.testing.assert_allclose(model.cov_params(), expected.cov_params(), rtol=1e-8, atol=1e-12)
+        assert abs(model.rsquared - expected.rsquared) < 1e-10
+
+# Test that grouped models match separate statsmodels fits per stratum, also with partitions in parallel
+def test_grouped_models_match_per_group_fits():
+    import statsmodels.api as sm
+    from src.modeling import INTERACTION_PREDICTORS, build_grouped_interaction_models
+
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "Stress_Level (1-10)": rng.integers(1, 11, 300),
+        "Sleep_Hours_per_Night": rng.uniform(4, 9, 300),
+        "Total_Score": rng.uniform(50, 100, 300),
+        "Department": rng.choice(["CS", "Engineering", "Business"], 300),
+    })
+    df_features = engineer_features(df)
+
+    table = build_grouped_interaction_models(df_features, "Department")
+    assert len(table) == 3 * 4
+    for department, rows in table.groupby("Department"):
+        group = df_features[df_features["Department"] == department]
+        expected = sm.OLS(group["Total_Score"], sm.add_constant(group[INTERACTION_PREDICTORS])).fit()
+        np.testing.assert_allclose(rows["coef"], expected.params, rtol=1e-8)
+        np.testing.assert_allclose(rows["std_err"], expected.bse, rtol=1e-8)
+        np.testing.assert_allclose(rows["p_value"], expected.pvalues, rtol=1e-6)
+    pd.testing.assert_frame_equal(table, build_grouped_interaction_models(df_features, "Department", n_jobs=2))
+
+# Test that the multi-outcome fit matches one statsmodels fit per outcome
+def test_multi_outcome_model_matches_single_fits():
+    from src.analysis.model_analysis import extract_model_effects, extract_multi_outcome_effects
+    from src.modeling import build_multi_outcome_model
+
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "Stress_Level (1-10)": rng.integers(1, 11, 200),
+        "Sleep_Hours_per_Night": rng.uniform(4, 9, 200),
+        "Total_Score": rng.uniform(50, 100, 200),
+        "Final_Score": rng.uniform(40, 100, 200),
+    })
+    df_features = engineer_features(df)
+
+    result = build_multi_outcome_model(df_features, ["Total_Score", "Final_Score"])
+    effects = extract_multi_outcome_effects(result)
+    for outcome in ["Total_Score", "Final_Score"]:
+        expected = build_interaction_regression_model(df_features.assign(Total_Score=df_features[outcome]))
+        np.testing.assert_allclose(result["params"][outcome], expected.params, rtol=1e-8)
+        np.testing.assert_allclose(result["bse"][outcome], expected.bse, rtol=1e-8)
+        np.testing.assert_allclose(result["pvalues"][outcome], expected.pvalues, rtol=1e-6)
+        for key, effect in extract_model_effects(expected).items():
+            np.testing.assert_allclose(effects[outcome][key]["coef"], effect["coef"], rtol=1e-8)
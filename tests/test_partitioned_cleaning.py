@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+from src.data_cleaning import clean_full_dataset
+from src.data_loading import DEFAULT_DATA_PATH
+from src.partitioned_cleaning import clean_partitioned
+from src.type_inference import sample_positions
+
+# Test that partitioned cleaning of raw text rows equals the serial pipeline exactly
+def test_clean_partitioned_matches_serial():
+    raw = pd.read_csv(DEFAULT_DATA_PATH, dtype=str, keep_default_na=False)
+    rng = np.random.default_rng(0)
+    # Missing tokens to fill, a column to drop and, outside the inference sample,
+    # a value that blocks a numeric conversion
+    raw.loc[rng.random(len(raw)) < 0.05, "Sleep_Hours_per_Night"] = "NA"
+    raw.loc[rng.random(len(raw)) < 0.6, "Age"] = "?"
+    unsampled = np.setdiff1d(np.arange(len(raw)), sample_positions(len(raw)))
+    raw.loc[unsampled[-1], "Quizzes_Avg"] = "n/a"
+
+    expected = clean_full_dataset(raw)
+    result = clean_partitioned(raw, n_partitions=7, n_jobs=2)
+
+    assert "Age" not in result.columns
+    assert not pd.api.types.is_numeric_dtype(result["Quizzes_Avg"])
+    pd.testing.assert_frame_equal(result, expected, check_exact=True)
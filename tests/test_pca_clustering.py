@@ -18,4 +18,43 @@ def test_pca_and_kmeans_pipeline():
 
     # Validate the shapes and presence of expected columns
     assert len(pca_df) == len(df_features)
-    assert "Cluster" in clustered.columns
\ No newline at end of file
+    assert "Cluster" in clustered.columns
+# Test that the streaming mode reproduces the in-memory PCA projection chunk by chunk
+def test_streaming_pca_matches_in_memory(tmp_path):
+    import numpy as np
+    from src.data_cleaning import clean_full_dataset
+    from src.data_loading import DEFAULT_DATA_PATH, load_student_data
+    from src.analysis.eda_advanced import stream_pca_kmeans
+
+    # Write a small copy of the dataset without missing values
+    df_raw = load_student_data().dropna().head(600)
+    path = tmp_path / "sample.csv"
+    df_raw.to_csv(path, index=False)
+
+    pca_df = apply_pca(engineer_features(clean_full_dataset(df_raw.reset_index(drop=True))))
+    stats = {}
+    streamed = stream_pca_kmeans(str(path), chunksize=150, stats=stats)
+
+    # Components agree up to sign (incremental PCA is a close approximation), and every row gets a cluster
+    assert len(streamed) == len(pca_df) == stats["rows"]
+    for col in ["PC1", "PC2"]:
+        assert abs(np.corrcoef(streamed[col], pca_df[col])[0, 1]) > 0.99
+    assert streamed["PC1"].dtype == np.float32
+    assert set(streamed["Cluster"]) == {0, 1, 2}
+
+# Test that the k sweep recovers well-separated clusters and returns a score table
+def test_sweep_kmeans_finds_cluster_count():
+    import numpy as np
+    from src.analysis.eda_advanced import sweep_kmeans
+
+    # Three tight, well-separated groups of points
+    rng = np.random.default_rng(0)
+    centers = np.array([[0.0, 0.0], [10.0, 0.0], [0.0, 10.0]])
+    points = np.vstack([center + rng.normal(0, 0.5, (300, 2)) for center in centers])
+    pca_df = pd.DataFrame(points, columns=["PC1", "PC2"])
+
+    result = sweep_kmeans(pca_df, k_values=range(2, 6), seeds=(0, 1), sample_size=500)
+    assert result["n_clusters"] == 3
+    assert result["model"].n_clusters == 3
+    assert len(result["scores"]) == 8
+    assert {"inertia", "silhouette", "calinski_harabasz"} <= set(result["scores"].columns)
@@ -0,0 +1,35 @@
+from src.pipeline import run_pipeline, stage
+
+
+def make_numbers():
+    return [1, 2, 3]
+
+
+def total(numbers):
+    return sum(numbers)
+
+
+def largest(numbers):
+    return max(numbers)
+
+
+def smallest(numbers):
+    return min(numbers)
+
+
+# Test that stages run in dependency order, are memoized, and only changed stages rerun
+def test_run_pipeline_memoizes_unchanged_stages(tmp_path):
+    stages = [
+        stage("numbers", make_numbers, outputs=["numbers"]),
+        stage("total", total, inputs=["numbers"], outputs=["total"]),
+        stage("extreme", largest, inputs=["numbers"], outputs=["extreme"]),
+    ]
+    outputs, timings = run_pipeline(stages, cache_dir=str(tmp_path))
+    assert outputs == {"numbers": [1, 2, 3], "total": 6, "extreme": 3}
+    assert not any(record["cached"] for record in timings)
+
+    # Swap the function of one stage: only that stage is recomputed
+    stages[2] = stage("extreme", smallest, inputs=["numbers"], outputs=["extreme"])
+    outputs, timings = run_pipeline(stages, cache_dir=str(tmp_path))
+    assert outputs["extreme"] == 1
+    assert [record["stage"] for record in timings if not record["cached"]] == ["extreme"]
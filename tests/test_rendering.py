@@ -0,0 +1,42 @@
+import pandas as pd
+from src.rendering import figure_job, render_figures
+
+
+def draw_scores(fig, df):
+    ax = fig.subplots()
+    ax.plot(df["Total_Score"])
+
+
+# Test that a figure is only re-rendered when its data changes
+def test_render_figures_skips_unchanged(tmp_path):
+    df = pd.DataFrame({"Total_Score": [90, 85, 80, 70], "Grade": ["A", "B", "B", "C"]})
+    path = str(tmp_path / "scores.png")
+    cache_dir = str(tmp_path / "render")
+
+    def render(data):
+        return render_figures([figure_job(draw_scores, data, path, columns=["Total_Score"])], cache_dir=cache_dir)
+
+    assert render(df) == [path]
+    # Unchanged data (and changes to columns that are not shipped) skip rendering
+    assert render(df) == []
+    assert render(df.assign(Grade="A")) == []
+    # Changed plotted values trigger a new render
+    assert render(df.assign(Total_Score=[1, 2, 3, 4])) == [path]
+
+
+# Test that binning keeps every point and the dominant label of each cell
+def test_bin_points_counts_and_labels():
+    import numpy as np
+    from src.rendering import bin_points, use_density
+
+    x = np.array([0.0, 0.1, 0.2, 9.9, 10.0, np.nan])
+    y = np.array([0.0, 0.0, 0.1, 10.0, 9.8, 1.0])
+    grid = bin_points(x, y, labels=[1, 1, 2, 3, 3, 1], bins=4)
+
+    assert len(grid) == 16
+    assert grid["count"].sum() == 5
+    # Lower-left cell holds the three points near the origin, mostly label 1
+    assert grid.loc[0, "count"] == 3 and grid.loc[0, "label"] == 1
+    assert grid.loc[15, "count"] == 2 and grid.loc[15, "label"] == 3
+    assert (grid.loc[grid["count"] == 0, "label"] == -1).all()
+    assert use_density(10) is False and use_density(10, density=True) is True
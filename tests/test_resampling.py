@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+from src.feature_engineering import engineer_features
+from src.modeling import build_interaction_regression_model
+from src.resampling import resample_interaction_effects
+
+# Test that bootstrap intervals are reproducible, cover the OLS estimate and match the t interval width
+def test_bootstrap_and_permutation_inference():
+    # Create a random sample DataFrame with a real interaction effect
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "Stress_Level (1-10)": rng.integers(1, 11, 400),
+        "Sleep_Hours_per_Night": rng.uniform(4, 9, 400),
+    })
+    df["Total_Score"] = (60 + 0.5 * df["Stress_Level (1-10)"] * df["Sleep_Hours_per_Night"]
+                         + rng.normal(0, 5, 400))
+    df_features = engineer_features(df)
+    model = build_interaction_regression_model(df_features)
+
+    boot = resample_interaction_effects(df_features, n_resamples=400, batch_size=64, seed=1)
+    again = resample_interaction_effects(df_features, n_resamples=400, batch_size=64, seed=1, n_jobs=2)
+    np.testing.assert_allclose(boot["draws"], again["draws"])
+    assert (boot["ci_low"] < model.params).all() and (model.params < boot["ci_high"]).all()
+    width = boot["ci_high"] - boot["ci_low"]
+    t_width = model.conf_int()[1] - model.conf_int()[0]
+    np.testing.assert_allclose(width, t_width, rtol=0.3)
+
+    # The interaction is clearly significant under permutation
+    perm = resample_interaction_effects(df_features, method="permutation", n_resamples=199)
+    assert perm["p_value"]["Stress_Sleep_Interaction_c"] == 1 / 200
+    assert np.isnan(perm["p_value"]["const"])
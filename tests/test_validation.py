@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+from src.validation import filter_valid_rows, outlier_rules, rule_mask, validate
+
+# Test that declared rules produce the expected row-level masks and summary counts
+def test_validate_masks_and_summary():
+    # Create a small sample DataFrame with one invalid value per rule
+    df = pd.DataFrame({
+        "Stress_Level (1-10)": [3, 5, 12, 8, 4, 6, 5, 4],
+        "Total_Score": [90, 85, 80, 70, 75, 82, 500, 88],
+        "Gender": ["Male", "Female", "Male", "Other", "Female", None, "Male", "Male"],
+    })
+    rules = [
+        {"name": "stress_range", "column": "Stress_Level (1-10)", "type": "range", "min": 1, "max": 10},
+        {"name": "gender_domain", "column": "Gender", "type": "domain", "values": ["Male", "Female"]},
+        {"name": "gender_not_null", "column": "Gender", "type": "not_null"},
+    ] + outlier_rules(["Total_Score"])
+
+    result = validate(df, rules)
+
+    # Check masks and counts for each rule
+    assert result["masks"].shape == (4, 1)
+    assert np.flatnonzero(rule_mask(result, "stress_range")).tolist() == [2]
+    assert np.flatnonzero(rule_mask(result, "gender_domain")).tolist() == [3]
+    assert np.flatnonzero(rule_mask(result, "gender_not_null")).tolist() == [5]
+    assert np.flatnonzero(rule_mask(result, "outlier_Total_Score")).tolist() == [6]
+    assert result["summary"]["violations"].sum() == 4
+    assert len(filter_valid_rows(df, result)) == 4
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+from src.feature_engineering import engineer_features
+from src.modeling import build_interaction_regression_model
+from src.visualization_advanced import (
+    johnson_neyman,
+    predict_grid,
+    predict_mean_ci,
+    prepare_exog,
+    simple_slopes,
+)
+
+# Test that the batched grid, simple slopes and Johnson-Neyman bounds agree with row-wise predictions
+def test_prediction_grid_and_simple_slopes():
+    # Create a random sample with a stress effect that depends on sleep
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "Stress_Level (1-10)": rng.integers(1, 11, 500),
+        "Sleep_Hours_per_Night": rng.uniform(4, 9, 500),
+    })
+    df["Total_Score"] = 70 + 0.8 * df["Stress_Level (1-10)"] * (df["Sleep_Hours_per_Night"] - 6.5) + rng.normal(0, 5, 500)
+    model = build_interaction_regression_model(engineer_features(df))
+
+    stress = np.linspace(-4, 4, 9)
+    grid = predict_grid(model, stress, [-1.0, 0.5])
+    for row, sleep in enumerate([-1.0, 0.5]):
+        expected = predict_mean_ci(model, prepare_exog(stress, sleep))
+        np.testing.assert_allclose(grid["mean"][row], expected["mean"])
+        np.testing.assert_allclose(grid["mean_ci_upper"][row], expected["mean_ci_upper"])
+
+    # The slope is exactly at the significance threshold at each Johnson-Neyman bound
+    bounds = johnson_neyman(model)["bounds"]
+    assert len(bounds) == 2
+    np.testing.assert_allclose(simple_slopes(model, bounds)["p_value"], 0.05)